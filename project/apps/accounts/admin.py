@@ -7,6 +7,8 @@ from import_export.admin import ImportExportActionModelAdmin
 from mapwidgets import GooglePointFieldInlineWidget
 from tabbed_admin import TabbedModelAdmin
 
+from project.utils.export import StreamingExportMixin
+
 from .forms import CustomAdminPasswordChangeForm, UserCreationAdminForm, \
     AddressInlineFormset, UserChangeAdminForm
 from django.utils.translation import ugettext_lazy as _
@@ -86,7 +88,8 @@ class HasAddressFilter(admin.SimpleListFilter):
 
 
 @admin.register(User)
-class UserAdmin(ImportExportActionModelAdmin, TabbedModelAdmin, UserAdmin):
+class UserAdmin(StreamingExportMixin, ImportExportActionModelAdmin, TabbedModelAdmin, UserAdmin):
+    resource_class = UserResource
 
     add_form_template = None
     add_form = UserCreationAdminForm
@@ -96,10 +99,11 @@ class UserAdmin(ImportExportActionModelAdmin, TabbedModelAdmin, UserAdmin):
     change_user_password_template = None
     change_password_form = CustomAdminPasswordChangeForm
 
-    list_display = ('get_full_name', 'phone', 'email',)
-    list_editable = ('phone', 'email',)
+    # Stored columns, so the changelist doesn't parse a phone per row
+    list_display = ('display_name', 'phone_national', 'email',)
+    list_editable = ('email',)
     list_filter = ('groups', HasAddressFilter,) # 'addresses__city'
-    search_fields = ('email', 'phone', 'first_name', 'last_name',)
+    search_fields = ('email', 'phone', 'phone_national', 'first_name', 'last_name',)
     ordering = ('first_name',)
     filter_horizontal = ('groups', 'user_permissions',)
     save_on_top = True
@@ -7,5 +7,5 @@ class AccountsConfig(AppConfig):
     name = "project.apps.accounts"
     verbose_name = _('Contas de usuário')
 
-    # def ready(self):
-    #     import apps.accounts.signals # noqa
+    def ready(self):
+        import project.apps.accounts.signals # noqa
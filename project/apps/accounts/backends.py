@@ -1,22 +1,49 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.backends import BaseBackend
 from django.core.exceptions import PermissionDenied, ValidationError
-from django.db.models import Q
+from django.db.models.functions import Lower
 from django.http import HttpResponse
 
+from project.utils.phones import normalize_phone
+
 User = get_user_model()
 
 
+def normalize_credential(credential):
+    """
+    Returns (field, value) to look the user up by: the lowercased email,
+    or the phone in E.164. Returns (None, None) if it is neither.
+    """
+    credential = (credential or '').strip()
+    if '@' in credential:
+        return 'email_lower', credential.lower()
+    phone = normalize_phone(credential)
+    if not phone.valid:
+        return None, None
+    return 'phone', phone.e164
+
+
+def credential_queryset():
+    """
+    Users matchable by normalized credential. The confirmation state is
+    read from the User.phone_confirmed/email_confirmed columns, so the login
+    check is a single indexed query.
+    """
+    return User.objects.annotate(email_lower=Lower('email'))
+
+
 class CustomAuthBackend(BaseBackend):
     def authenticate(self, request, **kwargs):
-        credential = kwargs['username'].lower()  # If you made email case insensitive add lower()
+        field, credential = normalize_credential(kwargs['username'])
         password = kwargs['password']
+        if field is None:
+            return None
         try:
-            my_user = User.objects.get(Q(phone=credential) | Q(email=credential))
+            my_user = credential_queryset().get(**{field: credential})
         except Exception:
             return None
         else:
-            if my_user.is_email_confirmed or my_user.is_phone_confirmed: #and my_user.is_first_login
+            if my_user.email_confirmed or my_user.phone_confirmed: #and my_user.is_first_login
                 if my_user.check_password(password): #my_user.is_active and
                     return my_user
             else:
@@ -32,15 +59,15 @@ class CustomAuthBackend(BaseBackend):
 
 class EmailAuthBackend(BaseBackend):
     def authenticate(self, request, **kwargs):
-        email = kwargs['username'].lower()  # If you made email case insensitive add lower()
+        email = kwargs['username'].strip().lower()  # Matched against the Lower(email) index
         password = kwargs['password']
         try:
-            my_user = User.objects.get(email=email)
+            my_user = credential_queryset().get(email_lower=email)
         except Exception:
             # raise ValidationError('Endereço de email não encontrado')
             return None
         else:
-            if my_user.is_email_confirmed:
+            if my_user.email_confirmed:
                 if my_user.is_active and my_user.check_password(password):
                     return my_user
             else:
@@ -1,11 +1,9 @@
 from django import forms
-from django.conf import settings
 from django.contrib.auth import get_user_model, password_validation
 from django.contrib.auth.tokens import default_token_generator
 from django.contrib.gis.geos import Point
 from django.contrib.sites.shortcuts import get_current_site
 from django.core.mail import EmailMultiAlternatives
-from django.db.models import Q
 from django.template import loader
 from django.utils.encoding import force_bytes
 from django.utils.http import urlsafe_base64_encode
@@ -16,15 +14,39 @@ from django.contrib.auth.forms import ReadOnlyPasswordHashField, AdminPasswordCh
 from django.core.exceptions import ValidationError
 from django.core.validators import validate_email
 from mapwidgets import GooglePointFieldWidget
-from phonenumber_field.phonenumber import PhoneNumber
 from phonenumber_field.validators import validate_international_phonenumber
 
-from project.apps.places.models import Address, Country, State, City
+from project.apps.places.cache import get_city
+from project.apps.places.models import Address
 from project.utils import whatsapp, functions
+from project.utils.phones import validate_phone
+from project.utils.geolocation import reverse_geocode
+
+from .models import UserCredential
+from .utils import credential_identifier
 
 User = get_user_model()
 
 
+def validate_credential_available(value, user=None):
+    """
+    Raise ValidationError if ``value`` (phone or email) is a login credential
+    of a user other than ``user``, as registered in UserCredential.
+    """
+    credentials = UserCredential.objects.filter(identifier=credential_identifier(value))
+    if user is not None and user.pk is not None:
+        credentials = credentials.exclude(user=user)
+    if credentials.exists():
+        raise credential_taken_error(value)
+
+
+def credential_taken_error(value):
+    credential_type = functions.get_credential_type(str(value))
+    return ValidationError(
+        f'Este {credential_type} já é usado como credencial de acesso por outro usuário.', code='unique',
+    )
+
+
 class UserChangeAdminForm(forms.ModelForm):
     password = ReadOnlyPasswordHashField(
         label=_("Password"),
@@ -73,9 +95,10 @@ class UserChangeAdminForm(forms.ModelForm):
         try:
             if phone:
                 validate_international_phonenumber(phone)
-                return phone
         except Exception:
             raise ValidationError ('Zulimou aqui')
+        if phone:
+            validate_credential_available(phone, self.instance)
         return phone
 
     def clean_email(self):
@@ -85,6 +108,8 @@ class UserChangeAdminForm(forms.ModelForm):
                 validate_email(email)
         except ValidationError:
             raise
+        if email:
+            validate_credential_available(email, self.instance)
         return email
 
 
@@ -114,14 +139,14 @@ class UserCreationAdminForm(forms.ModelForm):
                 validate_email(username)
             else:
                 # whatsapp.validate_phone(username)  # Tries to validate through z-API
-                validate_international_phonenumber(username) # If there is no connection, validates just the phonenumber
-                username = PhoneNumber.from_string(username).as_e164
+                username = validate_phone(username).e164 # If there is no connection, validates just the phonenumber
         except ValidationError:
             raise
 
-        if User.objects.filter(Q(username=username) | Q(phone=username) | Q(email=username)).exists():
-            credential_type = functions.get_credential_type(username)
-            self.add_error('username', ValidationError(f'Este {credential_type} já é usado como credencial de acesso por outro usuário.', code='unique'))
+        try:
+            validate_credential_available(username)
+        except ValidationError as e:
+            self.add_error('username', e)
 
         return username
 
@@ -149,14 +174,14 @@ class SignUpForm(forms.ModelForm):
                 validate_email(username)
             else:
                 # whatsapp.validate_phone(username)  # TODO: Try to validate through some WhatsApp API (z-API deprecated)
-                validate_international_phonenumber(username) # If there is no connection, validates just the phonenumber
-                username = PhoneNumber.from_string(username).as_e164
+                username = validate_phone(username).e164 # If there is no connection, validates just the phonenumber
         except ValidationError:
             raise
 
-        if User.objects.filter(Q(username=username) | Q(phone=username) | Q(email=username)).exists():
-            credential_type = functions.get_credential_type(username)
-            self.add_error('username', ValidationError(f'Este {credential_type} já é usado como credencial de acesso por outro usuário.', code='unique'))
+        try:
+            validate_credential_available(username)
+        except ValidationError as e:
+            self.add_error('username', e)
 
         return username
 
@@ -207,9 +232,7 @@ class AddressInlineFormset(forms.models.BaseInlineFormSet):
             _country = str(self.cleaned_data.get('geodata')[6].upper())[0:2]
             _country_long = str(self.cleaned_data.get('geodata')[7])
 
-            my_country, country_created = Country.objects.get_or_create(code=_country, name=_country_long)
-            my_state, state_created = State.objects.get_or_create(code=_state, name=_state_long)
-            my_city, city_created = City.objects.get_or_create(state=my_state, country=my_country, name=_city)
+            my_city = get_city(_country, _country_long, _state, _state_long, _city)
 
             return my_city
         else:
@@ -226,14 +249,10 @@ class AddressInlineFormset(forms.models.BaseInlineFormSet):
 
     def clean_geodata(self):
         location = self.cleaned_data.get('location')
-        coords = f"{location.y},{location.x}"
-
-        import geopy
-        geolocator = geopy.GoogleV3(api_key=settings.GOOGLE_MAPS_API_KEY)
-        response = geolocator.reverse(coords,language='pt-br',)
+        response = reverse_geocode(location)
 
         if response is not None:
-            components = response.raw['address_components']
+            components = response['address_components']
             address = {}
             for component in components:
                 for type in component['types']:
@@ -290,8 +309,8 @@ class AddressInlineFormset(forms.models.BaseInlineFormSet):
             else:
                 address_line2 = ''
 
-            lat = response.raw['geometry']['location']['lat']
-            lng = response.raw['geometry']['location']['lng']
+            lat = response['geometry']['location']['lat']
+            lng = response['geometry']['location']['lng']
             # coords = fromstr(f"POINT({lng}, {lat})", srid=4326)
 
             coords = Point(lng, lat, srid=4326)
@@ -306,8 +325,8 @@ class AddressInlineFormset(forms.models.BaseInlineFormSet):
                    address_country_long, \
                    address_postal_code,\
                    coords,\
-                   response.raw['formatted_address'],\
-                   response.raw
+                   response['formatted_address'],\
+                   response
 
     # def update_address_fields(self):
     #     location = self.cleaned_data.get('location')
@@ -448,6 +467,12 @@ class ProfileUpdateForm(UserChangeForm):
         model = User
         fields = ('first_name', 'last_name', 'email', 'password') #'phone',
 
+    def clean_email(self):
+        email = self.cleaned_data.get('email')
+        if email:
+            validate_credential_available(email, self.instance)
+        return email
+
 
 class PwdResetForm(forms.Form):
 
@@ -0,0 +1,136 @@
+"""
+Bulk import of customers.
+
+Unlike the django-import-export admin import, which saves one User at a
+time (running User.save(), the auto_add receivers and password hashing for
+every row), this writes each chunk of rows with a handful of bulk queries:
+the users, their PhoneNumber and EmailAddress rows and their group
+memberships. Passwords are left unusable, customers set them through the
+confirmation flow. The customers_imported signal is sent once at the end.
+"""
+import logging
+
+from django.contrib.auth.models import Group
+from django.db import transaction
+from django.db.models.functions import Lower
+
+from project.utils.phones import normalize_phone
+from .models import EmailAddress, PhoneNumber, User, UserCredential
+from .signals import customers_imported
+from .utils import credential_identifiers
+
+logger = logging.getLogger(__name__)
+
+CUSTOMER_GROUP = 'cliente'
+
+# Accepted column names for each User field
+COLUMNS = {
+    'first_name': ('first_name', 'nome'),
+    'last_name': ('last_name', 'sobrenome'),
+    'phone': ('phone', 'telefone', 'whatsapp', 'celular'),
+    'email': ('email', 'e-mail'),
+}
+
+
+def read_row(row):
+    "{field: value} from a row using any of the accepted column names"
+    lowered = {str(key).strip().lower(): value for key, value in row.items()}
+    data = {}
+    for field, names in COLUMNS.items():
+        for name in names:
+            value = lowered.get(name)
+            if value not in (None, ''):
+                data[field] = str(value).strip()
+                break
+    return data
+
+
+def build_user(data):
+    "Unsaved User for a row, or None if it has no valid phone or email"
+    phone = normalize_phone(data.get('phone')).e164
+    email = User.objects.normalize_email(data.get('email')) or None
+    if email:
+        email = email.lower()
+    if not phone and not email:
+        return None
+
+    user = User(
+        first_name=data.get('first_name', '')[:32],
+        last_name=data.get('last_name', '')[:32],
+        phone=phone,
+        email=email,
+    )
+    user.set_unusable_password()
+    return user
+
+
+def import_customers(rows, chunk_size=1000):
+    """
+    Create customers from an iterable of dicts (e.g. a tablib Dataset's
+    ``dict``). Rows without a valid phone or email, or whose phone or email
+    already belongs to someone (as a login credential or as a secondary
+    PhoneNumber/EmailAddress), are skipped. Returns (created, skipped).
+    """
+    group, created = Group.objects.get_or_create(name=CUSTOMER_GROUP)
+    created_ids = []
+    skipped = 0
+    seen = set()
+
+    chunk = []
+    for row in rows:
+        user = build_user(read_row(row))
+        if user is None:
+            skipped += 1
+            continue
+        credentials = {value for value in (user.phone, user.email) if value}
+        if credentials & seen:
+            skipped += 1
+            continue
+        seen |= credentials
+        chunk.append(user)
+        if len(chunk) >= chunk_size:
+            skipped += _import_chunk(chunk, group, created_ids)
+            chunk = []
+    if chunk:
+        skipped += _import_chunk(chunk, group, created_ids)
+
+    if created_ids:
+        customers_imported.send(sender=User, user_ids=created_ids)
+    logger.info('Imported %s customers, skipped %s rows', len(created_ids), skipped)
+    return len(created_ids), skipped
+
+
+def _import_chunk(users, group, created_ids):
+    # Unsaved model instances aren't hashable, so the identifiers are kept in a list
+    identifiers = [credential_identifiers(user.phone, user.email) for user in users]
+    phones = {identifier for user_identifiers in identifiers for identifier, kind in user_identifiers.items()
+              if kind == 'phone'}
+    emails = {identifier for user_identifiers in identifiers for identifier, kind in user_identifiers.items()
+              if kind == 'email'}
+
+    # Login credentials of other users, and their secondary phones and emails
+    existing = set(UserCredential.objects.filter(identifier__in=phones | emails).values_list('identifier', flat=True))
+    existing.update(str(phone) for phone in PhoneNumber.objects.filter(phone__in=phones).values_list('phone', flat=True))
+    existing.update(
+        EmailAddress.objects.annotate(email_lower=Lower('email'))
+        .filter(email_lower__in=emails).values_list('email_lower', flat=True)
+    )
+    new_users = [user for user, user_identifiers in zip(users, identifiers) if not user_identifiers.keys() & existing]
+
+    with transaction.atomic():
+        # UserQuerySet.bulk_create() derives the usernames in memory and registers the credentials
+        new_users = User.objects.bulk_create(new_users)
+        PhoneNumber.objects.bulk_create([
+            PhoneNumber(user=user, phone=user.phone, key=PhoneNumber.objects.generate_key(user))
+            for user in new_users if user.phone
+        ])
+        EmailAddress.objects.bulk_create([
+            EmailAddress(user=user, email=user.email, key=EmailAddress.objects.generate_key(user))
+            for user in new_users if user.email
+        ])
+        User.groups.through.objects.bulk_create([
+            User.groups.through(user_id=user.pk, group_id=group.pk) for user in new_users
+        ])
+
+    created_ids.extend(user.pk for user in new_users)
+    return len(users) - len(new_users)
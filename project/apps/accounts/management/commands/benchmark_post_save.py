@@ -0,0 +1,49 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db.models.signals import post_save
+
+from project.apps.places.models import City
+
+
+def unscoped_auto_add(sender, **kwargs):
+    # What every post_save used to run before auto_add was bound to the User model
+    if sender == get_user_model() and kwargs['created'] and not kwargs['raw']:
+        pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Mede o custo do envio do sinal post_save de um modelo qualquer (City), '
+        'com os receivers atuais e com os antigos receivers auto_add sem sender. '
+        'Não grava nada no banco.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=100000)
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        instance = City(name='benchmark')
+
+        current = self.measure(instance, iterations)
+        for uid in ('benchmark_unscoped_phone', 'benchmark_unscoped_email'):
+            post_save.connect(unscoped_auto_add, dispatch_uid=uid)
+        try:
+            unscoped = self.measure(instance, iterations)
+        finally:
+            for uid in ('benchmark_unscoped_phone', 'benchmark_unscoped_email'):
+                post_save.disconnect(dispatch_uid=uid)
+
+        self.stdout.write(f'Receivers atuais:      {current:.2f} µs por save')
+        self.stdout.write(f'auto_add sem sender:   {unscoped:.2f} µs por save')
+        self.stdout.write(self.style.SUCCESS(f'Diferença:             {unscoped - current:.2f} µs por save'))
+
+    def measure(self, instance, iterations):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            post_save.send(
+                sender=City, instance=instance, created=False, update_fields=None, raw=False, using='default',
+            )
+        return (time.perf_counter() - started) / iterations * 1e6
@@ -0,0 +1,31 @@
+import os
+
+import tablib
+from django.core.management.base import BaseCommand, CommandError
+
+from project.apps.accounts.importers import import_customers
+
+
+class Command(BaseCommand):
+    help = (
+        'Importa clientes em massa de uma planilha (CSV ou XLSX) com as colunas '
+        'nome, sobrenome, telefone e email. Telefones e emails já cadastrados são ignorados.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Arquivo CSV ou XLSX.')
+        parser.add_argument('--format', help='csv ou xlsx (padrão: a extensão do arquivo).')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Clientes gravados por lote.')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or os.path.splitext(path)[1].lstrip('.').lower()
+        if file_format not in ('csv', 'xlsx'):
+            raise CommandError(f'Formato não suportado: {file_format}')
+
+        mode = 'r' if file_format == 'csv' else 'rb'
+        with open(path, mode) as f:
+            dataset = tablib.Dataset().load(f.read(), format=file_format)
+
+        created, skipped = import_customers(dataset.dict, chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'{created} cliente(s) importado(s), {skipped} linha(s) ignorada(s).'))
@@ -1,11 +1,93 @@
 from django.contrib.auth.base_user import BaseUserManager
+from django.db import models, transaction
 from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
-from phonenumber_field.phonenumber import PhoneNumber
-from phonenumber_field.validators import validate_international_phonenumber
 
+from project.utils.phones import validate_phone
 
-class UserManager(BaseUserManager):
+
+class UserQuerySet(models.QuerySet):
+    def with_credentials(self):
+        """
+        Prefetch the phone numbers and email addresses of the users (two
+        queries in total), so the confirmed/unconfirmed phone and email
+        accessors of each user don't query the database.
+        """
+        return self.prefetch_related('phone_number_set', 'email_address_set')
+
+    def bulk_create(self, objs, *args, **kwargs):
+        """
+        Like QuerySet.bulk_create(), deriving the usernames and display fields
+        in memory first and registering the credentials of the new users
+        """
+        from .models import UserCredential
+
+        objs = list(objs)
+        for obj in objs:
+            obj.prepare_credentials()
+            obj.update_display_fields()
+        with transaction.atomic(using=self.db):
+            objs = super().bulk_create(objs, *args, **kwargs)
+            UserCredential.objects.sync([obj for obj in objs if obj.pk is not None])
+        return objs
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        "Like QuerySet.bulk_update(), keeping the credential and display fields consistent"
+        from .models import CREDENTIAL_FIELDS, DISPLAY_FIELDS, DISPLAY_SOURCE_FIELDS
+
+        objs = list(objs)
+        fields = set(fields)
+        if CREDENTIAL_FIELDS & fields:
+            for obj in objs:
+                obj.prepare_credentials()
+            fields |= CREDENTIAL_FIELDS
+        if DISPLAY_SOURCE_FIELDS & fields:
+            for obj in objs:
+                obj.update_display_fields()
+            fields |= DISPLAY_FIELDS
+        if not CREDENTIAL_FIELDS & fields:
+            return super().bulk_update(objs, list(fields), *args, **kwargs)
+
+        from .models import UserCredential
+        with transaction.atomic(using=self.db):
+            updated = super().bulk_update(objs, list(fields), *args, **kwargs)
+            UserCredential.objects.sync(objs)
+        return updated
+
+
+class UserCredentialManager(models.Manager):
+    def sync(self, users):
+        """
+        Make the registry match the phone and email of ``users``: stale
+        identifiers are deleted and missing ones inserted, in two queries
+        plus the insert. If another user holds one of the identifiers the
+        unique index makes the insert fail with IntegrityError, so call it
+        inside the transaction that saves the users.
+        """
+        from .utils import credential_identifiers
+
+        wanted = {}
+        for user in users:
+            for identifier, kind in credential_identifiers(user.phone, user.email).items():
+                wanted[(user.pk, identifier)] = kind
+
+        existing = set()
+        stale = []
+        rows = self.filter(user_id__in=[user.pk for user in users]).values_list('pk', 'user_id', 'identifier')
+        for pk, user_id, identifier in rows:
+            if (user_id, identifier) in wanted:
+                existing.add((user_id, identifier))
+            else:
+                stale.append(pk)
+        if stale:
+            self.filter(pk__in=stale).delete()
+        self.bulk_create([
+            self.model(user_id=user_id, identifier=identifier, kind=kind)
+            for (user_id, identifier), kind in wanted.items() if (user_id, identifier) not in existing
+        ])
+
+
+class UserManager(BaseUserManager.from_queryset(UserQuerySet)):
     use_in_migrations = True
 
     def _create_user(self, username, password,
@@ -17,7 +99,7 @@ class UserManager(BaseUserManager):
         :param bool is_superuser: whether user admin or not
         :return settings.AUTH_USER_MODEL user: user
         :raise ValueError: email or phone is not set
-        :raise NumberParseException: phone does not have correct format
+        :raise ValidationError: phone is not valid
         """
         if not username:
             raise ValueError(_('The given username must be set'))
@@ -26,7 +108,7 @@ class UserManager(BaseUserManager):
             username = self.normalize_email(username)
             username, email, phone = (username, username, "")
         else:
-            username = PhoneNumber.from_string(username).as_e164
+            username = validate_phone(username).e164
             username, email, phone = (username, "", username)
 
         now = timezone.now()
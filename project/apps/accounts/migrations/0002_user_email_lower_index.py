@@ -0,0 +1,18 @@
+# Generated by Django 3.2.4 on 2026-10-18 12:00
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(django.db.models.functions.text.Lower('email'), name='accounts_user_email_lower'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 3.2.4 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_user_email_lower_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='email_confirmed',
+            field=models.BooleanField(db_index=True, default=False, editable=False, verbose_name='email confirmado'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='phone_confirmed',
+            field=models.BooleanField(db_index=True, default=False, editable=False, verbose_name='telefone confirmado'),
+        ),
+        migrations.RunSQL(
+            sql='''
+                UPDATE accounts_user u SET
+                    phone_confirmed = EXISTS (
+                        SELECT 1 FROM accounts_phonenumber p
+                        WHERE p.user_id = u.id AND p.phone = u.phone AND p.confirmed_at IS NOT NULL
+                    ),
+                    email_confirmed = EXISTS (
+                        SELECT 1 FROM accounts_emailaddress e
+                        WHERE e.user_id = u.id AND e.email = u.email AND e.confirmed_at IS NOT NULL
+                    )
+            ''',
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 3.2.4 on 2026-10-18 12:00
+
+import phonenumbers
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Frozen copy of project.apps.accounts.utils.display_fields() as of this migration,
+# so later changes to the app code don't change what the migration does
+
+def national_phone(phone):
+    try:
+        number = phonenumbers.parse(str(phone), getattr(settings, 'PHONENUMBER_DEFAULT_REGION', None))
+    except phonenumbers.NumberParseException:
+        return None
+    if not phonenumbers.is_valid_number(number):
+        return None
+    return phonenumbers.format_number(number, phonenumbers.PhoneNumberFormat.NATIONAL)
+
+
+def display_fields(first_name, last_name, phone, email):
+    phone_national = (national_phone(phone) or str(phone)) if phone else ''
+    name = ' '.join(part for part in (first_name, last_name) if part)
+    if name:
+        display_name = f'{name} • {phone_national}' if phone_national else name
+    else:
+        display_name = phone_national or email or ''
+    return display_name, phone_national
+
+
+def fill_display_fields(apps, schema_editor):
+    User = apps.get_model('accounts', 'User')
+    queryset = User.objects.only('pk', 'first_name', 'last_name', 'phone', 'email').order_by('pk')
+    last_pk = 0
+    while True:
+        chunk = list(queryset.filter(pk__gt=last_pk)[:2000])
+        if not chunk:
+            break
+        for user in chunk:
+            user.display_name, user.phone_national = display_fields(user.first_name, user.last_name, user.phone, user.email)
+        User.objects.bulk_update(chunk, ['display_name', 'phone_national'])
+        last_pk = chunk[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_user_confirmation_flags'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='display_name',
+            field=models.CharField(blank=True, editable=False, help_text='Nome e telefone, atualizado automaticamente', max_length=320, verbose_name='nome de exibição'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='phone_national',
+            field=models.CharField(blank=True, editable=False, max_length=32, verbose_name='telefone (formato nacional)'),
+        ),
+        migrations.RunPython(fill_display_fields, migrations.RunPython.noop),
+    ]
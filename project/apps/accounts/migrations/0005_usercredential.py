@@ -0,0 +1,64 @@
+# Generated by Django 3.2.4 on 2026-10-18 12:00
+
+import logging
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+logger = logging.getLogger(__name__)
+
+
+def report_conflicts(apps, schema_editor):
+    """
+    Users whose email is registered by another account (same email in a
+    different case) were left out of the backfill. Their email must be
+    changed by hand: until then the forms refuse it as taken and changing
+    their other credential fails.
+    """
+    User = apps.get_model('accounts', 'User')
+    conflicts = (
+        User.objects.exclude(email=None).exclude(email='')
+        .exclude(credentials__kind='email')
+        .order_by('pk').values_list('pk', 'email')
+    )
+    for pk, email in conflicts.iterator():
+        logger.warning('accounts.User %s: the email %s is already registered by another account', pk, email)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_user_display_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserCredential',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('identifier', models.CharField(max_length=254, unique=True, verbose_name='credencial')),
+                ('kind', models.CharField(choices=[('phone', 'Telefone'), ('email', 'Email')], max_length=5, verbose_name='tipo')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='credentials', to=settings.AUTH_USER_MODEL, verbose_name='usuário')),
+            ],
+            options={
+                'verbose_name': 'Credencial',
+                'verbose_name_plural': 'Credenciais',
+            },
+        ),
+        # Phones are stored in E.164 already. If two accounts share an email
+        # differing only in case, the oldest one keeps it and the others are
+        # reported by report_conflicts().
+        migrations.RunSQL(
+            sql='''
+                INSERT INTO accounts_usercredential (identifier, kind, user_id)
+                SELECT phone, 'phone', id FROM accounts_user WHERE phone IS NOT NULL AND phone <> ''
+                UNION ALL
+                SELECT lower(trim(email)), 'email', id FROM accounts_user WHERE email IS NOT NULL AND email <> ''
+                ORDER BY 3
+                ON CONFLICT (identifier) DO NOTHING
+            ''',
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.RunPython(report_conflicts, migrations.RunPython.noop),
+    ]
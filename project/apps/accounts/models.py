@@ -1,16 +1,27 @@
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import validate_email
 from django.db.models import ProtectedError
+from django.db.models.functions import Lower
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from phonenumber_field.modelfields import PhoneNumberField
 from phonenumber_field.validators import validate_international_phonenumber
 from project.utils.phone_confirmation.models import SimplePhoneConfirmationUserMixin, AbstractPhoneNumber
 from project.utils.email_confirmation.models import SimpleEmailConfirmationUserMixin, AbstractEmailAddress
-from project.utils import whatsapp
-from .managers import UserManager
+from project.utils import failover
+from .utils import display_fields
+from .managers import UserCredentialManager, UserManager
+
+
+# Fields kept consistent by User.prepare_credentials()
+CREDENTIAL_FIELDS = frozenset(['username', 'phone', 'email'])
+# Stored by User.update_display_fields(), from DISPLAY_SOURCE_FIELDS
+DISPLAY_FIELDS = frozenset(['display_name', 'phone_national'])
+DISPLAY_SOURCE_FIELDS = frozenset(['first_name', 'last_name', 'phone', 'email'])
+# Only written by update_phone_confirmed()/update_email_confirmed(), never by a full save()
+CONFIRMATION_FIELDS = frozenset(['phone_confirmed', 'email_confirmed'])
 
 
 def validate_username(value):
@@ -50,7 +61,11 @@ class User( SimpleEmailConfirmationUserMixin, SimplePhoneConfirmationUserMixin,
 
     phone = PhoneNumberField(_('número de telefone'), blank=True, null=True, unique=True)
     email = models.EmailField(_('endereço de email'), null=True, blank=True, unique=True)
-    # email_confirmed = models.BooleanField(default=False)
+    phone_confirmed = models.BooleanField(_('telefone confirmado'), default=False, db_index=True, editable=False)
+    email_confirmed = models.BooleanField(_('email confirmado'), default=False, db_index=True, editable=False)
+    display_name = models.CharField(_('nome de exibição'), max_length=320, blank=True, editable=False,
+                                    help_text=_('Nome e telefone, atualizado automaticamente'))
+    phone_national = models.CharField(_('telefone (formato nacional)'), max_length=32, blank=True, editable=False)
 
     cpf = models.CharField(_('CPF').upper(), validators=[], max_length=16, null=True, blank=True, )#unique=True, )
 
@@ -77,26 +92,29 @@ class User( SimpleEmailConfirmationUserMixin, SimplePhoneConfirmationUserMixin,
 
     USERNAME_FIELD = 'username'
 
+    phone_confirmed_field_name = 'phone_confirmed'
+    email_confirmed_field_name = 'email_confirmed'
+
     class Meta:
         verbose_name = _('usuário')
         verbose_name_plural = _('usuários')
         ordering = ('first_name',)
+        indexes = [
+            # Case insensitive email lookups at login (see backends.CustomAuthBackend)
+            models.Index(Lower('email'), name='accounts_user_email_lower'),
+        ]
 
     def __str__(self):
-        verbose_phone =''
-        if self.phone:
-            verbose_phone = f' • {str(self.phone.as_national)}'
-        if self.first_name:
-            if self.last_name:
-                return f'{self.first_name} {self.last_name}{verbose_phone}'
-            else:
-                return f'{self.first_name}{verbose_phone}'
-        elif self.phone:
-            return str(self.phone.as_national)
-        elif self.email:
-            return self.email
-        else:
-            return f"<id: {self.pk}>"
+        return self.display_name or display_fields(self.first_name, self.last_name, self.phone, self.email)[0] \
+            or f"<id: {self.pk}>"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Keep the loaded credentials, so the confirmation flags are only refreshed when they change
+        if 'phone' in field_names and 'email' in field_names:
+            instance._loaded_credentials = (values[field_names.index('phone')], values[field_names.index('email')])
+        return instance
 
     def save(self, *args, **kwargs):
         # Empty strings are not unique, but we can save multiple NULLs
@@ -112,17 +130,41 @@ class User( SimpleEmailConfirmationUserMixin, SimplePhoneConfirmationUserMixin,
         #             setattr(self, field.name, None)
 
         # The above snippet was causing problems with users with unset password,
-        # so I did the same only to the fields that matter:
-        if self.phone is not None and str(self.phone).strip() == '':
-            self.phone = None
-
-        if self.email is not None and str(self.email).strip() == '':
-            self.email = None
-
-        self.get_new_username() # Atualiza o username para qualquer atualização de email ou telefone, nessa ordem.
-        self.assign_username_data()
-
-        super().save(*args, **kwargs)  # Call the "real" save() method.
+        # so I did the same only to the fields that matter (see prepare_credentials()).
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None:
+            self.prepare_credentials()
+            self.update_display_fields()
+            if not self._state.adding and not kwargs.get('force_insert'):
+                # An instance loaded before a confirmation would otherwise write the old flags back
+                deferred = self.get_deferred_fields()
+                kwargs['update_fields'] = [
+                    field.name for field in self._meta.concrete_fields
+                    if not field.primary_key and field.name not in CONFIRMATION_FIELDS
+                    and field.attname not in deferred
+                ]
+        else:
+            update_fields = set(update_fields)
+            if CREDENTIAL_FIELDS & update_fields:
+                self.prepare_credentials()
+                update_fields |= CREDENTIAL_FIELDS
+            if DISPLAY_SOURCE_FIELDS & update_fields:
+                self.update_display_fields()
+                update_fields |= DISPLAY_FIELDS
+            kwargs['update_fields'] = update_fields
+
+        adding = self._state.adding
+        credentials = (self.phone, self.email)
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)  # Call the "real" save() method.
+
+            if adding or credentials != getattr(self, '_loaded_credentials', None):
+                # Fails with IntegrityError, rolling the save back, if another user took the credentials meanwhile
+                UserCredential.objects.sync([self])
+                if not adding:
+                    self.update_phone_confirmed()
+                    self.update_email_confirmed()
+        self._loaded_credentials = credentials
 
     # def get_absolute_url(self):
     #     from django.urls import reverse
@@ -151,7 +193,8 @@ class User( SimpleEmailConfirmationUserMixin, SimplePhoneConfirmationUserMixin,
         """Send a whatsapp to this user."""
         subject = f'*{subject}*'
         message = subject + message
-        whatsapp.send_message(self.phone, message, type='text', timeout=5)
+        # Falls back to the other providers when z-API is down (see settings.MESSAGING_FAILOVER)
+        failover.send_text(self.phone, message, chain='whatsapp')
 
     # def sms_user # TODO: If needed, as chosen by user in signup form
 
@@ -165,15 +208,29 @@ class User( SimpleEmailConfirmationUserMixin, SimplePhoneConfirmationUserMixin,
     get_full_name.admin_order_field = 'first_name'
     full_name = property(get_full_name)
 
+    def prepare_credentials(self):
+        """
+        Normalize phone and email and derive the username from them, in memory.
+        Used by save() and by the bulk paths of UserQuerySet.
+        """
+        if self.phone is not None and str(self.phone).strip() == '':
+            self.phone = None
+
+        if self.email is not None and str(self.email).strip() == '':
+            self.email = None
+
+        self.get_new_username() # Atualiza o username para qualquer atualização de email ou telefone, nessa ordem.
+        self.assign_username_data()
+
+    def update_display_fields(self):
+        "Refresh display_name and phone_national, in memory"
+        self.display_name, self.phone_national = display_fields(self.first_name, self.last_name, self.phone, self.email)
+
     def get_new_username(self):
         if self.phone:  # Atualiza o username para toda atualização de telefone.
-            mystring = str(self.phone)
-            self.username = mystring
-            User.objects.filter(id=self.pk).update(username=mystring)
+            self.username = str(self.phone)
         elif self.email: # Atualiza o username para toda atualização de email, sendo que telefone prevalesce.
-            mystring = self.email
-            self.username = mystring
-            User.objects.filter(id=self.pk).update(username=mystring)
+            self.username = self.email
             # self.assign_unconfirmed_email()
 
     def assign_username_data(self):
@@ -184,6 +241,35 @@ class User( SimpleEmailConfirmationUserMixin, SimplePhoneConfirmationUserMixin,
                 self.phone = self.username
 
 
+class UserCredential(models.Model):
+    """
+    Registry of the normalized login credentials (lowercased email and E.164
+    phone) of every user. Its unique index answers "is this credential taken?"
+    with a single index probe and enforces it under concurrent signups.
+    Maintained by User.save() and the bulk paths of UserQuerySet.
+    """
+    PHONE = 'phone'
+    EMAIL = 'email'
+    KIND_CHOICES = [
+        (PHONE, _('Telefone')),
+        (EMAIL, _('Email')),
+    ]
+
+    identifier = models.CharField(_('credencial'), max_length=254, unique=True)
+    kind = models.CharField(_('tipo'), max_length=5, choices=KIND_CHOICES)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='credentials',
+                             verbose_name=_('usuário'))
+
+    objects = UserCredentialManager()
+
+    class Meta:
+        verbose_name = _('Credencial')
+        verbose_name_plural = _('Credenciais')
+
+    def __str__(self):
+        return self.identifier
+
+
 class PhoneNumber(AbstractPhoneNumber):
     class Meta(AbstractPhoneNumber.Meta):
         swappable = 'SIMPLE_PHONE_CONFIRMATION_PHONE_NUMBER_MODEL'
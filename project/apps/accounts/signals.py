@@ -1,8 +1,20 @@
-from django.dispatch import receiver
-from django.db.models.signals import post_save, pre_save
+from django.conf import settings
+from django.dispatch import Signal
+from django.db.models.signals import post_save
 
-from apps.accounts.models import User
-from apps.places.models import Address
+from project.apps.accounts.models import User
+from project.utils.email_confirmation.models import auto_add as auto_add_email
+from project.utils.phone_confirmation.models import auto_add as auto_add_phone
+
+# Sent once at the end of importers.import_customers(), with the ids of the created users (user_ids)
+customers_imported = Signal()
+
+# Bound to User only, so saving any other model doesn't pay for these receivers
+if getattr(settings, 'SIMPLE_PHONE_CONFIRMATION_AUTO_ADD', True):
+    post_save.connect(auto_add_phone, sender=User, dispatch_uid='auto_add_phone')
+
+if getattr(settings, 'SIMPLE_EMAIL_CONFIRMATION_AUTO_ADD', True):
+    post_save.connect(auto_add_email, sender=User, dispatch_uid='auto_add_email')
 
 
 # @receiver(pre_save, sender=Address)
@@ -0,0 +1,45 @@
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+
+from project.apps.accounts.backends import CustomAuthBackend, EmailAuthBackend
+
+User = get_user_model()
+
+
+class CustomAuthBackendTests(TestCase):
+    def setUp(self):
+        self.backend = CustomAuthBackend()
+        self.user = User.objects.create_user('maria@example.com', 's3cret')
+        User.objects.filter(pk=self.user.pk).update(email_confirmed=True)
+
+    def authenticate(self, username, password='s3cret'):
+        return self.backend.authenticate(None, username=username, password=password)
+
+    def test_email_is_case_insensitive(self):
+        self.assertEqual(self.authenticate(' Maria@Example.COM '), self.user)
+
+    def test_phone_in_any_format(self):
+        user = User.objects.create_user('+5543988887777', 's3cret')
+        User.objects.filter(pk=user.pk).update(phone_confirmed=True)
+        self.assertEqual(self.authenticate('+55 (43) 98888-7777'), user)
+
+    def test_wrong_password(self):
+        self.assertIsNone(self.authenticate('maria@example.com', 'wrong'))
+
+    def test_unknown_or_invalid_credential(self):
+        self.assertIsNone(self.authenticate('joao@example.com'))
+        self.assertIsNone(self.authenticate('not a phone'))
+
+    def test_unconfirmed_credential(self):
+        User.objects.filter(pk=self.user.pk).update(email_confirmed=False)
+        with self.assertRaises(ValidationError):
+            self.authenticate('maria@example.com')
+
+
+class EmailAuthBackendTests(TestCase):
+    def test_email_is_case_insensitive(self):
+        user = User.objects.create_user('maria@example.com', 's3cret')
+        User.objects.filter(pk=user.pk).update(email_confirmed=True)
+        authenticated = EmailAuthBackend().authenticate(None, username='MARIA@example.com', password='s3cret')
+        self.assertEqual(authenticated, user)
@@ -0,0 +1,78 @@
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+
+from project.apps.accounts.forms import SignUpForm, validate_credential_available
+from project.apps.accounts.models import UserCredential
+
+User = get_user_model()
+
+
+def identifiers(user):
+    return set(user.credentials.values_list('identifier', flat=True))
+
+
+class CredentialRegistryTests(TestCase):
+    def test_save_registers_normalized_credentials(self):
+        user = User(first_name='Maria', phone='+55 43 98888-7777', email='Maria@Example.com')
+        user.save()
+        self.assertEqual(identifiers(user), {'+5543988887777', 'maria@example.com'})
+
+    def test_changing_a_credential_replaces_it(self):
+        user = User.objects.create_user('maria@example.com', 's3cret')
+        user.email = 'maria.silva@example.com'
+        user.save()
+        self.assertEqual(identifiers(user), {'maria.silva@example.com'})
+        self.assertFalse(UserCredential.objects.filter(identifier='maria@example.com').exists())
+
+    def test_rejects_case_variant_duplicates(self):
+        User.objects.create_user('maria@example.com', 's3cret')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            User.objects.create_user('MARIA@example.com', 's3cret')
+        # The user row was rolled back with the credential
+        self.assertEqual(User.objects.count(), 1)
+
+    def test_bulk_create_registers_credentials(self):
+        users = User.objects.bulk_create([User(phone='+5543988887777'), User(email='joao@example.com')])
+        self.assertEqual(
+            set(UserCredential.objects.values_list('identifier', 'user_id')),
+            {('+5543988887777', users[0].pk), ('joao@example.com', users[1].pk)},
+        )
+
+    def test_deleting_the_user_frees_its_credentials(self):
+        user = User.objects.create_user('maria@example.com', 's3cret')
+        user.delete()
+        self.assertFalse(UserCredential.objects.exists())
+
+
+class CredentialFormTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('maria@example.com', 's3cret')
+
+    def test_signup_refuses_a_case_variant_email(self):
+        form = SignUpForm(data={'username': 'Maria@Example.com'})
+        self.assertFalse(form.is_valid())
+        self.assertEqual(form.errors.as_data()['username'][0].code, 'unique')
+
+    def test_own_credentials_are_available(self):
+        validate_credential_available('MARIA@example.com', self.user)
+
+    def test_other_users_credentials_are_not_available(self):
+        other = User.objects.create_user('joao@example.com', 's3cret')
+        with self.assertRaises(ValidationError):
+            validate_credential_available('MARIA@example.com', other)
+
+
+class ConfirmationFlagTests(TestCase):
+    def test_full_save_keeps_flags_set_meanwhile(self):
+        user = User.objects.create_user('maria@example.com', 's3cret')
+        stale = User.objects.get(pk=user.pk)
+        User.objects.filter(pk=user.pk).update(email_confirmed=True)
+
+        stale.first_name = 'Maria'
+        stale.save()
+
+        user.refresh_from_db()
+        self.assertTrue(user.email_confirmed)
+        self.assertEqual(user.first_name, 'Maria')
@@ -0,0 +1,32 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+from project.apps.accounts.utils import display_fields
+
+User = get_user_model()
+
+
+@override_settings(PHONENUMBER_DEFAULT_REGION='BR')
+class DisplayFieldsTests(TestCase):
+    def test_name_and_phone(self):
+        self.assertEqual(
+            display_fields('Maria', 'Silva', '+5543988887777', 'maria@example.com'),
+            ('Maria Silva • (43) 98888-7777', '(43) 98888-7777'),
+        )
+
+    def test_without_a_name(self):
+        self.assertEqual(display_fields('', '', '+5543988887777', ''), ('(43) 98888-7777', '(43) 98888-7777'))
+        self.assertEqual(display_fields('', None, '', 'maria@example.com'), ('maria@example.com', ''))
+
+    def test_save_keeps_them_up_to_date(self):
+        user = User.objects.create_user('+5543988887777', 's3cret')
+        user.first_name = 'Maria'
+        user.save()
+        user.refresh_from_db()
+        self.assertEqual(user.display_name, 'Maria • (43) 98888-7777')
+
+        user.phone = '+5543977776666'
+        user.save(update_fields=['phone'])
+        user.refresh_from_db()
+        self.assertEqual(user.phone_national, '(43) 97777-6666')
+        self.assertEqual(user.display_name, 'Maria • (43) 97777-6666')
@@ -0,0 +1,52 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from project.apps.accounts.importers import CUSTOMER_GROUP, import_customers
+from project.apps.accounts.models import EmailAddress, PhoneNumber, UserCredential
+
+User = get_user_model()
+
+
+class ImportCustomersTests(TestCase):
+    def test_creates_customers(self):
+        created, skipped = import_customers([
+            {'Nome': 'Maria', 'Telefone': '+55 43 98888-7777', 'Email': 'Maria@Example.com'},
+            {'nome': 'João', 'e-mail': 'joao@example.com'},
+        ])
+        self.assertEqual((created, skipped), (2, 0))
+
+        maria = User.objects.get(phone='+5543988887777')
+        self.assertEqual(maria.first_name, 'Maria')
+        self.assertEqual(maria.email, 'maria@example.com')
+        self.assertEqual(maria.username, '+5543988887777')
+        self.assertTrue(maria.groups.filter(name=CUSTOMER_GROUP).exists())
+        self.assertTrue(PhoneNumber.objects.filter(user=maria, phone='+5543988887777').exists())
+        self.assertTrue(EmailAddress.objects.filter(user=maria, email='maria@example.com').exists())
+        self.assertEqual(UserCredential.objects.count(), 3)
+
+    def test_skips_rows_without_credentials_and_repeated_rows(self):
+        created, skipped = import_customers([
+            {'nome': 'Sem contato'},
+            {'telefone': 'abc'},
+            {'email': 'maria@example.com'},
+            {'email': 'maria@example.com'},
+        ], chunk_size=2)
+        self.assertEqual((created, skipped), (1, 3))
+
+    def test_skips_existing_credentials_in_any_case(self):
+        User.objects.create_user('maria@example.com', 's3cret')
+        created, skipped = import_customers([{'email': 'MARIA@example.com'}])
+        self.assertEqual((created, skipped), (0, 1))
+
+    def test_skips_secondary_phones_and_emails(self):
+        user = User.objects.create_user('maria@example.com', 's3cret')
+        PhoneNumber.objects.create(user=user, phone='+5543988887777', key=PhoneNumber.objects.generate_key(user))
+        EmailAddress.objects.create(user=user, email='Maria.Silva@example.com',
+                                    key=EmailAddress.objects.generate_key(user))
+
+        created, skipped = import_customers([
+            {'telefone': '+5543988887777'},
+            {'email': 'maria.silva@example.com'},
+            {'telefone': '+5543977776666'},
+        ])
+        self.assertEqual((created, skipped), (1, 2))
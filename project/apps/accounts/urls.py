@@ -36,5 +36,6 @@ urlpatterns = [
     path('senha/recuperar/concluido/', auth_views.PasswordResetCompleteView.as_view(template_name='registration/pwd_reset_complete.html'), name='pwd_reset_complete'),
 
     # path('user-tag-autocomplete/', accounts.UserTagAutocomplete.as_view(), name='user-tag-autocomplete',),
+    path('usuarios/autocomplete/', accounts.UserAutocomplete.as_view(), name='user-autocomplete'),
 
 ]
@@ -0,0 +1,37 @@
+from project.utils.phones import normalize_phone
+
+
+def display_fields(first_name, last_name, phone, email):
+    """
+    (display_name, phone_national) stored on User: the name followed by the
+    national phone, like 'Maria Silva • (43) 99999-9999', or just the phone
+    or the email when there is no name.
+    """
+    phone_national = (normalize_phone(phone).national or str(phone)) if phone else ''
+    name = ' '.join(part for part in (first_name, last_name) if part)
+    if name:
+        display_name = f'{name} • {phone_national}' if phone_national else name
+    else:
+        display_name = phone_national or email or ''
+    return display_name, phone_national
+
+
+def credential_identifier(value):
+    """
+    Normalized form of a login credential, as kept in UserCredential:
+    the lowercased email or the E.164 phone.
+    """
+    value = str(value).strip()
+    if '@' in value:
+        return value.lower()
+    return normalize_phone(value).e164 or value
+
+
+def credential_identifiers(phone, email):
+    "{identifier: kind} of the phone and email of a user"
+    identifiers = {}
+    if phone:
+        identifiers[credential_identifier(phone)] = 'phone'
+    if email:
+        identifiers[credential_identifier(email)] = 'email'
+    return identifiers
@@ -7,6 +7,8 @@ from django.contrib.auth.hashers import make_password
 from django.contrib.auth.mixins import PermissionRequiredMixin
 from django.contrib.sites.shortcuts import get_current_site
 from django.core.exceptions import ValidationError
+from django.db import IntegrityError
+from django.db.models import Q
 from django.http import HttpResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.utils.encoding import force_bytes, force_text
@@ -16,7 +18,8 @@ from django.views.decorators.csrf import csrf_protect
 from django.views.generic import DetailView, UpdateView
 from rules.contrib.views import AutoPermissionRequiredMixin
 
-from apps.accounts.forms import SignUpForm, PasswordSetForm, WelcomeForm, ProfileUpdateForm
+from project.apps.messaging.models import OutboundMessage
+from apps.accounts.forms import SignUpForm, PasswordSetForm, WelcomeForm, ProfileUpdateForm, credential_taken_error
 from utils.tokens import phone_activation_token, email_activation_token
 
 
@@ -34,7 +37,12 @@ def signup_view(request):
         if form.is_valid():
             user = form.save(commit=False)
             user.is_active = False
-            user.save()
+            try:
+                user.save()
+            except IntegrityError:
+                # Another signup took the same credential after the form was validated
+                form.add_error('username', credential_taken_error(form.cleaned_data['username']))
+                return render(request, 'accounts/signup.html', {'form': form})
             current_site = get_current_site(request)
 
             if '@' in form.cleaned_data.get('username'):
@@ -50,11 +58,18 @@ def signup_view(request):
                 'token': token, #TODO: Vale a pena / é correto gerar o token ainda no form? Ja viria pra cá resolvido...
             })
 
+            # Sent by the drain_outbox command, so the response doesn't wait on the provider
             if '@' in form.clean_username(): #TODO: diferença pode ser tratada em uma função send_etc()
-                user.email_user(subject, message)
+                OutboundMessage.objects.enqueue(
+                    OutboundMessage.EMAIL, user.email, message, subject=subject, user=user,
+                    idempotency_key=f'activation:{user.pk}:{token}',
+                )
                 return redirect('accounts:activation_email_sent')
             else:
-                user.whatsapp_user(subject, message)
+                OutboundMessage.objects.enqueue(
+                    OutboundMessage.WHATSAPP, user.phone, message, subject=subject, user=user,
+                    idempotency_key=f'activation:{user.pk}:{token}',
+                )
                 return redirect('accounts:activation_whatsapp_sent')
     else:
         form = SignUpForm()
@@ -152,3 +167,28 @@ def change_password(request):
 
     context = {'form': form}
     return render(request, 'accounts/profile/password_change.html', context)
+
+
+class UserAutocomplete(autocomplete.Select2QuerySetView):
+    """
+    Users for select2 widgets (staff only), rendered from the stored
+    display_name with a .values() query, without building User objects.
+    """
+
+    def get_queryset(self):
+        if not self.request.user.is_staff:
+            return User.objects.none()
+
+        qs = User.objects.all()
+        if self.q:
+            qs = qs.filter(Q(display_name__icontains=self.q) | Q(phone_national__icontains=self.q) | Q(email__icontains=self.q))
+        return qs.order_by('display_name').values('pk', 'display_name')
+
+    def get_result_value(self, result):
+        return str(result['pk'])
+
+    def get_result_label(self, result):
+        return result['display_name'] or f"<id: {result['pk']}>"
+
+    def get_selected_result_label(self, result):
+        return self.get_result_label(result)
@@ -0,0 +1,63 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import Broadcast, InboundMessage, OutboundMessage
+
+
+@admin.register(OutboundMessage)
+class OutboundMessageAdmin(admin.ModelAdmin):
+    list_display = ['recipient', 'channel', 'subject', 'status', 'provider', 'attempts', 'next_attempt_at', 'sent_at']
+    list_filter = ['status', 'channel', 'broadcast']
+    search_fields = ['recipient', 'subject', 'idempotency_key']
+    raw_id_fields = ['user']
+    readonly_fields = ['attempts', 'error', 'provider', 'created_at', 'sent_at']
+    actions = ['retry']
+
+    def retry(self, request, queryset):
+        queryset.exclude(status=OutboundMessage.SENT).update(
+            status=OutboundMessage.PENDING, attempts=0, next_attempt_at=timezone.now(),
+        )
+    retry.short_description = 'Enviar novamente'
+
+
+class OutboundMessageInline(admin.TabularInline):
+    model = OutboundMessage
+    fields = ['recipient', 'status', 'attempts', 'sent_at', 'error']
+    readonly_fields = fields
+    extra = 0
+    max_num = 0
+    show_change_link = True
+
+    def get_queryset(self, request):
+        # Broadcasts can have thousands of messages; show the failed ones
+        return super().get_queryset(request).filter(status=OutboundMessage.FAILED)
+
+
+@admin.register(Broadcast)
+class BroadcastAdmin(admin.ModelAdmin):
+    list_display = ['name', 'channel', 'created_at', 'status_counts']
+    list_filter = ['channel']
+    search_fields = ['name', 'key', 'subject']
+    readonly_fields = ['key', 'created_by', 'created_at', 'status_counts']
+    inlines = [OutboundMessageInline]
+
+    def has_add_permission(self, request):
+        # Created by the send_broadcast command, which queues the messages
+        return False
+
+    def status_counts(self, obj):
+        counts = obj.get_status_counts()
+        return ', '.join(f'{label}: {counts.get(status, 0)}' for status, label in OutboundMessage.STATUS_CHOICES)
+    status_counts.short_description = 'mensagens'
+
+
+@admin.register(InboundMessage)
+class InboundMessageAdmin(admin.ModelAdmin):
+    list_display = ['phone', 'provider', 'user', 'received_at', 'processed_at']
+    list_filter = ['provider']
+    search_fields = ['phone']
+    raw_id_fields = ['user']
+    readonly_fields = ['provider', 'phone', 'payload', 'received_at', 'user', 'processed_at']
+
+    def has_add_permission(self, request):
+        return False
@@ -0,0 +1,76 @@
+"""
+Broadcasts: the same message, rendered for each user, queued for many users
+at once. The messages are sent by the drain_outbox command like any other
+OutboundMessage, so creating a broadcast never waits on a provider.
+"""
+from django.db import transaction
+from django.template import Context, engines
+
+from .models import Broadcast, OutboundMessage
+
+# Broadcast messages yield to transactional ones (activation etc.) in the queue
+BROADCAST_PRIORITY = -10
+
+
+def get_recipient(user, channel):
+    if channel == OutboundMessage.EMAIL:
+        return user.email
+    return user.phone and user.phone.as_e164
+
+
+def create_broadcast(users, template, channel, subject='', name='', created_by=None, key=None, batch_size=1000):
+    """
+    Queue one OutboundMessage per user of the ``users`` queryset, with
+    ``template`` (Django template source) rendered with the user as
+    ``{{ user }}``, without HTML autoescaping since the messages are plain
+    text. The template is compiled once; users are read with a
+    server-side cursor and their messages inserted ``batch_size`` at a time.
+    Users without a phone (or email, for the email channel) are skipped.
+
+    With a ``key``, calling it again with the same key resumes the existing
+    broadcast (e.g. after a crash halfway): only the users without a message
+    yet get one. Raises ValueError if the key was used for another message.
+
+    Returns the Broadcast, whose ``messages`` keep each recipient's status.
+    """
+    compiled = engines['django'].engine.from_string(template)
+    fields = {
+        'name': name or subject or template[:128], 'channel': channel, 'subject': subject,
+        'template': template, 'created_by': created_by,
+    }
+    if key is None:
+        broadcast = Broadcast.objects.create(**fields)
+    else:
+        broadcast, created = Broadcast.objects.get_or_create(key=key, defaults=fields)
+        if (broadcast.channel, broadcast.subject, broadcast.template) != (channel, subject, template):
+            raise ValueError(f'The broadcast {key!r} already exists with another message')
+
+    # display_name is what {{ user }} renders (User.__str__)
+    users = users.only('pk', 'first_name', 'last_name', 'phone', 'email', 'display_name').order_by()
+    batch = []
+    for user in users.iterator(chunk_size=batch_size):
+        recipient = get_recipient(user, channel)
+        if not recipient:
+            continue
+        batch.append(OutboundMessage(
+            channel=channel,
+            recipient=recipient,
+            subject=subject,
+            body=compiled.render(Context({'user': user}, autoescape=False)),
+            user=user,
+            broadcast=broadcast,
+            priority=BROADCAST_PRIORITY,
+            idempotency_key=f'broadcast:{broadcast.pk}:{user.pk}',
+        ))
+        if len(batch) >= batch_size:
+            _queue(batch)
+            batch = []
+    if batch:
+        _queue(batch)
+    return broadcast
+
+
+def _queue(messages):
+    with transaction.atomic():
+        OutboundMessage.objects.bulk_create(messages, ignore_conflicts=True)
+
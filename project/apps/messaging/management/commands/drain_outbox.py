@@ -0,0 +1,133 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from project.apps.messaging.models import OutboundMessage, RateLimit
+from project.apps.messaging.outbox import deliver, retry_delay
+from project.utils.failover import RecipientRejected
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        'Envia as mensagens pendentes da fila (OutboundMessage), em paralelo, '
+        'tentando de novo as que falharem com intervalos crescentes. '
+        'Os envios de cada canal respeitam MESSAGING_RATE_LIMITS, somando todos os workers.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--workers', type=int, default=8, help='Envios simultâneos.')
+        parser.add_argument('--sleep', type=float, default=2, help='Segundos de espera quando a fila está vazia.')
+        parser.add_argument('--max-attempts', type=int, default=getattr(settings, 'MESSAGING_MAX_ATTEMPTS', 6))
+        parser.add_argument('--once', action='store_true', help='Processa um único lote e termina.')
+
+    def handle(self, *args, **options):
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            while True:
+                processed = self.process_batch(executor, options['batch_size'], options['max_attempts'])
+                if processed:
+                    self.stdout.write(f'{processed} mensagem(ns) processada(s)')
+                if options['once']:
+                    break
+                if not processed:
+                    time.sleep(options['sleep'])
+
+    def claim(self, batch_size):
+        """
+        Lock a batch of due messages and lease them: their next attempt is
+        pushed MESSAGING_LEASE seconds ahead, so other workers skip them and
+        they are retried if this worker dies while sending.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            messages = list(
+                OutboundMessage.objects.select_for_update(skip_locked=True)
+                .filter(status=OutboundMessage.PENDING, next_attempt_at__lte=now)
+                .order_by('-priority', 'next_attempt_at')[:batch_size]
+            )
+            for message in messages:
+                message.attempts += 1
+                message.next_attempt_at = now + timedelta(seconds=getattr(settings, 'MESSAGING_LEASE', 300))
+            OutboundMessage.objects.bulk_update(messages, ['attempts', 'next_attempt_at'])
+        return messages
+
+    def process_batch(self, executor, batch_size, max_attempts):
+        messages = self.schedule(self.claim(batch_size))
+
+        # Only the provider calls run in the pool. Each result is written back from this thread as soon as
+        # its send returns, so a worker dying mid-batch only leaves the messages still in flight to be resent
+        futures = {executor.submit(self.send, message): message for message in messages}
+        for future in as_completed(futures):
+            self.record(futures[future], *future.result(), max_attempts=max_attempts)
+        return len(messages)
+
+    def schedule(self, messages):
+        """
+        Give each message a send slot (``send_at``) from its channel's shared
+        RateLimit. Messages left without a slot in the next
+        MESSAGING_RATE_HORIZON seconds go back to the queue, due when their
+        channel has room again. Returns the messages to send now.
+        """
+        rates = getattr(settings, 'MESSAGING_RATE_LIMITS', {})
+        horizon = timedelta(seconds=getattr(settings, 'MESSAGING_RATE_HORIZON', 10))
+        channels = {}
+        for message in messages:
+            message.send_at = None
+            channels.setdefault(message.channel, []).append(message)
+
+        scheduled, released = [], []
+        for channel, channel_messages in channels.items():
+            if not rates.get(channel):
+                scheduled += channel_messages
+                continue
+            slots, next_slot_at = RateLimit.objects.reserve(
+                f'outbox:{channel}', rates[channel], len(channel_messages), horizon,
+            )
+            for message, send_at in zip(channel_messages, slots):
+                message.send_at = send_at
+            scheduled += channel_messages[:len(slots)]
+            for message in channel_messages[len(slots):]:
+                # Not tried, so the attempt taken by claim() is given back
+                message.attempts -= 1
+                message.next_attempt_at = max(timezone.now(), next_slot_at - horizon)
+                released.append(message)
+        if released:
+            OutboundMessage.objects.bulk_update(released, ['attempts', 'next_attempt_at'])
+        return scheduled
+
+    def record(self, message, provider, error, permanent, max_attempts):
+        now = timezone.now()
+        if error is None:
+            message.status = OutboundMessage.SENT
+            message.provider = provider
+            message.sent_at = now
+            message.error = ''
+        else:
+            message.error = error
+            if permanent or message.attempts >= max_attempts:
+                message.status = OutboundMessage.FAILED
+            else:
+                message.next_attempt_at = now + retry_delay(message.attempts)
+        message.save(update_fields=['status', 'provider', 'sent_at', 'error', 'next_attempt_at'])
+
+    def send(self, message):
+        if message.send_at is not None:
+            time.sleep(max(0, (message.send_at - timezone.now()).total_seconds()))
+        try:
+            provider = deliver(message)
+        except RecipientRejected as e:
+            # Refused by every provider, retrying won't help
+            logger.info('Message %s was rejected: %s', message.pk, e)
+            return None, str(e), True
+        except Exception as e:
+            logger.warning('Sending message %s failed: %s', message.pk, e)
+            return None, str(e) or e.__class__.__name__, False
+        return provider, None, False
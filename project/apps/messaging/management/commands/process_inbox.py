@@ -0,0 +1,75 @@
+import logging
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from project.apps.messaging.models import InboundMessage
+from project.apps.messaging.signals import message_received
+from project.utils.phones import normalize_phones
+
+User = get_user_model()
+logger = logging.getLogger(__name__)
+
+
+def international(phone):
+    "The phone as sent by the provider (digits only, e.g. 5543999999999) with its leading +"
+    digits = ''.join(char for char in phone if char.isdigit())
+    return f'+{digits}' if digits else ''
+
+
+class Command(BaseCommand):
+    help = (
+        'Processa as mensagens recebidas pelos webhooks (InboundMessage): identifica o cliente '
+        'pelo telefone e envia o sinal message_received para cada mensagem.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200)
+        parser.add_argument('--sleep', type=float, default=1, help='Segundos de espera quando não há mensagens.')
+        parser.add_argument('--once', action='store_true', help='Processa um único lote e termina.')
+
+    def handle(self, *args, **options):
+        while True:
+            processed = self.process_batch(options['batch_size'])
+            if processed:
+                self.stdout.write(f'{processed} mensagem(ns) processada(s)')
+            if options['once']:
+                break
+            if not processed:
+                time.sleep(options['sleep'])
+
+    def process_batch(self, batch_size):
+        with transaction.atomic():
+            messages = list(
+                InboundMessage.objects.select_for_update(skip_locked=True)
+                .filter(processed_at__isnull=True)
+                .order_by('id')[:batch_size]
+            )
+            if not messages:
+                return 0
+
+            # One query matches the senders of the whole batch
+            normalized = normalize_phones(international(message.phone) for message in messages)
+            phones = {phone.e164 for phone in normalized.values() if phone.valid}
+            users = User.objects.in_bulk(phones, field_name='phone')
+
+            now = timezone.now()
+            for message in messages:
+                phone = normalized[international(message.phone)]
+                message.user = users.get(phone.e164) if phone.valid else None
+                message.processed_at = now
+            InboundMessage.objects.bulk_update(messages, ['user', 'processed_at'])
+
+        # Sent after the commit, so a failing receiver neither holds the row locks
+        # nor rolls the batch back (which would process it again on every run)
+        for message in messages:
+            for receiver, result in message_received.send_robust(sender=InboundMessage, message=message):
+                if isinstance(result, Exception):
+                    logger.error(
+                        'message_received receiver %r failed for inbound message %s',
+                        receiver, message.pk, exc_info=(type(result), result, result.__traceback__),
+                    )
+        return len(messages)
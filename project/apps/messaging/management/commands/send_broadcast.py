@@ -0,0 +1,42 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from project.apps.messaging.broadcast import create_broadcast
+from project.apps.messaging.models import OutboundMessage
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Cria uma transmissão para os usuários ativos de um grupo, enfileirando uma mensagem por usuário. '
+        'As mensagens são enviadas pelo comando drain_outbox.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('template', help='Arquivo com o template da mensagem (o usuário é {{ user }}).')
+        parser.add_argument('--channel', default=OutboundMessage.WHATSAPP,
+                            choices=[choice for choice, label in OutboundMessage.CHANNEL_CHOICES])
+        parser.add_argument('--group', default='cliente', help='Grupo dos destinatários.')
+        parser.add_argument('--subject', default='')
+        parser.add_argument('--name', default='')
+        parser.add_argument('--key', help=(
+            'Identificador da transmissão, como "cardapio-2026-10-18". '
+            'Rodar de novo com a mesma chave retoma a transmissão sem duplicar mensagens.'
+        ))
+
+    def handle(self, *args, **options):
+        with open(options['template']) as f:
+            template = f.read()
+
+        users = User.objects.filter(groups__name=options['group'], is_active=True)
+        try:
+            broadcast = create_broadcast(
+                users, template, options['channel'], subject=options['subject'], name=options['name'],
+                key=options['key'],
+            )
+        except ValueError as e:
+            raise CommandError(e)
+        self.stdout.write(self.style.SUCCESS(
+            f'{broadcast}: {broadcast.messages.count()} mensagem(ns) na fila.'
+        ))
@@ -0,0 +1,45 @@
+# Generated by Django 3.2.4 on 2026-10-18 12:00
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboundMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('channel', models.CharField(choices=[('whatsapp', 'WhatsApp'), ('sms', 'SMS'), ('email', 'Email')], max_length=16, verbose_name='canal')),
+                ('recipient', models.CharField(help_text='Telefone ou email', max_length=254, verbose_name='destinatário')),
+                ('subject', models.CharField(blank=True, max_length=256, verbose_name='assunto')),
+                ('body', models.TextField(verbose_name='mensagem')),
+                ('status', models.CharField(choices=[('pending', 'Pendente'), ('sent', 'Enviada'), ('failed', 'Falhou')], default='pending', max_length=16, verbose_name='situação')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='tentativas')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='próxima tentativa')),
+                ('error', models.TextField(blank=True, verbose_name='erro')),
+                ('idempotency_key', models.CharField(blank=True, help_text='Mensagens com a mesma chave são enviadas uma única vez', max_length=128, null=True, unique=True, verbose_name='chave de idempotência')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='criada em')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='enviada em')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='outbound_messages', to=settings.AUTH_USER_MODEL, verbose_name='Usuário')),
+            ],
+            options={
+                'verbose_name': 'Mensagem enviada',
+                'verbose_name_plural': 'Mensagens enviadas',
+                'ordering': ('-created_at',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='outboundmessage',
+            index=models.Index(fields=['status', 'next_attempt_at'], name='messaging_outbox_due'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 3.2.4 on 2026-10-18 12:00
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('messaging', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Broadcast',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=128, verbose_name='nome')),
+                ('channel', models.CharField(choices=[('whatsapp', 'WhatsApp'), ('sms', 'SMS'), ('email', 'Email')], max_length=16, verbose_name='canal')),
+                ('subject', models.CharField(blank=True, max_length=256, verbose_name='assunto')),
+                ('template', models.TextField(help_text='Template do Django, com o destinatário em {{ user }}', verbose_name='modelo')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='criada em')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Criada por')),
+            ],
+            options={
+                'verbose_name': 'Transmissão',
+                'verbose_name_plural': 'Transmissões',
+                'ordering': ('-created_at',),
+            },
+        ),
+        migrations.AddField(
+            model_name='outboundmessage',
+            name='broadcast',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='messages', to='messaging.broadcast', verbose_name='Transmissão'),
+        ),
+        migrations.AddField(
+            model_name='outboundmessage',
+            name='priority',
+            field=models.SmallIntegerField(default=0, help_text='Maiores são enviadas primeiro', verbose_name='prioridade'),
+        ),
+        migrations.RemoveIndex(
+            model_name='outboundmessage',
+            name='messaging_outbox_due',
+        ),
+        migrations.AddIndex(
+            model_name='outboundmessage',
+            index=models.Index(fields=['status', '-priority', 'next_attempt_at'], name='messaging_outbox_queue'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.4 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0002_broadcast'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboundmessage',
+            name='provider',
+            field=models.CharField(blank=True, help_text='Por onde a mensagem foi enviada', max_length=32, verbose_name='provedor'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 3.2.4 on 2026-10-18 12:00
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0002_broadcast'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RateLimit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=64, unique=True, verbose_name='nome')),
+                ('next_slot_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='próximo envio livre')),
+            ],
+            options={
+                'verbose_name': 'Limite de envio',
+                'verbose_name_plural': 'Limites de envio',
+            },
+        ),
+        migrations.AddField(
+            model_name='broadcast',
+            name='key',
+            field=models.CharField(blank=True, help_text='Criar de novo uma transmissão com a mesma chave retoma a existente, sem duplicar mensagens', max_length=128, null=True, unique=True, verbose_name='chave'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 3.2.4 on 2026-10-18 12:00
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('messaging', '0003_outboundmessage_provider'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InboundMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('provider', models.CharField(max_length=32, verbose_name='provedor')),
+                ('phone', models.CharField(blank=True, help_text='Como enviado pelo provedor', max_length=32, verbose_name='telefone')),
+                ('payload', models.JSONField(verbose_name='conteúdo')),
+                ('received_at', models.DateTimeField(auto_now_add=True, verbose_name='recebida em')),
+                ('processed_at', models.DateTimeField(blank=True, null=True, verbose_name='processada em')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='inbound_messages', to=settings.AUTH_USER_MODEL, verbose_name='Usuário')),
+            ],
+            options={
+                'verbose_name': 'Mensagem recebida',
+                'verbose_name_plural': 'Mensagens recebidas',
+                'ordering': ('-received_at',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='inboundmessage',
+            index=models.Index(condition=models.Q(('processed_at__isnull', True)), fields=['id'], name='messaging_inbox_pending'),
+        ),
+    ]
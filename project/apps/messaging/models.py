@@ -0,0 +1,183 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, models, transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class OutboundMessageManager(models.Manager):
+    def enqueue(self, channel, recipient, body, subject='', user=None, idempotency_key=None, priority=0):
+        """
+        Queue a message to be sent by the drain_outbox command and return it.
+        Enqueuing again with the same idempotency_key returns the message
+        already queued instead of sending it twice.
+        """
+        fields = {
+            'channel': channel,
+            'recipient': str(recipient),
+            'subject': subject,
+            'body': body,
+            'user': user,
+            'priority': priority,
+        }
+        if idempotency_key is None:
+            return self.create(**fields)
+        try:
+            with transaction.atomic():
+                return self.create(idempotency_key=idempotency_key, **fields)
+        except IntegrityError:
+            return self.get(idempotency_key=idempotency_key)
+
+
+class OutboundMessage(models.Model):
+    WHATSAPP = 'whatsapp'
+    SMS = 'sms'
+    EMAIL = 'email'
+    CHANNEL_CHOICES = [
+        (WHATSAPP, _('WhatsApp')),
+        (SMS, _('SMS')),
+        (EMAIL, _('Email')),
+    ]
+
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, _('Pendente')),
+        (SENT, _('Enviada')),
+        (FAILED, _('Falhou')),
+    ]
+
+    channel = models.CharField(_('canal'), max_length=16, choices=CHANNEL_CHOICES)
+    recipient = models.CharField(_('destinatário'), max_length=254, help_text=_('Telefone ou email'))
+    subject = models.CharField(_('assunto'), max_length=256, blank=True)
+    body = models.TextField(_('mensagem'))
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, verbose_name=_(
+        'Usuário'), null=True, blank=True, related_name='outbound_messages')
+
+    broadcast = models.ForeignKey('Broadcast', on_delete=models.CASCADE, verbose_name=_(
+        'Transmissão'), null=True, blank=True, related_name='messages')
+    priority = models.SmallIntegerField(_('prioridade'), default=0, help_text=_('Maiores são enviadas primeiro'))
+
+    status = models.CharField(_('situação'), max_length=16, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(_('tentativas'), default=0)
+    next_attempt_at = models.DateTimeField(_('próxima tentativa'), default=timezone.now)
+    error = models.TextField(_('erro'), blank=True)
+    provider = models.CharField(_('provedor'), max_length=32, blank=True, help_text=_('Por onde a mensagem foi enviada'))
+    idempotency_key = models.CharField(_('chave de idempotência'), max_length=128, unique=True, null=True, blank=True,
+                                       help_text=_('Mensagens com a mesma chave são enviadas uma única vez'))
+
+    created_at = models.DateTimeField(_('criada em'), auto_now_add=True)
+    sent_at = models.DateTimeField(_('enviada em'), null=True, blank=True)
+
+    objects = OutboundMessageManager()
+
+    class Meta:
+        verbose_name = _('Mensagem enviada')
+        verbose_name_plural = _('Mensagens enviadas')
+        ordering = ('-created_at',)
+        indexes = [
+            models.Index(fields=['status', '-priority', 'next_attempt_at'], name='messaging_outbox_queue'),
+        ]
+
+    def __str__(self):
+        return f'{self.get_channel_display()} para {self.recipient}'
+
+
+class Broadcast(models.Model):
+    """A message sent to many users at once, one OutboundMessage per recipient"""
+    name = models.CharField(_('nome'), max_length=128)
+    key = models.CharField(_('chave'), max_length=128, unique=True, null=True, blank=True, help_text=_(
+        'Criar de novo uma transmissão com a mesma chave retoma a existente, sem duplicar mensagens'))
+    channel = models.CharField(_('canal'), max_length=16, choices=OutboundMessage.CHANNEL_CHOICES)
+    subject = models.CharField(_('assunto'), max_length=256, blank=True)
+    template = models.TextField(_('modelo'), help_text=_('Template do Django, com o destinatário em {{ user }}'))
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, verbose_name=_(
+        'Criada por'), null=True, blank=True, related_name='+')
+    created_at = models.DateTimeField(_('criada em'), auto_now_add=True)
+
+    class Meta:
+        verbose_name = _('Transmissão')
+        verbose_name_plural = _('Transmissões')
+        ordering = ('-created_at',)
+
+    def __str__(self):
+        return self.name
+
+    def get_status_counts(self):
+        "{status: count} of the messages of this broadcast"
+        return dict(self.messages.order_by().values_list('status').annotate(total=models.Count('pk')))
+
+
+class InboundMessage(models.Model):
+    """
+    Webhook payload received from a messaging provider, stored as is by
+    views.whatsapp_webhook and processed later by the process_inbox command.
+    """
+    provider = models.CharField(_('provedor'), max_length=32)
+    phone = models.CharField(_('telefone'), max_length=32, blank=True, help_text=_('Como enviado pelo provedor'))
+    payload = models.JSONField(_('conteúdo'))
+    received_at = models.DateTimeField(_('recebida em'), auto_now_add=True)
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, verbose_name=_(
+        'Usuário'), null=True, blank=True, related_name='inbound_messages')
+    processed_at = models.DateTimeField(_('processada em'), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _('Mensagem recebida')
+        verbose_name_plural = _('Mensagens recebidas')
+        ordering = ('-received_at',)
+        indexes = [
+            models.Index(fields=['id'], condition=models.Q(processed_at__isnull=True), name='messaging_inbox_pending'),
+        ]
+
+    def __str__(self):
+        return f'{self.provider}: {self.phone}'
+
+    @property
+    def text(self):
+        "Text of the message, for the z-API payload format"
+        text = self.payload.get('text')
+        return text.get('message', '') if isinstance(text, dict) else ''
+
+
+class RateLimitManager(models.Manager):
+    def reserve(self, name, rate, count, horizon):
+        """
+        Reserve up to ``count`` send slots of ``name``, 1/``rate`` seconds
+        apart, from its next free slot on. Only slots starting within
+        ``horizon`` (a timedelta) from now are given out. Returns the start
+        of each reserved slot and the next free slot.
+        """
+        interval = timedelta(seconds=1 / rate)
+        now = timezone.now()
+        with transaction.atomic():
+            limit, created = self.select_for_update().get_or_create(name=name)
+            start = max(now, limit.next_slot_at)
+            if start > now + horizon:
+                return [], start
+            slots = [start + i * interval for i in range(min(count, int((now + horizon - start) / interval) + 1))]
+            if slots:
+                limit.next_slot_at = slots[-1] + interval
+                limit.save(update_fields=['next_slot_at'])
+        return slots, limit.next_slot_at
+
+
+class RateLimit(models.Model):
+    """
+    Send slots of a channel, shared by every drain_outbox worker: each
+    worker reserves the slots of the messages it is about to send, so
+    together they never send faster than settings.MESSAGING_RATE_LIMITS.
+    """
+    name = models.CharField(_('nome'), max_length=64, unique=True)
+    next_slot_at = models.DateTimeField(_('próximo envio livre'), default=timezone.now)
+
+    objects = RateLimitManager()
+
+    class Meta:
+        verbose_name = _('Limite de envio')
+        verbose_name_plural = _('Limites de envio')
+
+    def __str__(self):
+        return self.name
@@ -0,0 +1,40 @@
+"""
+Delivery of the queued OutboundMessages, used by the drain_outbox command.
+"""
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import send_mail
+
+from project.utils.failover import send_text
+
+from .models import OutboundMessage
+
+
+def deliver(message):
+    """
+    Send ``message`` through its channel and return the name of the
+    provider that sent it. Raises on failure.
+    """
+    if message.channel == OutboundMessage.WHATSAPP:
+        text = f'*{message.subject}*{message.body}' if message.subject else message.body
+        return send_text(message.recipient, text, chain='whatsapp')
+    elif message.channel == OutboundMessage.SMS:
+        return send_text(message.recipient, message.body, chain='sms')
+    elif message.channel == OutboundMessage.EMAIL:
+        send_mail(message.subject, message.body, settings.DEFAULT_FROM_EMAIL, [message.recipient])
+        return 'email'
+    else:
+        raise ValueError(f'Unknown channel: {message.channel}')
+
+
+def retry_delay(attempts):
+    """
+    Exponential backoff with jitter: MESSAGING_RETRY_DELAY seconds doubled
+    on every attempt, up to MESSAGING_RETRY_MAX_DELAY.
+    """
+    base = getattr(settings, 'MESSAGING_RETRY_DELAY', 30)
+    maximum = getattr(settings, 'MESSAGING_RETRY_MAX_DELAY', 60 * 60)
+    delay = min(base * 2 ** max(attempts - 1, 0), maximum)
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Sent by the process_inbox command for each InboundMessage (message), after
+# matching it to a user (message.user, None if the phone is unknown)
+message_received = Signal()
@@ -0,0 +1,54 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from project.apps.messaging.broadcast import BROADCAST_PRIORITY, create_broadcast
+from project.apps.messaging.models import Broadcast, OutboundMessage
+
+User = get_user_model()
+
+TEMPLATE = 'Olá, {{ user.first_name }}! O cardápio da semana chegou: arroz & feijão.'
+
+
+class CreateBroadcastTests(TestCase):
+    def setUp(self):
+        self.maria = User.objects.create_user('+5543988887777', 's3cret')
+        self.maria.first_name = 'Maria'
+        self.maria.save()
+        self.joao = User.objects.create_user('+5543977776666', 's3cret')
+        self.joao.first_name = 'João'
+        self.joao.save()
+        self.no_phone = User.objects.create_user('ana@example.com', 's3cret')
+
+    def test_queues_one_rendered_message_per_user(self):
+        broadcast = create_broadcast(User.objects.all(), TEMPLATE, OutboundMessage.WHATSAPP, batch_size=1)
+
+        messages = {message.user_id: message for message in broadcast.messages.all()}
+        self.assertEqual(set(messages), {self.maria.pk, self.joao.pk})
+        message = messages[self.maria.pk]
+        self.assertEqual(message.recipient, '+5543988887777')
+        self.assertEqual(message.body, 'Olá, Maria! O cardápio da semana chegou: arroz & feijão.')
+        self.assertEqual(message.priority, BROADCAST_PRIORITY)
+        self.assertEqual(message.status, OutboundMessage.PENDING)
+
+    def test_email_channel_uses_the_email(self):
+        broadcast = create_broadcast(User.objects.all(), TEMPLATE, OutboundMessage.EMAIL, subject='Cardápio')
+        self.assertEqual(list(broadcast.messages.values_list('recipient', flat=True)), ['ana@example.com'])
+
+    def test_same_key_resumes_without_duplicates(self):
+        first = create_broadcast(User.objects.filter(pk=self.maria.pk), TEMPLATE, OutboundMessage.WHATSAPP,
+                                 key='cardapio-2026-10-18')
+        second = create_broadcast(User.objects.all(), TEMPLATE, OutboundMessage.WHATSAPP, key='cardapio-2026-10-18')
+
+        self.assertEqual(second, first)
+        self.assertEqual(Broadcast.objects.count(), 1)
+        self.assertEqual(sorted(first.messages.values_list('user_id', flat=True)), [self.maria.pk, self.joao.pk])
+
+    def test_key_of_another_message(self):
+        create_broadcast(User.objects.all(), TEMPLATE, OutboundMessage.WHATSAPP, key='cardapio')
+        with self.assertRaises(ValueError):
+            create_broadcast(User.objects.all(), 'Outra mensagem', OutboundMessage.WHATSAPP, key='cardapio')
+
+    def test_without_a_key_every_call_is_a_new_broadcast(self):
+        create_broadcast(User.objects.all(), TEMPLATE, OutboundMessage.WHATSAPP)
+        create_broadcast(User.objects.all(), TEMPLATE, OutboundMessage.WHATSAPP)
+        self.assertEqual(OutboundMessage.objects.count(), 4)
@@ -0,0 +1,196 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from project.apps.messaging.management.commands.drain_outbox import Command
+from project.apps.messaging.models import OutboundMessage, RateLimit
+from project.apps.messaging.outbox import retry_delay
+from project.utils.failover import DeliveryFailed, RecipientRejected
+
+
+class SerialExecutor:
+    "Runs the sends on the test thread"
+
+    def submit(self, func, *args):
+        future = Future()
+        try:
+            future.set_result(func(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+def enqueue(**kwargs):
+    return OutboundMessage.objects.enqueue(OutboundMessage.SMS, '+5543988887777', 'Olá', **kwargs)
+
+
+@override_settings(MESSAGING_LEASE=300, MESSAGING_RATE_LIMITS={})
+class ClaimTests(TestCase):
+    def test_claim_leases_due_messages(self):
+        message = enqueue()
+        claimed = Command().claim(10)
+
+        self.assertEqual([m.pk for m in claimed], [message.pk])
+        message.refresh_from_db()
+        self.assertEqual(message.attempts, 1)
+        self.assertGreater(message.next_attempt_at, timezone.now() + timedelta(seconds=290))
+
+    def test_claim_skips_leased_messages(self):
+        enqueue()
+        Command().claim(10)
+        self.assertEqual(Command().claim(10), [])
+
+    def test_claim_skips_messages_not_due_or_not_pending(self):
+        enqueue(idempotency_key='later')
+        OutboundMessage.objects.update(next_attempt_at=timezone.now() + timedelta(minutes=5))
+        OutboundMessage.objects.create(channel=OutboundMessage.SMS, recipient='+5543988887777', body='x',
+                                       status=OutboundMessage.SENT)
+        self.assertEqual(Command().claim(10), [])
+
+    def test_claim_takes_higher_priority_first(self):
+        low = enqueue(priority=-10)
+        high = enqueue(priority=5)
+        self.assertEqual([m.pk for m in Command().claim(1)], [high.pk])
+        self.assertEqual([m.pk for m in Command().claim(1)], [low.pk])
+
+
+@override_settings(MESSAGING_RETRY_DELAY=30, MESSAGING_RETRY_MAX_DELAY=3600)
+class RetryDelayTests(TestCase):
+    @mock.patch('project.apps.messaging.outbox.random.uniform', return_value=1)
+    def test_doubles_on_every_attempt(self, uniform):
+        self.assertEqual([retry_delay(n).total_seconds() for n in (1, 2, 3, 4)], [30, 60, 120, 240])
+
+    @mock.patch('project.apps.messaging.outbox.random.uniform', return_value=1)
+    def test_is_capped(self, uniform):
+        self.assertEqual(retry_delay(20).total_seconds(), 3600)
+
+    def test_has_jitter_within_20_percent(self):
+        for _ in range(50):
+            self.assertTrue(48 <= retry_delay(2).total_seconds() <= 72)
+
+
+@override_settings(MESSAGING_RATE_LIMITS={}, MESSAGING_RETRY_DELAY=30, MESSAGING_RETRY_MAX_DELAY=3600)
+class ProcessBatchTests(TestCase):
+    def process(self, max_attempts=3):
+        return Command().process_batch(SerialExecutor(), 10, max_attempts)
+
+    @mock.patch('project.apps.messaging.management.commands.drain_outbox.deliver', return_value='sms_d7')
+    def test_sent(self, deliver):
+        message = enqueue()
+        self.assertEqual(self.process(), 1)
+
+        message.refresh_from_db()
+        self.assertEqual(message.status, OutboundMessage.SENT)
+        self.assertEqual(message.provider, 'sms_d7')
+        self.assertIsNotNone(message.sent_at)
+
+    @mock.patch('project.apps.messaging.management.commands.drain_outbox.deliver',
+                side_effect=DeliveryFailed('timeout'))
+    def test_failure_is_retried_with_backoff(self, deliver):
+        message = enqueue()
+        self.process()
+
+        message.refresh_from_db()
+        self.assertEqual(message.status, OutboundMessage.PENDING)
+        self.assertEqual(message.attempts, 1)
+        self.assertEqual(message.error, 'timeout')
+        delay = (message.next_attempt_at - timezone.now()).total_seconds()
+        self.assertTrue(20 <= delay <= 36, delay)
+        # Not due yet, so the next batch leaves it alone
+        self.assertEqual(self.process(), 0)
+
+    @mock.patch('project.apps.messaging.management.commands.drain_outbox.deliver',
+                side_effect=DeliveryFailed('timeout'))
+    def test_fails_after_max_attempts(self, deliver):
+        message = enqueue()
+        for attempt in range(3):
+            OutboundMessage.objects.filter(pk=message.pk).update(next_attempt_at=timezone.now())
+            self.process(max_attempts=3)
+
+        message.refresh_from_db()
+        self.assertEqual(message.status, OutboundMessage.FAILED)
+        self.assertEqual(message.attempts, 3)
+
+    @mock.patch('project.apps.messaging.management.commands.drain_outbox.deliver',
+                side_effect=RecipientRejected('invalid number'))
+    def test_rejected_recipient_is_not_retried(self, deliver):
+        message = enqueue()
+        self.process()
+
+        message.refresh_from_db()
+        self.assertEqual(message.status, OutboundMessage.FAILED)
+        self.assertEqual(message.attempts, 1)
+
+    def test_results_are_saved_as_each_send_returns(self):
+        first, second = enqueue(), enqueue()
+        first_saved = threading.Event()
+        record = Command.record
+
+        def deliver(message):
+            # The second send only returns once the first result is in the database
+            if message.pk == second.pk and not first_saved.wait(5):
+                raise DeliveryFailed('the first result was not saved while this one was being sent')
+            return 'sms_d7'
+
+        def record_and_signal(command, message, *args, **kwargs):
+            record(command, message, *args, **kwargs)
+            if message.pk == first.pk:
+                first_saved.set()
+
+        with mock.patch('project.apps.messaging.management.commands.drain_outbox.deliver', side_effect=deliver), \
+                mock.patch.object(Command, 'record', record_and_signal), \
+                ThreadPoolExecutor(max_workers=2) as executor:
+            Command().process_batch(executor, 10, 3)
+
+        self.assertEqual(
+            dict(OutboundMessage.objects.values_list('pk', 'status')),
+            {first.pk: OutboundMessage.SENT, second.pk: OutboundMessage.SENT},
+        )
+
+
+class RateLimitTests(TestCase):
+    horizon = timedelta(seconds=10)
+
+    def test_slots_are_spaced_by_the_rate(self):
+        slots, next_slot_at = RateLimit.objects.reserve('outbox:sms', 2, 3, self.horizon)
+
+        self.assertEqual([(slot - slots[0]).total_seconds() for slot in slots], [0, 0.5, 1])
+        self.assertEqual(next_slot_at, slots[-1] + timedelta(seconds=0.5))
+
+    def test_workers_share_the_slots(self):
+        first, _ = RateLimit.objects.reserve('outbox:sms', 2, 3, self.horizon)
+        second, _ = RateLimit.objects.reserve('outbox:sms', 2, 3, self.horizon)
+        self.assertEqual(second[0], first[-1] + timedelta(seconds=0.5))
+
+    def test_only_slots_within_the_horizon(self):
+        slots, next_slot_at = RateLimit.objects.reserve('outbox:sms', 1, 100, self.horizon)
+        self.assertEqual(len(slots), 11)
+
+        slots, _ = RateLimit.objects.reserve('outbox:sms', 1, 100, self.horizon)
+        self.assertEqual(slots, [])
+
+
+@override_settings(MESSAGING_LEASE=300, MESSAGING_RATE_LIMITS={'sms': 1}, MESSAGING_RATE_HORIZON=2)
+class ScheduleTests(TestCase):
+    def test_messages_beyond_the_horizon_go_back_to_the_queue(self):
+        for _ in range(5):
+            enqueue()
+        email = OutboundMessage.objects.enqueue(OutboundMessage.EMAIL, 'maria@example.com', 'Olá')
+
+        scheduled = Command().schedule(Command().claim(10))
+
+        sms = [message for message in scheduled if message.channel == OutboundMessage.SMS]
+        self.assertEqual(len(sms), 3)
+        self.assertEqual([(m.send_at - sms[0].send_at).total_seconds() for m in sms], [0, 1, 2])
+        # Email has no limit here
+        self.assertIn(email.pk, [message.pk for message in scheduled if message.send_at is None])
+
+        released = OutboundMessage.objects.exclude(pk__in=[message.pk for message in scheduled])
+        self.assertEqual(released.count(), 2)
+        for message in released:
+            self.assertEqual(message.attempts, 0)
+            self.assertLess(message.next_attempt_at, timezone.now() + timedelta(seconds=5))
@@ -0,0 +1,37 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse_lazy
+
+from project.apps.messaging.models import InboundMessage
+
+
+@override_settings(MESSAGING_WEBHOOK_TOKEN='s3cret')
+class WhatsappWebhookTests(TestCase):
+    url = reverse_lazy('messaging:whatsapp_webhook')
+
+    def post(self, data='{"phone": "5543988887777", "text": {"message": "Oi"}}', **extra):
+        return self.client.post(self.url, data, content_type='application/json', **extra)
+
+    def test_stores_the_payload(self):
+        response = self.post(HTTP_X_WEBHOOK_TOKEN='s3cret')
+
+        self.assertEqual(response.status_code, 200)
+        message = InboundMessage.objects.get()
+        self.assertEqual((message.provider, message.phone), ('zapi', '5543988887777'))
+        self.assertEqual(message.payload['text'], {'message': 'Oi'})
+        self.assertIsNone(message.processed_at)
+
+    def test_requires_the_token_header(self):
+        self.assertEqual(self.post().status_code, 403)
+        self.assertEqual(self.post(HTTP_X_WEBHOOK_TOKEN='wrong').status_code, 403)
+        response = self.client.post(f'{self.url}?token=s3cret', '{}', content_type='application/json')
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(InboundMessage.objects.exists())
+
+    @override_settings(MESSAGING_WEBHOOK_TOKEN='')
+    def test_disabled_without_a_token(self):
+        self.assertEqual(self.post(HTTP_X_WEBHOOK_TOKEN='').status_code, 403)
+
+    def test_rejects_invalid_payloads(self):
+        self.assertEqual(self.post('not json', HTTP_X_WEBHOOK_TOKEN='s3cret').status_code, 400)
+        self.assertEqual(self.post('[]', HTTP_X_WEBHOOK_TOKEN='s3cret').status_code, 400)
+        self.assertEqual(self.client.get(self.url, HTTP_X_WEBHOOK_TOKEN='s3cret').status_code, 405)
@@ -0,0 +1,9 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'messaging'
+
+urlpatterns = [
+    path('webhooks/whatsapp/', views.whatsapp_webhook, name='whatsapp_webhook'),
+]
@@ -6,7 +6,8 @@ from import_export import resources
 from import_export.admin import ImportExportActionModelAdmin
 from tabbed_admin import TabbedModelAdmin
 
-from .models import Address, City, State, Country, Neighbourhood
+from project.utils.export import StreamingExportMixin
+from .models import Address, City, State, Country, Neighbourhood, GeocodingJob, DeliveryZone
 from .forms import LocationAdminForm, LocationAdminAddForm, LocationAdminChangeForm
 
 
@@ -16,13 +17,14 @@ class AddressResource(resources.ModelResource):
 
 
 @admin.register(Address)
-class LocationAdmin(ImportExportActionModelAdmin, TabbedModelAdmin):
+class LocationAdmin(StreamingExportMixin, ImportExportActionModelAdmin, TabbedModelAdmin):
     resource_class = AddressResource
 
     change_form = LocationAdminChangeForm
     add_form = LocationAdminAddForm
 
     list_display = ['address', 'complement', 'neighbourhood', 'city', 'postal_code', 'coords']
+    list_filter = ['delivery_zone',]
     autocomplete_fields = ['city',]
     save_on_top = True
 
@@ -39,7 +41,7 @@ class LocationAdmin(ImportExportActionModelAdmin, TabbedModelAdmin):
 
     tab_address = (
         (None, {
-            'fields': ('user','address', 'complement', 'neighbourhood', 'city', 'postal_code', 'instructions','extra')
+            'fields': ('user','address', 'complement', 'neighbourhood', 'city', 'postal_code', 'instructions','extra', 'delivery_zone')
         }),
     )
 
@@ -90,6 +92,20 @@ class StateAdmin(OSMGeoAdmin):
 class CountryAdmin(OSMGeoAdmin):
     search_fields = ('name',)
 
+@admin.register(DeliveryZone)
+class DeliveryZoneAdmin(OSMGeoAdmin):
+    list_display = ('name', 'fee', 'priority', 'is_active')
+    list_editable = ('fee', 'priority', 'is_active')
+    search_fields = ('name',)
+
+@admin.register(GeocodingJob)
+class GeocodingJobAdmin(admin.ModelAdmin):
+    list_display = ('address', 'status', 'attempts', 'next_attempt_at', 'updated_at')
+    list_filter = ('status',)
+    list_select_related = ('address', 'address__city')
+    raw_id_fields = ('address',)
+    readonly_fields = ('created_at', 'updated_at')
+
 # @admin.register(Neighbourhood)
 # class NeighbourhoodAdmin(OSMGeoAdmin):
 #     search_fields = ('name',)
\ No newline at end of file
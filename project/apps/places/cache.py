@@ -0,0 +1,265 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from project.utils import geohash
+
+
+class LRUCache:
+    """
+    Small thread-safe, process-local LRU cache with an optional per-entry
+    timeout (in seconds). Used as the in-memory front of the DB-backed caches.
+    """
+
+    def __init__(self, maxsize=1024, timeout=None):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value, expires_at = self._data[key]
+            except KeyError:
+                return default
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        expires_at = time.monotonic() + self.timeout if self.timeout else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+# ==============================================================================
+# REVERSE GEOCODING CACHE
+# ==============================================================================
+
+def geocode_cache_timeout():
+    return getattr(settings, 'GEOCODE_CACHE_TIMEOUT', 60 * 60 * 24 * 90)
+
+
+_geocode_lru = LRUCache(
+    maxsize=getattr(settings, 'GEOCODE_CACHE_LRU_SIZE', 2048),
+    timeout=geocode_cache_timeout(),
+)
+_geocode_writes = 0
+
+
+def get_geocode_cell(point):
+    """
+    Key of the cache cell containing ``point``: its geohash with
+    settings.GEOCODE_CACHE_PRECISION characters (9 characters is ~5 m).
+    """
+    return geohash.encode_point(point, getattr(settings, 'GEOCODE_CACHE_PRECISION', 9))
+
+
+def get_cached_geocode(cell):
+    """Raw reverse-geocode result stored for ``cell``, or None on a miss."""
+    raw = _geocode_lru.get(cell)
+    if raw is not None:
+        return raw
+
+    from .models import GeocodeCache
+    oldest = timezone.now() - timedelta(seconds=geocode_cache_timeout())
+    raw = GeocodeCache.objects.filter(cell=cell, created_at__gte=oldest).values_list('raw', flat=True).first()
+    if raw is not None:
+        _geocode_lru.set(cell, raw)
+    return raw
+
+
+def set_cached_geocode(cell, raw):
+    global _geocode_writes
+    from .models import GeocodeCache
+
+    _geocode_lru.set(cell, raw)
+    GeocodeCache.objects.update_or_create(cell=cell, defaults={'raw': raw, 'created_at': timezone.now()})
+
+    _geocode_writes += 1
+    if _geocode_writes % getattr(settings, 'GEOCODE_CACHE_PRUNE_EVERY', 500) == 0:
+        prune_geocode_cache()
+
+
+def prune_geocode_cache():
+    """Delete expired cells and keep at most settings.GEOCODE_CACHE_MAX_ENTRIES."""
+    from .models import GeocodeCache
+
+    oldest = timezone.now() - timedelta(seconds=geocode_cache_timeout())
+    GeocodeCache.objects.filter(created_at__lt=oldest).delete()
+
+    max_entries = getattr(settings, 'GEOCODE_CACHE_MAX_ENTRIES', 100000)
+    cutoff = GeocodeCache.objects.order_by('-created_at').values_list('created_at', flat=True)[max_entries:max_entries + 1]
+    if cutoff:
+        GeocodeCache.objects.filter(created_at__lte=cutoff[0]).delete()
+
+
+def clear_geocode_cache():
+    from .models import GeocodeCache
+
+    _geocode_lru.clear()
+    GeocodeCache.objects.all().delete()
+
+
+def get_cached_geocodes(cells):
+    """Bulk version of get_cached_geocode(): {cell: raw} for the cells found."""
+    from .models import GeocodeCache
+
+    found = {}
+    missing = []
+    for cell in set(cells):
+        raw = _geocode_lru.get(cell)
+        if raw is None:
+            missing.append(cell)
+        else:
+            found[cell] = raw
+
+    if missing:
+        oldest = timezone.now() - timedelta(seconds=geocode_cache_timeout())
+        rows = GeocodeCache.objects.filter(cell__in=missing, created_at__gte=oldest).values_list('cell', 'raw')
+        for cell, raw in rows:
+            _geocode_lru.set(cell, raw)
+            found[cell] = raw
+    return found
+
+
+def set_cached_geocodes(results):
+    """Bulk version of set_cached_geocode(), taking a {cell: raw} mapping."""
+    from .models import GeocodeCache
+
+    if not results:
+        return
+    now = timezone.now()
+    for cell, raw in results.items():
+        _geocode_lru.set(cell, raw)
+    GeocodeCache.objects.filter(cell__in=list(results)).delete()
+    GeocodeCache.objects.bulk_create(
+        [GeocodeCache(cell=cell, raw=raw, created_at=now) for cell, raw in results.items()],
+        ignore_conflicts=True,
+    )
+
+
+# ==============================================================================
+# CITY LOOKUP CACHE
+# ==============================================================================
+
+_city_ids = {}  # (country code, state code, city name) -> City id
+_city_cache_lock = threading.Lock()
+_city_cache_loaded_at = None
+
+
+def warm_city_cache():
+    "Load every known city in a single query"
+    global _city_cache_loaded_at
+    from .models import City
+
+    rows = City.objects.values_list('pk', 'name', 'state_id', 'country_id').order_by('pk')
+    with _city_cache_lock:
+        _city_ids.clear()
+        for pk, name, state_id, country_id in rows:
+            _city_ids.setdefault((country_id, state_id, name), pk)
+        _city_cache_loaded_at = time.monotonic()
+
+
+def clear_city_cache():
+    global _city_cache_loaded_at
+    with _city_cache_lock:
+        _city_ids.clear()
+        _city_cache_loaded_at = None
+
+
+def get_city(country_code, country_name, state_code, state_name, city_name):
+    """
+    City for the given country/state/city, creating the missing rows.
+    Known places cost no query: the whole table is loaded on first use and
+    reloaded after settings.PLACES_CITY_CACHE_TIMEOUT seconds or whenever a
+    City, State or Country is saved or deleted in this process.
+    """
+    from .models import City, Country, State
+
+    timeout = getattr(settings, 'PLACES_CITY_CACHE_TIMEOUT', 300)
+    if _city_cache_loaded_at is None or time.monotonic() - _city_cache_loaded_at > timeout:
+        warm_city_cache()
+
+    key = (country_code, state_code, city_name)
+    city_id = _city_ids.get(key)
+    if city_id is None:
+        country, country_created = Country.objects.get_or_create(code=country_code, defaults={'name': country_name})
+        state, state_created = State.objects.get_or_create(code=state_code, defaults={'name': state_name})
+        city, city_created = City.objects.get_or_create(state=state, country=country, name=city_name)
+        # Creating the rows above cleared the cache through the signals, so warm it up again first
+        if _city_cache_loaded_at is None:
+            warm_city_cache()
+        with _city_cache_lock:
+            _city_ids[key] = city_id = city.pk
+
+    return City(id=city_id, name=city_name, state_id=state_code, country_id=country_code)
+
+
+# ==============================================================================
+# DELIVERY ZONE CACHE
+# ==============================================================================
+
+_delivery_zones = None  # [(zone id, prepared area)], highest priority first
+_delivery_zones_lock = threading.Lock()
+_delivery_zones_loaded_at = None
+
+# Where zones overlap the first one wins. assign_delivery_zones walks the
+# zones in the exact reverse order (last write wins), so both agree on ties.
+DELIVERY_ZONE_ORDER = ('-priority', 'name', 'pk')
+
+
+def clear_delivery_zone_cache():
+    global _delivery_zones, _delivery_zones_loaded_at
+    with _delivery_zones_lock:
+        _delivery_zones = None
+        _delivery_zones_loaded_at = None
+
+
+def get_delivery_zone_id(point):
+    """
+    Id of the active delivery zone covering ``point``, or None.
+    The zones are loaded once per process as prepared geometries, so this
+    is an in-memory test. They are reloaded after
+    settings.PLACES_DELIVERY_ZONE_CACHE_TIMEOUT seconds, so every process
+    picks up zone changes, and right away in the process that saved them.
+    """
+    global _delivery_zones, _delivery_zones_loaded_at
+    from .models import DeliveryZone
+
+    timeout = getattr(settings, 'PLACES_DELIVERY_ZONE_CACHE_TIMEOUT', 300)
+    zones, loaded_at = _delivery_zones, _delivery_zones_loaded_at
+    if zones is None or time.monotonic() - loaded_at > timeout:
+        zones = [
+            (zone.pk, zone.area.prepared)
+            for zone in DeliveryZone.objects.filter(is_active=True).order_by(*DELIVERY_ZONE_ORDER)
+        ]
+        with _delivery_zones_lock:
+            _delivery_zones = zones
+            _delivery_zones_loaded_at = time.monotonic()
+
+    for zone_id, area in zones:
+        if area.covers(point):
+            return zone_id
+    return None
@@ -2,13 +2,14 @@ import json
 
 from django.http import request
 
-from project import settings
 from django.contrib.gis import forms
 from django.contrib.gis.geos import Point, GEOSGeometry, fromstr
 from django.utils.translation import gettext_lazy as _
 from mapwidgets import GooglePointFieldWidget, GoogleStaticMapWidget
 
-from project.apps.places.models import Address, City, State, Country, Neighbourhood
+from project.apps.places.cache import get_city
+from project.apps.places.models import Address, Neighbourhood
+from project.utils.geolocation import reverse_geocode
 
 
 class LocationAdminAddForm(forms.ModelForm):
@@ -45,9 +46,7 @@ class LocationAdminAddForm(forms.ModelForm):
         _country = str(self.cleaned_data.get('geodata')[6].upper())[0:2]
         _country_long = str(self.cleaned_data.get('geodata')[7])
 
-        my_country, country_created = Country.objects.get_or_create(code=_country, name=_country_long)
-        my_state, state_created = State.objects.get_or_create(code=_state, name=_state_long)
-        my_city, city_created = City.objects.get_or_create(state=my_state, country=my_country, name=_city)
+        my_city = get_city(_country, _country_long, _state, _state_long, _city)
 
         return my_city
 
@@ -59,14 +58,10 @@ class LocationAdminAddForm(forms.ModelForm):
 
     def clean_geodata(self):
         location = self.cleaned_data.get('location')
-        coords = f"{location.y},{location.x}"
-
-        import geopy
-        geolocator = geopy.GoogleV3(api_key=settings.GOOGLE_MAPS_API_KEY)
-        response = geolocator.reverse(coords,language='pt-br',)
+        response = reverse_geocode(location)
 
         if response is not None:
-            components = response.raw['address_components']
+            components = response['address_components']
             address = {}
             for component in components:
                 for type in component['types']:
@@ -123,8 +118,8 @@ class LocationAdminAddForm(forms.ModelForm):
             else:
                 address_line2 = ''
 
-            lat = response.raw['geometry']['location']['lat']
-            lng = response.raw['geometry']['location']['lng']
+            lat = response['geometry']['location']['lat']
+            lng = response['geometry']['location']['lng']
             # coords = fromstr(f"POINT({lng}, {lat})", srid=4326)
 
             coords = Point(lng, lat, srid=4326)
@@ -139,8 +134,8 @@ class LocationAdminAddForm(forms.ModelForm):
                    address_country_long, \
                    address_postal_code,\
                    coords,\
-                   response.raw['formatted_address'],\
-                   response.raw
+                   response['formatted_address'],\
+                   response
 
 
 class LocationAdminChangeForm(forms.ModelForm):
@@ -187,9 +182,7 @@ class LocationAdminChangeForm(forms.ModelForm):
             _country = str(self.cleaned_data.get('geodata')[6].upper())[0:2]
             _country_long = str(self.cleaned_data.get('geodata')[7])
 
-            my_country, country_created = Country.objects.get_or_create(code=_country, name=_country_long)
-            my_state, state_created = State.objects.get_or_create(code=_state, name=_state_long)
-            my_city, city_created = City.objects.get_or_create(state=my_state, country=my_country, name=_city)
+            my_city = get_city(_country, _country_long, _state, _state_long, _city)
 
             return my_city
         else:
@@ -207,14 +200,10 @@ class LocationAdminChangeForm(forms.ModelForm):
     def clean_geodata(self):
         if self.cleaned_data.get('location'):
             location = self.cleaned_data.get('location')
-            coords = f"{location.y},{location.x}"
-
-            import geopy
-            geolocator = geopy.GoogleV3(api_key=settings.GOOGLE_MAPS_API_KEY)
-            response = geolocator.reverse(coords,language='pt-br',)
+            response = reverse_geocode(location)
 
             if response is not None:
-                components = response.raw['address_components']
+                components = response['address_components']
                 address = {}
                 for component in components:
                     for type in component['types']:
@@ -271,8 +260,8 @@ class LocationAdminChangeForm(forms.ModelForm):
                 else:
                     address_line2 = ''
 
-                lat = response.raw['geometry']['location']['lat']
-                lng = response.raw['geometry']['location']['lng']
+                lat = response['geometry']['location']['lat']
+                lng = response['geometry']['location']['lng']
                 # coords = fromstr(f"POINT({lng}, {lat})", srid=4326)
 
                 coords = Point(lng, lat, srid=4326)
@@ -287,8 +276,8 @@ class LocationAdminChangeForm(forms.ModelForm):
                        address_country_long, \
                        address_postal_code,\
                        coords,\
-                       response.raw['formatted_address'],\
-                       response.raw
+                       response['formatted_address'],\
+                       response
 
 
 class LocationAdminForm(forms.ModelForm):
@@ -335,9 +324,7 @@ class LocationAdminForm(forms.ModelForm):
             _country = str(self.cleaned_data.get('geodata')[6].upper())[0:2]
             _country_long = str(self.cleaned_data.get('geodata')[7])
 
-            my_country, country_created = Country.objects.get_or_create(code=_country, name=_country_long)
-            my_state, state_created = State.objects.get_or_create(code=_state, name=_state_long)
-            my_city, city_created = City.objects.get_or_create(state=my_state, country=my_country, name=_city)
+            my_city = get_city(_country, _country_long, _state, _state_long, _city)
 
             return my_city
         else:
@@ -355,14 +342,10 @@ class LocationAdminForm(forms.ModelForm):
     def clean_geodata(self):
         if self.cleaned_data.get('location'):
             location = self.cleaned_data.get('location')
-            coords = f"{location.y},{location.x}"
-
-            import geopy
-            geolocator = geopy.GoogleV3(api_key=settings.GOOGLE_MAPS_API_KEY)
-            response = geolocator.reverse(coords,language='pt-br',)
+            response = reverse_geocode(location)
 
             if response is not None:
-                components = response.raw['address_components']
+                components = response['address_components']
                 address = {}
                 for component in components:
                     for type in component['types']:
@@ -419,8 +402,8 @@ class LocationAdminForm(forms.ModelForm):
                 else:
                     address_line2 = ''
 
-                lat = response.raw['geometry']['location']['lat']
-                lng = response.raw['geometry']['location']['lng']
+                lat = response['geometry']['location']['lat']
+                lng = response['geometry']['location']['lng']
                 # coords = fromstr(f"POINT({lng}, {lat})", srid=4326)
 
                 coords = Point(lng, lat, srid=4326)
@@ -435,5 +418,5 @@ class LocationAdminForm(forms.ModelForm):
                        address_country_long, \
                        address_postal_code,\
                        coords,\
-                       response.raw['formatted_address'],\
-                       response.raw
+                       response['formatted_address'],\
+                       response
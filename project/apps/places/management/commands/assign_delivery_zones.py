@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from project.apps.places.cache import DELIVERY_ZONE_ORDER
+from project.apps.places.models import Address, DeliveryZone
+
+
+class Command(BaseCommand):
+    help = (
+        'Recalcula a zona de entrega de todos os endereços. '
+        'Deve ser executado sempre que as zonas de entrega forem alteradas.'
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            Address.objects.exclude(delivery_zone=None).update(delivery_zone=None)
+            # Reverse of the cache's order, so where zones overlap the zone get_delivery_zone_id() picks is written last
+            order = [field[1:] if field.startswith('-') else f'-{field}' for field in DELIVERY_ZONE_ORDER]
+            for zone in DeliveryZone.objects.filter(is_active=True).order_by(*order):
+                count = Address.objects.filter(location__intersects=zone.area).update(delivery_zone=zone)
+                self.stdout.write(f'{zone}: {count} endereço(s)')
+        self.stdout.write(self.style.SUCCESS('Zonas de entrega atribuídas.'))
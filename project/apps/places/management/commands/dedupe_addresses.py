@@ -0,0 +1,128 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Count
+
+from project.apps.places.models import Address
+from project.apps.places.normalization import clean_address, normalize_complement, normalize_number, split_address
+
+# Fields copied from the duplicates when the kept address has them empty
+MERGED_FIELDS = ['address', 'complement', 'neighbourhood', 'postal_code', 'instructions', 'extra']
+
+NEARBY_PAIRS_SQL = '''
+    SELECT a.id, b.id
+    FROM places_address a
+    JOIN places_address b ON b.user_id = a.user_id AND b.id > a.id
+    WHERE a.location IS NOT NULL
+      AND b.location IS NOT NULL
+      AND ST_DWithin(a.location::geography, b.location::geography, %s)
+'''
+
+
+class Command(BaseCommand):
+    help = (
+        'Junta os endereços duplicados de cada usuário: os que têm a mesma impressão digital '
+        'e os que estão a poucos metros um do outro com o mesmo número e complemento. '
+        'Mantém o endereço mais antigo de cada grupo.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--distance', type=float, default=15, help='Distância máxima em metros entre duplicados.')
+        parser.add_argument('--dry-run', action='store_true', help='Apenas mostra o que seria feito.')
+
+    def handle(self, *args, **options):
+        self.parent = {}
+        self.join_same_fingerprint()
+        self.join_nearby(options['distance'])
+
+        clusters = {}
+        for pk in list(self.parent):
+            clusters.setdefault(self.find(pk), []).append(pk)
+        clusters = [sorted(pks) for pks in clusters.values() if len(pks) > 1]
+        duplicates = sum(len(pks) - 1 for pks in clusters)
+
+        if options['dry_run']:
+            for pks in clusters:
+                self.stdout.write(f'Manter {pks[0]}, remover {pks[1:]}')
+            self.stdout.write(f'{len(clusters)} grupo(s), {duplicates} duplicado(s).')
+            return
+
+        self.merge(clusters)
+        self.stdout.write(self.style.SUCCESS(f'{len(clusters)} grupo(s), {duplicates} duplicado(s) removido(s).'))
+
+    # Union-find over the address ids; the lowest id is always the root
+
+    def find(self, pk):
+        root = pk
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[pk] != root:
+            self.parent[pk], pk = root, self.parent[pk]
+        return root
+
+    def union(self, a, b):
+        self.parent.setdefault(a, a)
+        self.parent.setdefault(b, b)
+        a, b = self.find(a), self.find(b)
+        if a != b:
+            self.parent[max(a, b)] = min(a, b)
+
+    def join_same_fingerprint(self):
+        groups = (
+            # Addresses of no user are never merged, like in NEARBY_PAIRS_SQL
+            Address.objects.exclude(fingerprint=None).exclude(user=None)
+            .values('user_id', 'fingerprint')
+            .annotate(total=Count('pk'))
+            .filter(total__gt=1)
+        )
+        fingerprints = {group['fingerprint'] for group in groups}
+        if not fingerprints:
+            return
+
+        first = {}
+        rows = (
+            Address.objects.filter(fingerprint__in=fingerprints).exclude(user=None)
+            .values_list('pk', 'user_id', 'fingerprint')
+        )
+        for pk, user_id, fingerprint in rows.order_by('pk'):
+            key = (user_id, fingerprint)
+            if key in first:
+                self.union(first[key], pk)
+            else:
+                first[key] = pk
+
+    def join_nearby(self, distance):
+        with connection.cursor() as cursor:
+            cursor.execute(NEARBY_PAIRS_SQL, [distance])
+            pairs = cursor.fetchall()
+        if not pairs:
+            return
+
+        # Neighbouring apartments are close too, so only points with the same number and complement match
+        pks = {pk for pair in pairs for pk in pair}
+        keys = {}
+        for pk, address, complement in Address.objects.filter(pk__in=pks).values_list('pk', 'address', 'complement'):
+            street, number = split_address(address)
+            keys[pk] = (normalize_number(number), normalize_complement(complement))
+
+        for a, b in pairs:
+            if keys[a] == keys[b]:
+                self.union(a, b)
+
+    def merge(self, clusters):
+        addresses = Address.objects.in_bulk([pk for pks in clusters for pk in pks])
+        keepers = []
+        removed = []
+        for pks in clusters:
+            keeper = addresses[pks[0]]
+            for pk in pks[1:]:
+                duplicate = addresses[pk]
+                for field in MERGED_FIELDS:
+                    if not getattr(keeper, field) and getattr(duplicate, field):
+                        setattr(keeper, field, getattr(duplicate, field))
+                removed.append(pk)
+            clean_address(keeper)
+            keepers.append(keeper)
+
+        with transaction.atomic():
+            Address.objects.bulk_update(keepers, MERGED_FIELDS + ['fingerprint'], batch_size=500)
+            Address.objects.filter(pk__in=removed).delete()
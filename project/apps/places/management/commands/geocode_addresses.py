@@ -0,0 +1,109 @@
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from project.apps.places.cache import get_cached_geocodes, get_geocode_cell, set_cached_geocodes
+from project.apps.places.models import Address, GeocodingJob
+from project.utils.geolocation import GEOCODED_FIELDS, apply_geocode, fetch_reverse_geocode
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        'Preenche em lote os campos de texto dos endereços que têm localização mas não têm endereço. '
+        'As consultas remotas são feitas em paralelo, respeitando GEOCODING_RATE_LIMITS. '
+        'Os endereços que não puderem ser geocodificados vão para a fila do geocode_worker.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8, help='Consultas simultâneas ao geocodificador.')
+        parser.add_argument('--chunk-size', type=int, default=500, help='Endereços lidos e gravados por lote.')
+        parser.add_argument('--checkpoint', help='Arquivo com o último id processado, para retomar a execução.')
+        parser.add_argument('--all', action='store_true', help='Inclui endereços que já têm texto.')
+
+    def handle(self, *args, **options):
+        checkpoint = options['checkpoint']
+        last_pk = self.read_checkpoint(checkpoint)
+
+        queryset = Address.objects.filter(location__isnull=False).order_by('pk')
+        if not options['all']:
+            queryset = queryset.filter(Q(address__isnull=True) | Q(address=''))
+        queryset = queryset.only('pk', 'location', *GEOCODED_FIELDS)
+
+        total = 0
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            while True:
+                chunk = list(queryset.filter(pk__gt=last_pk)[:options['chunk_size']])
+                if not chunk:
+                    break
+                total += self.process_chunk(chunk, executor)
+                last_pk = chunk[-1].pk
+                self.write_checkpoint(checkpoint, last_pk)
+                self.stdout.write(f'{total} endereço(s) geocodificado(s), último id {last_pk}')
+
+        self.stdout.write(self.style.SUCCESS(f'Concluído: {total} endereço(s) geocodificado(s).'))
+
+    def process_chunk(self, chunk, executor):
+        cells = {}
+        for address in chunk:
+            cells.setdefault(get_geocode_cell(address.location), address.location)
+
+        results = get_cached_geocodes(cells)
+        misses = [cell for cell in cells if cell not in results]
+
+        # Only the remote lookups run in the pool; all database work stays on this thread
+        fetched = {}
+        for cell, raw in zip(misses, executor.map(self.fetch, [cells[cell] for cell in misses])):
+            if raw is not None:
+                fetched[cell] = raw
+        set_cached_geocodes(fetched)
+        results.update(fetched)
+
+        geocoded = []
+        missed = []
+        for address in chunk:
+            raw = results.get(get_geocode_cell(address.location))
+            if raw is None:
+                missed.append(address)
+                continue
+            try:
+                apply_geocode(raw, address)
+            except Exception as e:
+                # A partial result must not stop the backfill
+                logger.warning('Could not apply the geocode of address %s: %s', address.pk, e)
+                missed.append(address)
+            else:
+                geocoded.append(address)
+
+        with transaction.atomic():
+            Address.objects.bulk_update(geocoded, GEOCODED_FIELDS, batch_size=500)
+            GeocodingJob.objects.filter(
+                address__in=geocoded, status=GeocodingJob.PENDING,
+            ).update(status=GeocodingJob.DONE, error='')
+            # The checkpoint moves past the misses, so geocode_worker retries them with backoff
+            GeocodingJob.objects.enqueue_many(missed)
+        return len(geocoded)
+
+    def fetch(self, point):
+        try:
+            return fetch_reverse_geocode(point)
+        except Exception as e:
+            logger.warning('Geocoding of %s failed: %s', point.coords, e)
+            return None
+
+    def read_checkpoint(self, path):
+        if path and os.path.exists(path):
+            with open(path) as f:
+                return json.load(f).get('last_pk', 0)
+        return 0
+
+    def write_checkpoint(self, path, last_pk):
+        if path:
+            with open(path, 'w') as f:
+                json.dump({'last_pk': last_pk}, f)
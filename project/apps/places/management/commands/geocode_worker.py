@@ -0,0 +1,86 @@
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from project.apps.places.models import GeocodingJob
+from project.utils.geolocation import GEOCODED_FIELDS, apply_geocode, reverse_geocode
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Processa a fila de geocodificação reversa dos endereços (GeocodingJob).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument('--sleep', type=float, default=5, help='Segundos de espera quando a fila está vazia.')
+        parser.add_argument('--max-attempts', type=int, default=getattr(settings, 'GEOCODING_MAX_ATTEMPTS', 5))
+        parser.add_argument('--once', action='store_true', help='Processa um único lote e termina.')
+
+    def handle(self, *args, **options):
+        while True:
+            processed = self.process_batch(options['batch_size'], options['max_attempts'])
+            if processed:
+                self.stdout.write(f'{processed} endereço(s) processado(s)')
+            if options['once']:
+                break
+            if not processed:
+                time.sleep(options['sleep'])
+
+    def process_batch(self, batch_size, max_attempts):
+        jobs = self.claim(batch_size)
+        for job in jobs:
+            self.run_job(job, max_attempts)
+        return len(jobs)
+
+    def claim(self, batch_size):
+        """
+        Lock a batch of due jobs and lease them for GEOCODING_LEASE seconds,
+        in a short transaction: other workers skip them, and they are picked
+        up again if this worker dies. The remote lookups run after the commit.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            jobs = list(
+                GeocodingJob.objects.select_for_update(skip_locked=True, of=('self',))
+                .select_related('address')
+                .filter(status=GeocodingJob.PENDING, next_attempt_at__lte=now)
+                .order_by('next_attempt_at')[:batch_size]
+            )
+            for job in jobs:
+                job.next_attempt_at = now + timedelta(seconds=getattr(settings, 'GEOCODING_LEASE', 300))
+            GeocodingJob.objects.bulk_update(jobs, ['next_attempt_at'])
+        return jobs
+
+    def run_job(self, job, max_attempts):
+        address = job.address
+        try:
+            raw = reverse_geocode(address.location)
+            if raw is None:
+                # Nothing was filled in, so retry it like any other failure instead of marking it done
+                raise LookupError('No address found for this location')
+            with transaction.atomic():
+                apply_geocode(raw, address)
+                address.save(update_fields=GEOCODED_FIELDS)
+        except Exception as e:
+            logger.warning('Geocoding of address %s failed: %s', address.pk, e)
+            job.attempts += 1
+            job.error = str(e)
+            if job.attempts >= max_attempts:
+                job.status = GeocodingJob.FAILED
+            else:
+                job.next_attempt_at = timezone.now() + retry_delay(job.attempts)
+        else:
+            job.status = GeocodingJob.DONE
+            job.error = ''
+        job.save(update_fields=['status', 'attempts', 'error', 'next_attempt_at', 'updated_at'])
+
+
+def retry_delay(attempts):
+    "GEOCODING_RETRY_DELAY seconds, doubled on every attempt"
+    return timedelta(seconds=getattr(settings, 'GEOCODING_RETRY_DELAY', 60) * 2 ** max(attempts - 1, 0))
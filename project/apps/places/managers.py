@@ -0,0 +1,68 @@
+from math import cos, radians
+
+from django.contrib.gis.db import models
+from django.contrib.gis.db.models.functions import Distance, GeometryDistance
+from django.db.models import Count
+from django.db.models.functions import Left
+from django.contrib.gis.measure import D
+
+METERS_PER_DEGREE = 110000  # a little under the shortest degree, so the bounding box is never too small
+
+
+def _as_wgs84(point):
+    if point.srid is None:
+        point.srid = 4326
+    elif point.srid != 4326:
+        point = point.transform(4326, clone=True)
+    return point
+
+
+class AddressQuerySet(models.QuerySet):
+    """
+    Spatial lookups on Address.location. They all go through the GiST index
+    created for the PointField, instead of loading the addresses in Python.
+    """
+
+    def nearest(self, point, k=10):
+        """
+        The ``k`` addresses closest to ``point``, nearest first, annotated
+        with ``distance`` (meters). Ordered with the PostGIS ``<->`` operator,
+        so the index is walked as a KNN search.
+        """
+        point = _as_wgs84(point)
+        return (
+            self.filter(location__isnull=False)
+            .annotate(distance=Distance('location', point))
+            .order_by(GeometryDistance('location', point))[:k]
+        )
+
+    def within_radius(self, point, meters):
+        "Addresses at most ``meters`` away from ``point``, annotated with ``distance`` (meters)"
+        point = _as_wgs84(point)
+        # The index only helps with a distance in degrees, so prefilter on a bounding
+        # radius in degrees wide enough for this latitude, then check the real distance
+        degrees = meters / (METERS_PER_DEGREE * max(cos(radians(point.y)), 0.01))
+        return self.filter(
+            location__dwithin=(point, degrees),
+            location__distance_lte=(point, D(m=meters)),
+        ).annotate(distance=Distance('location', point))
+
+    def in_polygon(self, geom):
+        "Addresses inside the given polygon (or multipolygon)"
+        if geom.srid is None:
+            geom.srid = 4326
+        return self.filter(location__within=geom)
+
+    def in_cell(self, geohash):
+        "Addresses whose geohash starts with the given one (a shorter geohash is a wider cell)"
+        return self.filter(geohash__startswith=geohash)
+
+    def cluster_counts(self, precision=6):
+        "Number of addresses per geohash cell of ``precision`` characters, e.g. for map clusters"
+        return (
+            self.filter(geohash__isnull=False)
+            .annotate(cell=Left('geohash', precision))
+            .values('cell')
+            .annotate(count=Count('pk'))
+            .order_by('cell')
+        )
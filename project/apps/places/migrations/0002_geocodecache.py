@@ -0,0 +1,27 @@
+# Generated by Django 3.2.4 on 2026-10-18 12:00
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GeocodeCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cell', models.CharField(help_text='Coordenadas arredondadas (lat,lng)', max_length=32, unique=True, verbose_name='célula')),
+                ('raw', models.JSONField(verbose_name='resposta')),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='criado em')),
+            ],
+            options={
+                'verbose_name': 'Cache de geocodificação',
+                'verbose_name_plural': 'Cache de geocodificação',
+            },
+        ),
+    ]
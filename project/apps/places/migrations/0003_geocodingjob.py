@@ -0,0 +1,31 @@
+# Generated by Django 3.2.4 on 2026-10-18 12:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0002_geocodecache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GeocodingJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pendente'), ('done', 'Concluído'), ('failed', 'Falhou')], db_index=True, default='pending', max_length=8, verbose_name='situação')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='tentativas')),
+                ('error', models.TextField(blank=True, verbose_name='erro')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='criado em')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='atualizado em')),
+                ('address', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='geocoding_job', to='places.address', verbose_name='Endereço')),
+            ],
+            options={
+                'verbose_name': 'Geocodificação',
+                'verbose_name_plural': 'Geocodificações',
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 3.2.4 on 2026-10-18 12:00
+
+import django.contrib.gis.db.models.fields
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0003_geocodingjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeliveryZone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=64, unique=True, verbose_name='Nome')),
+                ('area', django.contrib.gis.db.models.fields.MultiPolygonField(srid=4326, verbose_name='área')),
+                ('fee', models.DecimalField(decimal_places=2, default=0, max_digits=8, verbose_name='taxa de entrega')),
+                ('priority', models.PositiveSmallIntegerField(default=0, help_text='Onde zonas se sobrepõem, vale a de maior prioridade.', verbose_name='prioridade')),
+                ('is_active', models.BooleanField(default=True, verbose_name='ativa')),
+            ],
+            options={
+                'verbose_name': 'Zona de entrega',
+                'verbose_name_plural': 'Zonas de entrega',
+                'ordering': ('-priority', 'name'),
+            },
+        ),
+        migrations.AddField(
+            model_name='address',
+            name='delivery_zone',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='addresses', to='places.deliveryzone', verbose_name='Zona de entrega'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 3.2.4 on 2026-10-18 12:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0004_deliveryzone'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='address',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text='Célula da localização, atualizada automaticamente', max_length=12, null=True, verbose_name='geohash'),
+        ),
+        migrations.RunSQL(
+            sql=[(
+                'UPDATE places_address SET geohash = ST_GeoHash(location, %s) WHERE location IS NOT NULL',
+                [getattr(settings, 'PLACES_GEOHASH_PRECISION', 9)],
+            )],
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AlterField(
+            model_name='geocodecache',
+            name='cell',
+            field=models.CharField(help_text='Geohash da localização', max_length=32, unique=True, verbose_name='célula'),
+        ),
+    ]
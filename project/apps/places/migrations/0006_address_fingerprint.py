@@ -0,0 +1,133 @@
+# Generated by Django 3.2.4 on 2026-10-18 12:00
+
+import hashlib
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+# Frozen copy of project.apps.places.normalization as of this migration, so
+# later changes to the normalization don't change what this migration does
+
+STREET_TYPES = {
+    'r': 'rua',
+    'av': 'avenida',
+    'avn': 'avenida',
+    'al': 'alameda',
+    'tv': 'travessa',
+    'trav': 'travessa',
+    'rod': 'rodovia',
+    'est': 'estrada',
+    'estr': 'estrada',
+    'pc': 'praca',
+    'pca': 'praca',
+    'lg': 'largo',
+    'vl': 'vila',
+}
+
+COMPLEMENT_WORDS = {
+    'apartamento': 'ap',
+    'apto': 'ap',
+    'apt': 'ap',
+    'bloco': 'bl',
+    'blc': 'bl',
+    'torre': 't',
+    'casa': 'cs',
+    'sala': 'sl',
+    'conjunto': 'cj',
+    'cjto': 'cj',
+    'lote': 'lt',
+    'quadra': 'qd',
+    'qdr': 'qd',
+}
+
+NO_NUMBER = {'sn', 'sno', 'semnumero'}  # canonical forms of 's/n', 's/nº' and 'sem número'
+
+
+def canonical_text(value):
+    "Lowercase, without accents, punctuation or repeated spaces"
+    value = unicodedata.normalize('NFKD', value or '')
+    value = ''.join(char for char in value if not unicodedata.combining(char))
+    value = re.sub(r'[^\w\s]', ' ', value.lower())
+    return ' '.join(value.split())
+
+
+def split_address(address):
+    "Split the 'street, number' text kept in Address.address"
+    street, _, number = (address or '').rpartition(',')
+    if not street:
+        return number, ''
+    return street, number
+
+
+def normalize_street(street):
+    words = canonical_text(street).split()
+    if words and words[0] in STREET_TYPES:
+        words[0] = STREET_TYPES[words[0]]
+    return ' '.join(words)
+
+
+def normalize_number(number):
+    number = canonical_text(number).replace(' ', '')
+    if number in NO_NUMBER:
+        return ''
+    return number.lstrip('0')
+
+
+def normalize_complement(complement):
+    words = canonical_text(complement).split()
+    return ' '.join(COMPLEMENT_WORDS.get(word, word) for word in words)
+
+
+def normalize_postal_code(postal_code):
+    "Digits only"
+    return re.sub(r'\D', '', postal_code or '')
+
+
+def address_fingerprint(address):
+    """
+    Hash of the canonical street, number, complement, postal code and city.
+    Addresses with the same fingerprint are the same place written differently.
+    Returns None if there is no text to compare.
+    """
+    street, number = split_address(address.address)
+    parts = [
+        normalize_street(street),
+        normalize_number(number),
+        normalize_complement(address.complement),
+        normalize_postal_code(address.postal_code),
+    ]
+    if not any(parts):
+        return None
+    parts.append(str(address.city_id or ''))
+    return hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()
+
+
+def fill_fingerprints(apps, schema_editor):
+    Address = apps.get_model('places', 'Address')
+    queryset = Address.objects.only('pk', 'address', 'complement', 'postal_code', 'city_id').order_by('pk')
+    last_pk = 0
+    while True:
+        chunk = list(queryset.filter(pk__gt=last_pk)[:2000])
+        if not chunk:
+            break
+        for address in chunk:
+            address.fingerprint = address_fingerprint(address)
+        Address.objects.bulk_update(chunk, ['fingerprint'])
+        last_pk = chunk[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0005_address_geohash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='address',
+            name='fingerprint',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text='Hash do endereço normalizado, usado para achar duplicados', max_length=40, null=True, verbose_name='impressão digital'),
+        ),
+        migrations.RunPython(fill_fingerprints, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 3.2.4 on 2026-10-18 12:00
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0006_address_fingerprint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='geocodingjob',
+            name='next_attempt_at',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now, help_text='Jobs em andamento ficam reservados até esse momento', verbose_name='próxima tentativa'),
+        ),
+    ]
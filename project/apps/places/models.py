@@ -1,18 +1,59 @@
+import logging
+import time
+
 import geopy
 from django.contrib.auth import get_user_model
 from django.contrib.gis.db import models
+from django.db import DatabaseError, transaction
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from project import settings
 
+from .managers import AddressQuerySet
+
+logger = logging.getLogger(__name__)
+
+# Field defaults are resolved once per process, instead of on every new instance,
+# and resolved again after PLACES_CITY_CACHE_TIMEOUT seconds: {name: (value, resolved at)}
+_default_places = {}
+
+
+def _get_default_place(name, resolve):
+    cached = _default_places.get(name)
+    timeout = getattr(settings.base, 'PLACES_CITY_CACHE_TIMEOUT', 300)
+    if cached is not None and time.monotonic() - cached[1] <= timeout:
+        return cached[0]
+    try:
+        with transaction.atomic():
+            value = resolve()
+    except DatabaseError as e:
+        # E.g. tables not migrated yet: leave the field empty rather than failing
+        logger.warning('Could not resolve the default %s: %s', name, e)
+        return None
+
+    def remember():
+        _default_places[name] = (value, time.monotonic())
+
+    # A row created inside a transaction that is rolled back (e.g. in a TestCase)
+    # must not be cached, so it is only kept once the transaction commits
+    transaction.on_commit(remember)
+    return value
+
+
+def clear_default_places():
+    _default_places.clear()
+
 
 def get_default_city():
-    return City.objects.get_or_create(name=settings.base.DEFAULT_CITY)[0].id
+    return _get_default_place('city', lambda: City.objects.get_or_create(name=settings.base.DEFAULT_CITY)[0].id)
 
 def get_default_state():
-    return State.objects.get_or_create(code=settings.base.DEFAULT_STATE_CODE, name=settings.base.DEFAULT_STATE)[0].code
+    return _get_default_place('state', lambda: State.objects.get_or_create(
+        code=settings.base.DEFAULT_STATE_CODE, defaults={'name': settings.base.DEFAULT_STATE})[0].code)
 
 def get_default_country():
-    return Country.objects.get_or_create(code=settings.base.DEFAULT_COUNTRY_CODE, name=settings.base.DEFAULT_COUNTRY)[0].code
+    return _get_default_place('country', lambda: Country.objects.get_or_create(
+        code=settings.base.DEFAULT_COUNTRY_CODE, defaults={'name': settings.base.DEFAULT_COUNTRY})[0].code)
 
 # def get_default_address_tag():
 #     return AddressTag.objects.get_or_create(name=settings.DEFAULT_ADDRESS_TAG)[0].id
@@ -30,16 +71,24 @@ class Address(models.Model):
     user = models.ForeignKey('accounts.User', on_delete=models.CASCADE, verbose_name=_(
         'Usuário'), blank=True, null=True, related_name="user_address")
     location = models.PointField(_('localização'), null=True, blank=True, help_text=_(''))
+    geohash = models.CharField(_('geohash'), max_length=12, null=True, blank=True, db_index=True, editable=False,
+                               help_text=_('Célula da localização, atualizada automaticamente'))
     address = models.CharField(_('endereço'), max_length=256, null=True, blank=True, help_text=_('Rua e número'))
     complement = models.CharField(_('complemento'), max_length=256, null=True, blank=True, help_text=_('Apto, bloco, casa'))
     neighbourhood = models.CharField(_('bairro'), max_length=256, null=True, blank=True)
     city = models.ForeignKey('City', on_delete=models.SET_NULL, verbose_name=_(
         'Cidade'), default=get_default_city, null=True, blank=True)
+    delivery_zone = models.ForeignKey('DeliveryZone', on_delete=models.SET_NULL, verbose_name=_(
+        'Zona de entrega'), null=True, blank=True, related_name='addresses')
 
     postal_code = models.CharField(_('código postal'), max_length=16, null=True, blank=True)
+    fingerprint = models.CharField(_('impressão digital'), max_length=40, null=True, blank=True, db_index=True,
+                                   editable=False, help_text=_('Hash do endereço normalizado, usado para achar duplicados'))
     instructions = models.CharField(_('ponto de referência'), max_length=256, null=True, blank=True, help_text=_('Ou alguma informação que devemos saber ao entregar o pedido.'))
     extra = models.TextField(blank=True, null=True)
 
+    objects = AddressQuerySet.as_manager()
+
     class Meta:
         verbose_name = _('Endereço')
         verbose_name_plural = _('Endereços')
@@ -47,6 +96,30 @@ class Address(models.Model):
     def __str__(self):
         return f'{self.address}, {self.complement}, {self.city}'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Keep the loaded location, so changes can be detected without reloading the row
+        if 'location' in field_names:
+            instance._loaded_location = values[field_names.index('location')]
+        return instance
+
+    def location_has_changed(self):
+        if self._state.adding:
+            return self.location is not None
+        if not hasattr(self, '_loaded_location'):
+            # Location was deferred when loading, so it only changed if it was assigned since
+            return 'location' in self.__dict__
+        return self.location != self._loaded_location
+
+    def get_geocoding_status(self):
+        try:
+            return self.geocoding_job.status
+        except GeocodingJob.DoesNotExist:
+            return None
+    get_geocoding_status.short_description = 'geocodificação'
+    geocoding_status = property(get_geocoding_status)
+
     def get_coords(self):
         if self.location:
             return f"({self.location.y} {self.location.x})"
@@ -146,3 +219,83 @@ class Neighbourhood(models.Model):
 
     def __str__(self):
         return f"{self.name}" # ({self.city})"
+
+
+class DeliveryZone(models.Model):
+    name = models.CharField(_('Nome'), max_length=64, unique=True)
+    area = models.MultiPolygonField(_('área'))
+    fee = models.DecimalField(_('taxa de entrega'), max_digits=8, decimal_places=2, default=0)
+    priority = models.PositiveSmallIntegerField(_('prioridade'), default=0, help_text=_(
+        'Onde zonas se sobrepõem, vale a de maior prioridade.'))
+    is_active = models.BooleanField(_('ativa'), default=True)
+
+    class Meta():
+        verbose_name = _('Zona de entrega')
+        verbose_name_plural = _('Zonas de entrega')
+        ordering = ('-priority', 'name')
+
+    def __str__(self):
+        return self.name
+
+
+class GeocodingJobManager(models.Manager):
+
+    def enqueue(self, address):
+        "Schedule (or reschedule) the reverse geocoding of an address"
+        job, created = self.update_or_create(
+            address=address,
+            defaults={'status': GeocodingJob.PENDING, 'attempts': 0, 'error': '', 'next_attempt_at': timezone.now()},
+        )
+        return job
+
+    def enqueue_many(self, addresses):
+        "Bulk version of enqueue(), for imports that bypass the model signals"
+        ids = [address.pk for address in addresses]
+        now = timezone.now()
+        self.filter(address_id__in=ids).update(
+            status=GeocodingJob.PENDING, attempts=0, error='', next_attempt_at=now, updated_at=now,
+        )
+        self.bulk_create([GeocodingJob(address_id=pk) for pk in ids], ignore_conflicts=True)
+
+
+class GeocodingJob(models.Model):
+    PENDING = 'pending'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, _('Pendente')),
+        (DONE, _('Concluído')),
+        (FAILED, _('Falhou')),
+    )
+
+    address = models.OneToOneField('Address', on_delete=models.CASCADE, verbose_name=_(
+        'Endereço'), related_name='geocoding_job')
+    status = models.CharField(_('situação'), max_length=8, choices=STATUS_CHOICES, default=PENDING, db_index=True)
+    attempts = models.PositiveSmallIntegerField(_('tentativas'), default=0)
+    error = models.TextField(_('erro'), blank=True)
+    next_attempt_at = models.DateTimeField(_('próxima tentativa'), default=timezone.now, db_index=True, help_text=_(
+        'Jobs em andamento ficam reservados até esse momento'))
+    created_at = models.DateTimeField(_('criado em'), default=timezone.now)
+    updated_at = models.DateTimeField(_('atualizado em'), auto_now=True)
+
+    objects = GeocodingJobManager()
+
+    class Meta():
+        verbose_name = _('Geocodificação')
+        verbose_name_plural = _('Geocodificações')
+
+    def __str__(self):
+        return f"{self.address_id} ({self.status})"
+
+
+class GeocodeCache(models.Model):
+    cell = models.CharField(_('célula'), max_length=32, unique=True, help_text=_('Geohash da localização'))
+    raw = models.JSONField(_('resposta'))
+    created_at = models.DateTimeField(_('criado em'), default=timezone.now, db_index=True)
+
+    class Meta():
+        verbose_name = _('Cache de geocodificação')
+        verbose_name_plural = _('Cache de geocodificação')
+
+    def __str__(self):
+        return self.cell
@@ -0,0 +1,121 @@
+"""
+Address normalization.
+
+The canonical forms are only used for comparison (the fingerprint), the
+text shown to users is just tidied up (see clean_address()).
+"""
+import hashlib
+import re
+import unicodedata
+
+STREET_TYPES = {
+    'r': 'rua',
+    'av': 'avenida',
+    'avn': 'avenida',
+    'al': 'alameda',
+    'tv': 'travessa',
+    'trav': 'travessa',
+    'rod': 'rodovia',
+    'est': 'estrada',
+    'estr': 'estrada',
+    'pc': 'praca',
+    'pca': 'praca',
+    'lg': 'largo',
+    'vl': 'vila',
+}
+
+COMPLEMENT_WORDS = {
+    'apartamento': 'ap',
+    'apto': 'ap',
+    'apt': 'ap',
+    'bloco': 'bl',
+    'blc': 'bl',
+    'torre': 't',
+    'casa': 'cs',
+    'sala': 'sl',
+    'conjunto': 'cj',
+    'cjto': 'cj',
+    'lote': 'lt',
+    'quadra': 'qd',
+    'qdr': 'qd',
+}
+
+NO_NUMBER = {'sn', 'sno', 'semnumero'}  # canonical forms of 's/n', 's/nº' and 'sem número'
+
+
+def canonical_text(value):
+    "Lowercase, without accents, punctuation or repeated spaces"
+    value = unicodedata.normalize('NFKD', value or '')
+    value = ''.join(char for char in value if not unicodedata.combining(char))
+    value = re.sub(r'[^\w\s]', ' ', value.lower())
+    return ' '.join(value.split())
+
+
+def split_address(address):
+    "Split the 'street, number' text kept in Address.address"
+    street, _, number = (address or '').rpartition(',')
+    if not street:
+        return number, ''
+    return street, number
+
+
+def normalize_street(street):
+    words = canonical_text(street).split()
+    if words and words[0] in STREET_TYPES:
+        words[0] = STREET_TYPES[words[0]]
+    return ' '.join(words)
+
+
+def normalize_number(number):
+    number = canonical_text(number).replace(' ', '')
+    if number in NO_NUMBER:
+        return ''
+    return number.lstrip('0')
+
+
+def normalize_complement(complement):
+    words = canonical_text(complement).split()
+    return ' '.join(COMPLEMENT_WORDS.get(word, word) for word in words)
+
+
+def normalize_postal_code(postal_code):
+    "Digits only"
+    return re.sub(r'\D', '', postal_code or '')
+
+
+def format_postal_code(postal_code):
+    "Brazilian postal codes (CEP) as 00000-000, anything else just stripped"
+    digits = normalize_postal_code(postal_code)
+    if len(digits) == 8:
+        return f'{digits[:5]}-{digits[5:]}'
+    return (postal_code or '').strip() or None
+
+
+def address_fingerprint(address):
+    """
+    Hash of the canonical street, number, complement, postal code and city.
+    Addresses with the same fingerprint are the same place written differently.
+    Returns None if there is no text to compare.
+    """
+    street, number = split_address(address.address)
+    parts = [
+        normalize_street(street),
+        normalize_number(number),
+        normalize_complement(address.complement),
+        normalize_postal_code(address.postal_code),
+    ]
+    if not any(parts):
+        return None
+    parts.append(str(address.city_id or ''))
+    return hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()
+
+
+def clean_address(address):
+    "Tidy up the text fields of an Address in place and update its fingerprint"
+    for field in ('address', 'complement', 'neighbourhood'):
+        value = getattr(address, field)
+        if value is not None:
+            setattr(address, field, ' '.join(value.split()) or None)
+    if address.postal_code:
+        address.postal_code = format_postal_code(address.postal_code)
+    address.fingerprint = address_fingerprint(address)
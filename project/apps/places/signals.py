@@ -1,16 +1,67 @@
+from django.conf import settings
 from django.dispatch import receiver
-from django.db.models.signals import post_save, pre_save
-from project.apps.places.models import Address
+from django.db.models.signals import post_delete, post_save, pre_save
+from project.apps.places.cache import clear_city_cache, clear_delivery_zone_cache, get_delivery_zone_id
+from project.apps.places.normalization import clean_address
+from project.apps.places.models import (
+    Address, City, Country, DeliveryZone, GeocodingJob, State, clear_default_places,
+)
+from project.utils import geohash
 from project.utils.geolocation import point_to_address
 
 
+def geocoding_is_async():
+    return getattr(settings, 'GEOCODING_ASYNC', True)
+
+
 @receiver(pre_save, sender=Address)
-def get_address_from_location(sender, instance, **kwargs):
-    try:
-        obj = sender.objects.get(pk=instance.pk)
-    except sender.DoesNotExist:
-        # Object is new, so field hasn't technically changed, but you may want to do something else here.
+def get_address_from_location(sender, instance, raw=False, **kwargs):
+    instance._location_changed = not raw and instance.location_has_changed()
+    if instance._location_changed and not geocoding_is_async():
         point_to_address(instance.location, instance)
-    else:
-        if not obj.location == instance.location:
-            point_to_address(instance.location, instance)
+
+
+@receiver(pre_save, sender=Address)
+def normalize_address(sender, instance, raw=False, **kwargs):
+    if not raw:
+        clean_address(instance)
+
+
+@receiver(pre_save, sender=Address)
+def update_geohash(sender, instance, raw=False, **kwargs):
+    if getattr(instance, '_location_changed', False):
+        precision = getattr(settings, 'PLACES_GEOHASH_PRECISION', 9)
+        instance.geohash = geohash.encode_point(instance.location, precision) if instance.location else None
+
+
+@receiver(pre_save, sender=Address)
+def assign_delivery_zone(sender, instance, raw=False, **kwargs):
+    if getattr(instance, '_location_changed', False):
+        instance.delivery_zone_id = get_delivery_zone_id(instance.location) if instance.location else None
+
+
+@receiver(post_save, sender=Address)
+def enqueue_address_geocoding(sender, instance, raw=False, **kwargs):
+    # The address is saved right away; its text fields are filled later by the geocode_worker command
+    if getattr(instance, '_location_changed', False) and instance.location and geocoding_is_async():
+        GeocodingJob.objects.enqueue(instance)
+    instance._loaded_location = instance.location
+
+
+@receiver([post_save, post_delete], sender=City)
+@receiver([post_save, post_delete], sender=State)
+@receiver([post_save, post_delete], sender=Country)
+def invalidate_city_cache(sender, **kwargs):
+    clear_city_cache()
+
+
+@receiver(post_delete, sender=City)
+@receiver(post_delete, sender=State)
+@receiver(post_delete, sender=Country)
+def invalidate_default_places(sender, **kwargs):
+    clear_default_places()
+
+
+@receiver([post_save, post_delete], sender=DeliveryZone)
+def invalidate_delivery_zone_cache(sender, **kwargs):
+    clear_delivery_zone_cache()
@@ -0,0 +1,35 @@
+from django.contrib.gis.geos import Point
+from django.test import TestCase, override_settings
+
+from project.apps.places.models import Address
+from project.utils import geohash
+
+from .utils import CENTRO, IGAPO
+
+
+@override_settings(GEOCODING_ASYNC=True, PLACES_GEOHASH_PRECISION=9)
+class AddressCellTests(TestCase):
+    def test_geohash_follows_the_location(self):
+        address = Address.objects.create(location=CENTRO)
+        self.assertEqual(address.geohash, geohash.encode_point(CENTRO, 9))
+
+        address = Address.objects.get(pk=address.pk)
+        address.location = IGAPO
+        address.save()
+        self.assertEqual(Address.objects.get(pk=address.pk).geohash, geohash.encode_point(IGAPO, 9))
+
+        address.location = None
+        address.save()
+        self.assertIsNone(Address.objects.get(pk=address.pk).geohash)
+
+    def test_in_cell_and_cluster_counts(self):
+        neighbour = Point(CENTRO.x + 0.0001, CENTRO.y, srid=4326)
+        for point in (CENTRO, neighbour, IGAPO):
+            Address.objects.create(location=point)
+        cell = geohash.encode_point(CENTRO, 6)
+        self.assertEqual(geohash.encode_point(neighbour, 6), cell)
+
+        self.assertEqual(Address.objects.in_cell(cell).count(), 2)
+        counts = {row['cell']: row['count'] for row in Address.objects.cluster_counts(precision=6)}
+        self.assertEqual(counts[cell], 2)
+        self.assertEqual(sum(counts.values()), 3)
@@ -0,0 +1,34 @@
+from django.test import TestCase, override_settings
+
+from project.apps.places.cache import clear_city_cache, get_city
+from project.apps.places.models import City, Country, State
+
+
+@override_settings(PLACES_CITY_CACHE_TIMEOUT=300)
+class CityCacheTests(TestCase):
+    def setUp(self):
+        # The cache is process-wide, so it outlives the test transactions
+        clear_city_cache()
+
+    def lookup(self, city='Londrina'):
+        return get_city('BR', 'Brasil', 'PR', 'Paraná', city)
+
+    def test_creates_the_missing_places_once(self):
+        city = self.lookup()
+
+        self.assertEqual(City.objects.get(pk=city.pk).name, 'Londrina')
+        self.assertEqual(Country.objects.get(code='BR').name, 'Brasil')
+        self.assertEqual(State.objects.get(code='PR').name, 'Paraná')
+        self.assertEqual(self.lookup().pk, city.pk)
+        self.assertEqual(City.objects.count(), 1)
+
+    def test_known_cities_cost_no_query(self):
+        city = self.lookup()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.lookup().pk, city.pk)
+
+    def test_saving_a_place_reloads_the_cache(self):
+        self.lookup()
+        cambe = City.objects.create(name='Cambé', state_id='PR', country_id='BR')
+        with self.assertNumQueries(1):
+            self.assertEqual(self.lookup('Cambé').pk, cambe.pk)
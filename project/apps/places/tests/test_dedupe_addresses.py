@@ -0,0 +1,53 @@
+import os
+
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import Point
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from project.apps.places.models import Address
+
+User = get_user_model()
+
+
+@override_settings(GEOCODING_ASYNC=True)
+class DedupeAddressesTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('maria@example.com', 's3cret')
+
+    def dedupe(self):
+        call_command('dedupe_addresses', stdout=open(os.devnull, 'w'))
+
+    def test_merges_the_same_address_written_differently(self):
+        kept = Address.objects.create(user=self.user, address='Av. Higienópolis, 1000', complement='Apto 12')
+        Address.objects.create(user=self.user, address='avenida higienopolis, 1000', complement='apartamento 12',
+                               instructions='Portão azul')
+        self.dedupe()
+
+        self.assertEqual(list(Address.objects.values_list('pk', flat=True)), [kept.pk])
+        kept.refresh_from_db()
+        self.assertEqual(kept.instructions, 'Portão azul')
+
+    def test_merges_nearby_points_with_the_same_number(self):
+        kept = Address.objects.create(user=self.user, location=Point(-51.16280, -23.31050), address='Rua A, 10')
+        Address.objects.create(user=self.user, location=Point(-51.16285, -23.31052), address='R. A, 10')
+        Address.objects.create(user=self.user, location=Point(-51.16282, -23.31051), address='Rua A, 12')
+        self.dedupe()
+
+        self.assertEqual(Address.objects.count(), 2)
+        self.assertTrue(Address.objects.filter(pk=kept.pk).exists())
+
+    def test_keeps_addresses_of_different_users_and_of_no_user(self):
+        other = User.objects.create_user('joao@example.com', 's3cret')
+        for owner in (self.user, other, None, None):
+            Address.objects.create(user=owner, address='Rua Pernambuco, 250')
+        self.dedupe()
+
+        self.assertEqual(Address.objects.count(), 4)
+
+    def test_dry_run_changes_nothing(self):
+        for _ in range(2):
+            Address.objects.create(user=self.user, address='Rua Pernambuco, 250')
+        call_command('dedupe_addresses', dry_run=True, stdout=open(os.devnull, 'w'))
+
+        self.assertEqual(Address.objects.count(), 2)
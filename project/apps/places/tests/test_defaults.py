@@ -0,0 +1,30 @@
+from django.db import transaction
+from django.test import TestCase
+
+from project.apps.places.models import Address, City, clear_default_places, get_default_city
+
+
+class Rollback(Exception):
+    pass
+
+
+class DefaultPlacesTests(TestCase):
+    def setUp(self):
+        clear_default_places()
+
+    def test_new_addresses_get_the_default_city(self):
+        city = City.objects.get(pk=Address().city_id)
+        self.assertEqual(Address().city_id, city.pk)
+
+    def test_rolled_back_default_is_not_cached(self):
+        try:
+            with transaction.atomic():
+                get_default_city()
+                raise Rollback
+        except Rollback:
+            pass
+        self.assertTrue(City.objects.filter(pk=get_default_city()).exists())
+
+    def test_deleting_the_default_city_resolves_it_again(self):
+        City.objects.filter(pk=get_default_city()).delete()
+        self.assertTrue(City.objects.filter(pk=Address().city_id).exists())
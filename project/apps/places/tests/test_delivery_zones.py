@@ -0,0 +1,54 @@
+import os
+
+from django.contrib.gis.geos import MultiPolygon, Point, Polygon
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from project.apps.places.cache import clear_delivery_zone_cache
+from project.apps.places.models import Address, DeliveryZone
+
+from .utils import CENTRO, IGAPO
+
+
+def area(center, size):
+    "Square of ``size`` degrees around ``center``"
+    return MultiPolygon(Polygon.from_bbox((
+        center.x - size / 2, center.y - size / 2, center.x + size / 2, center.y + size / 2,
+    )), srid=4326)
+
+
+@override_settings(GEOCODING_ASYNC=True)
+class DeliveryZoneTests(TestCase):
+    def setUp(self):
+        clear_delivery_zone_cache()
+        self.city = DeliveryZone.objects.create(name='Londrina', area=area(CENTRO, 0.2))
+        self.centro = DeliveryZone.objects.create(name='Centro', area=area(CENTRO, 0.01), priority=10)
+
+    def test_assigned_on_save(self):
+        self.assertEqual(Address.objects.create(location=CENTRO).delivery_zone_id, self.centro.pk)
+        self.assertEqual(Address.objects.create(location=IGAPO).delivery_zone_id, self.city.pk)
+        self.assertIsNone(Address.objects.create(location=Point(0, 0, srid=4326)).delivery_zone_id)
+
+    def test_follows_location_changes(self):
+        address = Address.objects.create(location=CENTRO)
+        address.location = IGAPO
+        address.save()
+        self.assertEqual(Address.objects.get(pk=address.pk).delivery_zone_id, self.city.pk)
+
+    def test_inactive_zones_are_ignored(self):
+        self.centro.is_active = False
+        self.centro.save()
+        self.assertEqual(Address.objects.create(location=CENTRO).delivery_zone_id, self.city.pk)
+
+    def test_reassign_after_zone_changes(self):
+        centro = Address.objects.create(location=CENTRO)
+        igapo = Address.objects.create(location=IGAPO)
+        DeliveryZone.objects.filter(pk=self.centro.pk).update(priority=0, area=area(IGAPO, 0.01))
+
+        call_command('assign_delivery_zones', stdout=open(os.devnull, 'w'))
+
+        centro.refresh_from_db()
+        igapo.refresh_from_db()
+        self.assertEqual(centro.delivery_zone_id, self.city.pk)
+        # Same priority: ties go to the first zone by name
+        self.assertEqual(igapo.delivery_zone_id, self.centro.pk)
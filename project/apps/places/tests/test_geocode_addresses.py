@@ -0,0 +1,71 @@
+import json
+import os
+import tempfile
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from project.apps.places.cache import clear_geocode_cache
+from project.apps.places.models import Address, GeocodingJob
+
+from .utils import CENTRO, IGAPO, recorded_response
+
+FETCH = 'project.apps.places.management.commands.geocode_addresses.fetch_reverse_geocode'
+
+
+def fetch_recorded(point):
+    if point.equals_exact(CENTRO, 1e-6):
+        return recorded_response(CENTRO)
+    return None
+
+
+@override_settings(GEOCODING_ASYNC=True)
+class GeocodeAddressesTests(TestCase):
+    def setUp(self):
+        # The in-memory part of the cache outlives the test transactions
+        clear_geocode_cache()
+
+    def run_command(self, **options):
+        call_command('geocode_addresses', workers=1, stdout=open(os.devnull, 'w'), **options)
+
+    @mock.patch(FETCH, side_effect=fetch_recorded)
+    def test_fills_addresses_and_queues_the_misses(self, fetch):
+        found = Address.objects.create(location=CENTRO)
+        missed = Address.objects.create(location=IGAPO)
+        GeocodingJob.objects.all().delete()
+
+        self.run_command()
+
+        found.refresh_from_db()
+        self.assertEqual(found.address, 'Av. Higienópolis, 1000')
+        self.assertFalse(GeocodingJob.objects.filter(address=found).exists())
+        self.assertEqual(GeocodingJob.objects.get(address=missed).status, GeocodingJob.PENDING)
+
+    @mock.patch(FETCH, return_value={
+        # A partial result: sublocality without sublocality_level_1
+        'address_components': [{'types': ['sublocality'], 'short_name': 'Centro', 'long_name': 'Centro'}],
+    })
+    def test_partial_results_dont_stop_the_backfill(self, fetch):
+        address = Address.objects.create(location=CENTRO)
+        GeocodingJob.objects.all().delete()
+
+        self.run_command()
+
+        address.refresh_from_db()
+        self.assertIsNone(address.address)
+        self.assertEqual(GeocodingJob.objects.get(address=address).status, GeocodingJob.PENDING)
+
+    @mock.patch(FETCH, side_effect=fetch_recorded)
+    def test_resumes_from_the_checkpoint(self, fetch):
+        first = Address.objects.create(location=IGAPO)
+        second = Address.objects.create(location=CENTRO)
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+            json.dump({'last_pk': first.pk}, f)
+        self.addCleanup(os.remove, f.name)
+
+        self.run_command(checkpoint=f.name)
+
+        fetch.assert_called_once()
+        with open(f.name) as checkpoint:
+            self.assertEqual(json.load(checkpoint), {'last_pk': second.pk})
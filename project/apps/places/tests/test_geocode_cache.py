@@ -0,0 +1,73 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.gis.geos import Point
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from project.apps.places.cache import (
+    _geocode_lru, clear_geocode_cache, get_geocode_cell, prune_geocode_cache, set_cached_geocode,
+)
+from project.apps.places.models import GeocodeCache
+from project.utils.geolocation import reverse_geocode
+
+from .utils import CENTRO, IGAPO, recorded_response
+
+FETCH = 'project.utils.geolocation.fetch_reverse_geocode'
+
+
+@override_settings(GEOCODE_CACHE_PRECISION=9, GEOCODE_CACHE_TIMEOUT=60 * 60)
+class ReverseGeocodeCacheTests(TestCase):
+    def setUp(self):
+        # The in-memory part of the cache outlives the test transactions
+        clear_geocode_cache()
+
+    def test_points_in_the_same_cell_share_one_lookup(self):
+        nearby = Point(CENTRO.x + 0.000001, CENTRO.y, srid=4326)
+        self.assertEqual(get_geocode_cell(nearby), get_geocode_cell(CENTRO))
+
+        with mock.patch(FETCH, return_value=recorded_response(CENTRO)) as fetch:
+            self.assertEqual(reverse_geocode(CENTRO), recorded_response(CENTRO))
+            self.assertEqual(reverse_geocode(nearby), recorded_response(CENTRO))
+        fetch.assert_called_once()
+
+    def test_other_cells_are_looked_up(self):
+        with mock.patch(FETCH, side_effect=recorded_response) as fetch:
+            reverse_geocode(CENTRO)
+            reverse_geocode(IGAPO)
+        self.assertEqual(fetch.call_count, 2)
+
+    def test_kept_in_the_database_for_other_processes(self):
+        with mock.patch(FETCH, return_value=recorded_response(CENTRO)):
+            reverse_geocode(CENTRO)
+        _geocode_lru.clear()
+
+        with mock.patch(FETCH) as fetch:
+            self.assertEqual(reverse_geocode(CENTRO), recorded_response(CENTRO))
+        fetch.assert_not_called()
+
+    def test_expired_cells_are_looked_up_again(self):
+        with mock.patch(FETCH, return_value=recorded_response(CENTRO)):
+            reverse_geocode(CENTRO)
+        _geocode_lru.clear()
+        GeocodeCache.objects.update(created_at=timezone.now() - timedelta(hours=2))
+
+        with mock.patch(FETCH, return_value=recorded_response(CENTRO)) as fetch:
+            reverse_geocode(CENTRO)
+        fetch.assert_called_once()
+
+    def test_misses_are_not_cached(self):
+        with mock.patch(FETCH, return_value=None) as fetch:
+            self.assertIsNone(reverse_geocode(CENTRO))
+            self.assertIsNone(reverse_geocode(CENTRO))
+        self.assertEqual(fetch.call_count, 2)
+        self.assertFalse(GeocodeCache.objects.exists())
+
+    @override_settings(GEOCODE_CACHE_MAX_ENTRIES=2)
+    def test_prune_keeps_the_newest_entries(self):
+        for i, cell in enumerate(['6gge1', '6gge2', '6gge3', '6gge4']):
+            set_cached_geocode(cell, {'n': i})
+            GeocodeCache.objects.filter(cell=cell).update(created_at=timezone.now() - timedelta(minutes=10 - i))
+        prune_geocode_cache()
+
+        self.assertEqual(sorted(GeocodeCache.objects.values_list('cell', flat=True)), ['6gge3', '6gge4'])
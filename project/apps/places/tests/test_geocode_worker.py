@@ -0,0 +1,61 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from project.apps.places.management.commands.geocode_worker import Command
+from project.apps.places.models import Address, GeocodingJob
+
+from .utils import CENTRO, recorded_response
+
+REVERSE_GEOCODE = 'project.apps.places.management.commands.geocode_worker.reverse_geocode'
+
+
+@override_settings(GEOCODING_ASYNC=True, GEOCODING_LEASE=300, GEOCODING_RETRY_DELAY=60)
+class GeocodeWorkerTests(TestCase):
+    def setUp(self):
+        self.address = Address.objects.create(location=CENTRO)
+        self.job = self.address.geocoding_job
+
+    def process(self, max_attempts=3):
+        return Command().process_batch(10, max_attempts)
+
+    def test_saving_a_location_enqueues_a_job(self):
+        self.assertEqual(self.job.status, GeocodingJob.PENDING)
+
+    def test_claim_leases_the_jobs(self):
+        self.assertEqual([job.pk for job in Command().claim(10)], [self.job.pk])
+        self.assertEqual(Command().claim(10), [])
+        self.job.refresh_from_db()
+        self.assertGreater(self.job.next_attempt_at, timezone.now() + timedelta(seconds=290))
+
+    def test_fills_the_address(self):
+        with mock.patch(REVERSE_GEOCODE, return_value=recorded_response(CENTRO)):
+            self.assertEqual(self.process(), 1)
+
+        self.job.refresh_from_db()
+        self.address.refresh_from_db()
+        self.assertEqual(self.job.status, GeocodingJob.DONE)
+        self.assertEqual(self.address.address, 'Av. Higienópolis, 1000')
+        self.assertEqual(self.address.city.name, 'Londrina')
+
+    def test_empty_result_is_retried_later(self):
+        with mock.patch(REVERSE_GEOCODE, return_value=None):
+            self.process()
+
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, GeocodingJob.PENDING)
+        self.assertEqual(self.job.attempts, 1)
+        self.assertGreater(self.job.next_attempt_at, timezone.now() + timedelta(seconds=50))
+        self.assertEqual(Command().claim(10), [])
+
+    def test_fails_after_max_attempts(self):
+        with mock.patch(REVERSE_GEOCODE, side_effect=TimeoutError('timeout')):
+            for attempt in range(3):
+                GeocodingJob.objects.update(next_attempt_at=timezone.now())
+                self.process(max_attempts=3)
+
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, GeocodingJob.FAILED)
+        self.assertEqual(self.job.error, 'timeout')
@@ -0,0 +1,47 @@
+from types import SimpleNamespace
+
+from django.test import SimpleTestCase
+
+from project.apps.places.normalization import (
+    address_fingerprint, canonical_text, format_postal_code, normalize_complement, normalize_number,
+    normalize_street,
+)
+
+
+def address(text, complement=None, postal_code=None, city_id=1):
+    return SimpleNamespace(address=text, complement=complement, postal_code=postal_code, city_id=city_id)
+
+
+class NormalizationTests(SimpleTestCase):
+    def test_canonical_text(self):
+        self.assertEqual(canonical_text('  Rua  São João, 10 '), 'rua sao joao 10')
+
+    def test_street_types(self):
+        self.assertEqual(normalize_street('Av. Higienópolis'), 'avenida higienopolis')
+        self.assertEqual(normalize_street('R Pernambuco'), 'rua pernambuco')
+
+    def test_numbers_without_a_number(self):
+        for value in ('s/n', 'S/N', 's/nº', 'sem número'):
+            self.assertEqual(normalize_number(value), '', value)
+        self.assertEqual(normalize_number('0250'), '250')
+
+    def test_complement_words(self):
+        self.assertEqual(normalize_complement('Apartamento 12, Bloco B'), 'ap 12 bl b')
+
+    def test_postal_code(self):
+        self.assertEqual(format_postal_code('86020080'), '86020-080')
+        self.assertEqual(format_postal_code(' 1234 '), '1234')
+
+    def test_fingerprint_ignores_spelling(self):
+        self.assertEqual(
+            address_fingerprint(address('Av. Higienópolis, 1000', 'Apto 12', '86020-080')),
+            address_fingerprint(address('avenida higienopolis,1000', 'apartamento 12', '86020080')),
+        )
+
+    def test_fingerprint_depends_on_number_and_city(self):
+        fingerprint = address_fingerprint(address('Rua Pernambuco, 250'))
+        self.assertNotEqual(fingerprint, address_fingerprint(address('Rua Pernambuco, 251')))
+        self.assertNotEqual(fingerprint, address_fingerprint(address('Rua Pernambuco, 250', city_id=2)))
+
+    def test_no_fingerprint_without_text(self):
+        self.assertIsNone(address_fingerprint(address(None)))
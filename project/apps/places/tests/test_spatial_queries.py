@@ -0,0 +1,43 @@
+from django.contrib.gis.geos import Point, Polygon
+from django.test import TestCase, override_settings
+
+from project.apps.places.models import Address
+
+from .utils import CENTRO
+
+
+def offset(point, meters_north):
+    "Point ``meters_north`` meters north of ``point`` (a degree of latitude is ~111 km)"
+    return Point(point.x, point.y + meters_north / 111320, srid=4326)
+
+
+@override_settings(GEOCODING_ASYNC=True)
+class AddressSpatialQueryTests(TestCase):
+    def setUp(self):
+        self.near = Address.objects.create(location=offset(CENTRO, 50))
+        self.middle = Address.objects.create(location=offset(CENTRO, 400))
+        self.far = Address.objects.create(location=offset(CENTRO, 5000))
+        Address.objects.create(address='Sem localização, 1')
+
+    def test_nearest(self):
+        nearest = list(Address.objects.nearest(CENTRO, k=2))
+
+        self.assertEqual(nearest, [self.near, self.middle])
+        self.assertAlmostEqual(nearest[0].distance.m, 50, delta=1)
+
+    def test_nearest_accepts_other_srids(self):
+        point = CENTRO.transform(3857, clone=True)
+        self.assertEqual(list(Address.objects.nearest(point, k=1)), [self.near])
+
+    def test_within_radius(self):
+        within = Address.objects.within_radius(CENTRO, 500).order_by('distance')
+
+        self.assertEqual(list(within), [self.near, self.middle])
+        self.assertAlmostEqual(within[1].distance.m, 400, delta=2)
+        self.assertEqual(list(Address.objects.within_radius(CENTRO, 10)), [])
+
+    def test_in_polygon(self):
+        # Without an SRID, WGS84 is assumed
+        box = Polygon.from_bbox((CENTRO.x - 0.01, CENTRO.y - 0.01, CENTRO.x + 0.01, CENTRO.y + 0.01))
+
+        self.assertEqual(set(Address.objects.in_polygon(box)), {self.near, self.middle})
@@ -0,0 +1,14 @@
+import json
+
+from django.conf import settings
+from django.contrib.gis.geos import Point
+
+# Points with a recorded response in project/fixtures/geocoder_responses.json
+CENTRO = Point(-51.1628, -23.3105, srid=4326)
+IGAPO = Point(-51.1760, -23.3290, srid=4326)
+
+
+def recorded_response(point):
+    "Raw reverse-geocode result recorded for ``point``"
+    with open(settings.BASE_DIR / 'fixtures' / 'geocoder_responses.json') as f:
+        return json.load(f)[f'{point.y:.4f},{point.x:.4f}']
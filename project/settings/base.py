@@ -40,6 +40,7 @@ INSTALLED_APPS = [
     "project.apps.accounts",
     "project.apps.places",
     "project.apps.core",
+    "project.apps.messaging",
 
 ]
 
@@ -182,8 +183,14 @@ MEDIA_ROOT = BASE_DIR.parent.parent / "media"
 
 TABBED_ADMIN_USE_JQUERY_UI = True
 
+GOOGLE_MAPS_API_KEY = config('GOOGLE_MAPS_API_KEY', default='')
+
 WHATSAPP_API_INSTANCE = config('WHATSAPP_API_INSTANCE', default='')  # TODO: Deprecated: only for z-API
 WHATSAPP_API_TOKEN = config('WHATSAPP_API_TOKEN', default='')  # TODO: Deprecated: only for z-API
+WASSENGER_API_KEY = config('WASSENGER_API_KEY', default='')
+SMS_API_TOKEN = config('SMS_API_TOKEN', default='')  # D7 Networks
+MESSAGEBIRD_API_TOKEN = config('MESSAGEBIRD_API_TOKEN', default='')
+MESSAGING_WEBHOOK_TOKEN = config('MESSAGING_WEBHOOK_TOKEN', default='')  # Required by the inbound webhooks
 
 
 # ==============================================================================
@@ -200,3 +207,115 @@ DEFAULT_STATE_CODE = 'PR'
 DEFAULT_COUNTRY = 'Brasil'
 DEFAULT_COUNTRY_CODE = 'BR'
 DEFAULT_ADDRESS_TAG = 'casa'
+
+# Address.geohash length (9 characters is a ~5 m cell)
+PLACES_GEOHASH_PRECISION = 9
+
+# Reverse geocoding cache: each geohash cell of GEOCODE_CACHE_PRECISION
+# characters is geocoded only once.
+GEOCODE_CACHE_PRECISION = PLACES_GEOHASH_PRECISION
+GEOCODE_CACHE_TIMEOUT = config('GEOCODE_CACHE_TIMEOUT', default=60 * 60 * 24 * 90, cast=int)  # seconds
+GEOCODE_CACHE_MAX_ENTRIES = 100000
+GEOCODE_CACHE_LRU_SIZE = 2048
+
+# Address.location changes are reverse geocoded by the geocode_worker command,
+# instead of blocking the save on the remote API.
+GEOCODING_ASYNC = config('GEOCODING_ASYNC', default=True, cast=bool)
+GEOCODING_MAX_ATTEMPTS = 5
+GEOCODING_LEASE = 300  # seconds a claimed job is hidden from other geocode_worker processes
+GEOCODING_RETRY_DELAY = 60  # seconds before the first retry, doubled on every attempt
+
+# Reverse geocoding backends, in order of preference. Each lookup goes to the
+# fastest healthy one and is hedged on the next after its p95 latency.
+GEOCODERS = {
+    'google': {
+        'BACKEND': 'project.utils.geocoders.GoogleGeocoder',
+        'TIMEOUT': 5,
+    },
+}
+GEOCODING_HEDGE_AFTER = 1.0  # seconds, until there is enough latency data for a p95
+GEOCODING_RATE_LIMITS = {  # requests per second, per backend
+    'google': 40,
+}
+
+# Optional self-hosted Nominatim server, used as a second backend. The public
+# nominatim.openstreetmap.org usage policy forbids bulk and automated use, so
+# it is not enabled by default; NOMINATIM_RATE_LIMIT = 0 means no limit.
+NOMINATIM_DOMAIN = config('NOMINATIM_DOMAIN', default='')
+if NOMINATIM_DOMAIN:
+    GEOCODERS['nominatim'] = {
+        'BACKEND': 'project.utils.geocoders.NominatimGeocoder',
+        'TIMEOUT': 5,
+        'OPTIONS': {
+            'domain': NOMINATIM_DOMAIN,
+            'scheme': config('NOMINATIM_SCHEME', default='https'),
+        },
+    }
+    GEOCODING_RATE_LIMITS['nominatim'] = config('NOMINATIM_RATE_LIMIT', default=0, cast=float)
+
+PLACES_CITY_CACHE_TIMEOUT = 300  # seconds a process keeps the (country, state, city) lookup table
+PLACES_DELIVERY_ZONE_CACHE_TIMEOUT = 300  # seconds a process keeps the delivery zones before reloading them
+
+# Outbound messages (WhatsApp, SMS, email) are queued in OutboundMessage and
+# sent by the drain_outbox command.
+MESSAGING_MAX_ATTEMPTS = 6
+MESSAGING_RETRY_DELAY = 30  # seconds before the first retry, doubled on every attempt
+MESSAGING_RETRY_MAX_DELAY = 60 * 60
+MESSAGING_LEASE = 300  # seconds a claimed message is hidden from other drain_outbox workers
+# Messages per second, per channel, for all the drain_outbox workers together
+# (the send slots are shared through the messaging.RateLimit table). A worker
+# only keeps the messages it can send in the next MESSAGING_RATE_HORIZON seconds.
+MESSAGING_RATE_HORIZON = 10
+MESSAGING_RATE_LIMITS = {
+    'whatsapp': 20,
+    'sms': 10,
+    'email': 50,
+}
+
+# Messaging providers, used through project.utils.providers.get_provider().
+# Each one keeps a pool of MAX_CONCURRENCY keep-alive connections.
+MESSAGING_PROVIDERS = {
+    'zapi': {
+        'BASE_URL': f'https://api.z-api.io/instances/{WHATSAPP_API_INSTANCE}/token/{WHATSAPP_API_TOKEN}/',
+        'HEADERS': {'Content-Type': 'application/json'},
+        'TIMEOUT': 5,
+        'MAX_CONCURRENCY': 10,
+    },
+    'wassenger': {
+        'BASE_URL': 'https://api.wassenger.com/v1/',
+        'HEADERS': {'token': WASSENGER_API_KEY},
+        'TIMEOUT': 5,
+        'MAX_CONCURRENCY': 10,
+    },
+    'd7': {
+        'BASE_URL': 'https://rest-api.d7networks.com/secure/',
+        'HEADERS': {'Accept': 'application/json', 'Authorization': SMS_API_TOKEN},
+        'TIMEOUT': 5,
+        'MAX_CONCURRENCY': 10,
+        'OPTIONS': {'sender': config('SMS_SENDER', default='5543984049009')},
+    },
+    'messagebird': {
+        'BASE_URL': 'https://conversations.messagebird.com/v1/',
+        'HEADERS': {'Accept': 'application/json', 'Authorization': f'AccessKey {MESSAGEBIRD_API_TOKEN}'},
+        'TIMEOUT': 5,
+        'MAX_CONCURRENCY': 10,
+    },
+    'messagebird_sms': {
+        'BASE_URL': 'https://rest.messagebird.com/',
+        'HEADERS': {'Accept': 'application/json', 'Authorization': f'AccessKey {MESSAGEBIRD_API_TOKEN}'},
+        'TIMEOUT': 5,
+        'MAX_CONCURRENCY': 10,
+        'OPTIONS': {'originator': config('SMS_SENDER', default='5543984049009')},
+    },
+}
+
+# Providers tried in order for each kind of text message (see project.utils.failover)
+MESSAGING_FAILOVER = {
+    'whatsapp': ['whatsapp', 'wassenger', 'sms_d7', 'sms'],
+    'sms': ['sms_d7', 'sms'],
+}
+# A provider failing FAILURE_THRESHOLD times in a row is skipped for RESET_TIMEOUT seconds
+CIRCUIT_BREAKER = {
+    'FAILURE_THRESHOLD': 3,
+    'RESET_TIMEOUT': 30,
+}
@@ -4,6 +4,16 @@ from .base import *
 
 PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
 
+# Answer reverse geocoding from recorded responses, so nothing goes to the network
+GEOCODERS = {
+    'recorded': {
+        'BACKEND': 'project.utils.geocoders.RecordedGeocoder',
+        'OPTIONS': {
+            'path': BASE_DIR / 'fixtures' / 'geocoder_responses.json',
+        },
+    },
+}
+
 
 class DisableMigrations:
     def __contains__(self, item):
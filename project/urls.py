@@ -19,6 +19,7 @@ from project import settings
 
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path("mensagens/", include("project.apps.messaging.urls")),
 ]
 
 if settings.base.DEBUG:
@@ -0,0 +1,107 @@
+"""
+Circuit breakers for remote providers.
+
+After ``failure_threshold`` consecutive failures the circuit opens and calls
+fail immediately with CircuitOpen, without touching the provider, for
+``reset_timeout`` seconds. Then a single trial call is let through
+(half-open): if it succeeds the circuit closes, otherwise it opens again.
+
+Only the exceptions for which ``is_failure(exception)`` is true count as
+failures (all of them by default). The others, e.g. a provider refusing a
+single recipient, mean the provider answered: they are re-raised without
+tripping the breaker.
+"""
+import threading
+import time
+
+from django.conf import settings
+
+
+class CircuitOpen(Exception):
+    pass
+
+
+class CircuitBreaker:
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, name, failure_threshold=3, reset_timeout=30, is_failure=None):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.is_failure = is_failure or (lambda error: True)
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self):
+        "Whether a call may go through now"
+        with self._lock:
+            state = self.state
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self.trial_running:
+                self.trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.trial_running or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self.trial_running = False
+
+    def call(self, func, *args, **kwargs):
+        if not self.allow():
+            raise CircuitOpen(f'{self.name} is unavailable')
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            if self.is_failure(e):
+                self.record_failure()
+            else:
+                self.record_success()
+            raise
+        self.record_success()
+        return result
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__}: {self.name} ({self.state})>'
+
+
+_lock = threading.Lock()
+_breakers = {}
+
+
+def get_circuit_breaker(name, is_failure=None):
+    """
+    Process-wide breaker for ``name``, configured by settings.CIRCUIT_BREAKER.
+    ``is_failure`` is only used when the breaker is created.
+    """
+    with _lock:
+        if name not in _breakers:
+            config = getattr(settings, 'CIRCUIT_BREAKER', {})
+            _breakers[name] = CircuitBreaker(
+                name,
+                failure_threshold=config.get('FAILURE_THRESHOLD', 3),
+                reset_timeout=config.get('RESET_TIMEOUT', 30),
+                is_failure=is_failure,
+            )
+        return _breakers[name]
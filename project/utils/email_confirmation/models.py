@@ -1,9 +1,9 @@
 from __future__ import unicode_literals
 
+import logging
+
 from django.conf import settings
-from django.contrib.auth import get_user_model
 from django.db import models
-from django.db.models.signals import post_save
 from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
 
@@ -20,6 +20,9 @@ from .signals import (
 from project.utils.tokens import email_activation_token
 
 
+logger = logging.getLogger(__name__)
+
+
 class SimpleEmailConfirmationUserMixin(object):
     """
     Mixin to be used with your django 1.5+ custom User model.
@@ -34,6 +37,10 @@ class SimpleEmailConfirmationUserMixin(object):
 
     primary_email_field_name = 'email'
 
+    # Name of a BooleanField on the User caching is_email_confirmed, so reading
+    # it costs no query. Kept up to date through update_email_confirmed().
+    email_confirmed_field_name = None
+
     def get_primary_email(self):
         return getattr(self, self.primary_email_field_name)
 
@@ -58,8 +65,21 @@ class SimpleEmailConfirmationUserMixin(object):
     @property
     def is_email_confirmed(self):
         "Is the User's primary email address confirmed?"
+        if self.email_confirmed_field_name:
+            return getattr(self, self.email_confirmed_field_name)
         return self.get_primary_email() in self.get_confirmed_emails()
 
+    def update_email_confirmed(self):
+        "Refresh the stored confirmation flag of the primary email address"
+        if not self.email_confirmed_field_name:
+            return
+        email = self.get_primary_email()
+        confirmed = bool(email) and self.email_address_set.filter(email=email, confirmed_at__isnull=False).exists()
+        setattr(self, self.email_confirmed_field_name, confirmed)
+        if self.pk:
+            # A plain UPDATE, so User.save() and its signals don't run again
+            type(self)._default_manager.filter(pk=self.pk).update(**{self.email_confirmed_field_name: confirmed})
+
     @property
     def confirmed_at(self):
         "When the User's primary email address was confirmed, or None"
@@ -92,15 +112,20 @@ class SimpleEmailConfirmationUserMixin(object):
         address = self.email_address_set.get(email=email)
         return address.key
 
+    def _get_emails(self, confirmed):
+        # Use the email_address_set prefetched by prefetch_related() or UserQuerySet.with_credentials(), if any
+        if 'email_address_set' in getattr(self, '_prefetched_objects_cache', {}):
+            return [address.email for address in self.email_address_set.all() if address.is_email_confirmed == confirmed]
+        address_qs = self.email_address_set.filter(confirmed_at__isnull=not confirmed)
+        return [address.email for address in address_qs]
+
     def get_confirmed_emails(self):
         "List of emails this User has confirmed"
-        address_qs = self.email_address_set.filter(confirmed_at__isnull=False)
-        return [address.email for address in address_qs]
+        return self._get_emails(confirmed=True)
 
     def get_unconfirmed_emails(self):
         "List of emails this User has been associated with but not confirmed"
-        address_qs = self.email_address_set.filter(confirmed_at__isnull=True)
-        return [address.email for address in address_qs]
+        return self._get_emails(confirmed=False)
 
     def confirm_email(self, confirmation_key, save=True):
         """
@@ -179,6 +204,7 @@ class EmailAddressManager(models.Manager):
         address = self.create(
             user=user, email=email, key=key, set_at=now, confirmed_at=now,
         )
+        update_user_email_confirmed(user)
         return address
 
     def create_unconfirmed(self, email, user=None):
@@ -228,6 +254,15 @@ def get_user_primary_email(user):
     return user.email
 
 
+def update_user_email_confirmed(user, **kwargs):
+    # softly failing as well, for User models without the mixin
+    if hasattr(user, 'update_email_confirmed'):
+        user.update_email_confirmed()
+
+
+email_confirmed.connect(update_user_email_confirmed, dispatch_uid='update_user_email_confirmed')
+
+
 class AbstractEmailAddress(models.Model):
     "An email address belonging to a User"
 
@@ -307,27 +342,32 @@ class AbstractEmailAddress(models.Model):
 
         self.confirmed_at = None
         self.save(update_fields=['key', 'set_at', 'confirmed_at'])
+        update_user_email_confirmed(self.user)
         return self.key
 
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        update_user_email_confirmed(self.user)
+        return result
+
 
 # class EmailAddress(AbstractEmailAddress):
 #     class Meta(AbstractEmailAddress.Meta):
 #         swappable = 'SIMPLE_EMAIL_CONFIRMATION_EMAIL_ADDRESS_MODEL'
 
 
-# by default, auto-add unconfirmed EmailAddress objects for new Users
-if getattr(settings, 'SIMPLE_EMAIL_CONFIRMATION_AUTO_ADD', True):
-    def auto_add(sender, **kwargs):
-        if sender == get_user_model() and kwargs['created'] and not kwargs['raw']:
-            user = kwargs.get('instance')
-            email = get_user_primary_email(user)
-            if email:
-                if hasattr(user, 'add_unconfirmed_email'):
-                    user.add_unconfirmed_email(email)
-                else:
-                    user.email_address_set.create_unconfirmed(email)
-
-    # TODO: try to only connect this to the User model. We can't use
-    #       get_user_model() here - results in import loop.
-
-    post_save.connect(auto_add)
+def auto_add(sender, instance, created=False, raw=False, **kwargs):
+    """
+    post_save receiver adding an unconfirmed EmailAddress for new Users.
+    Connected to the User model only, by the accounts app (see
+    project.apps.accounts.signals) when SIMPLE_EMAIL_CONFIRMATION_AUTO_ADD
+    is True, the default.
+    """
+    if created and not raw:
+        email = get_user_primary_email(instance)
+        if email:
+            logger.debug('Adding unconfirmed email for user %s', instance.pk)
+            if hasattr(instance, 'add_unconfirmed_email'):
+                instance.add_unconfirmed_email(email)
+            else:
+                instance.email_address_set.create_unconfirmed(email)
@@ -0,0 +1,111 @@
+"""
+Text message delivery with failover across the messaging providers.
+
+Each provider is wrapped in a circuit breaker, so while one is failing it
+is skipped right away and the message goes to the next provider in the
+chain instead of waiting for its timeout.
+
+Only a provider explicitly refusing the message or the recipient (a 4xx
+response other than 401, 403, 408 and 429) doesn't count against it:
+its breaker isn't tripped, the next provider is still tried, and if every
+provider refused the message RecipientRejected is raised. Anything else
+(transport errors, timeouts, 5xx, rejected credentials, rate limiting or
+an unexpected exception) is a provider failure.
+"""
+import logging
+
+import requests
+from django.conf import settings
+
+from project.utils import sms, sms_d7, wassenger, whatsapp
+from project.utils.circuitbreaker import CircuitOpen, get_circuit_breaker
+
+logger = logging.getLogger(__name__)
+
+
+class DeliveryFailed(Exception):
+    pass
+
+
+class RecipientRejected(DeliveryFailed):
+    "Every provider answered but refused the message, so sending it again won't help"
+
+
+def is_provider_error_status(status_code):
+    # 401/403 mean our credentials were refused, not the recipient
+    return status_code >= 500 or status_code in (401, 403, 408, 429)
+
+
+def is_provider_failure(error):
+    "Whether ``error`` means the provider is unavailable, rather than it refusing this message"
+    if isinstance(error, RecipientRejected):
+        return False
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return is_provider_error_status(error.response.status_code)
+    return True
+
+
+def check_response(response):
+    """
+    Raise requests.HTTPError for an unsuccessful provider response, or
+    RecipientRejected if the provider refused the message itself.
+    """
+    if response.ok:
+        return response
+    if not is_provider_error_status(response.status_code):
+        raise RecipientRejected(f'{response.status_code} {response.reason}: {response.text[:200]}')
+    response.raise_for_status()
+
+
+def send_zapi(phone, text):
+    whatsapp.send_message(phone, text, type='text')
+
+
+def send_wassenger(phone, text):
+    check_response(wassenger.send_message(phone, text))
+
+
+def send_d7(phone, text):
+    check_response(sms_d7.send_message(phone, text))
+
+
+def send_messagebird(phone, text):
+    check_response(sms.send_sms(phone, text))
+
+
+SENDERS = {
+    'whatsapp': send_zapi,
+    'wassenger': send_wassenger,
+    'sms_d7': send_d7,
+    'sms': send_messagebird,
+}
+
+
+def send_text(phone, text, chain='whatsapp'):
+    """
+    Send ``text`` to ``phone`` through the first provider of
+    settings.MESSAGING_FAILOVER[chain] that accepts it and return that
+    provider's name. Raises RecipientRejected if every provider refused the
+    message and DeliveryFailed if any of them failed or was unavailable.
+    """
+    errors = []
+    rejected = True
+    for name in settings.MESSAGING_FAILOVER[chain]:
+        breaker = get_circuit_breaker(f'messaging:{name}', is_failure=is_provider_failure)
+        try:
+            breaker.call(SENDERS[name], phone, text)
+        except CircuitOpen as e:
+            rejected = False
+            errors.append(str(e))
+        except Exception as e:
+            if is_provider_failure(e):
+                rejected = False
+                logger.warning('Sending through %s failed: %s', name, e)
+            else:
+                logger.info('%s refused the message to %s: %s', name, phone, e)
+            errors.append(f'{name}: {e}')
+        else:
+            return name
+    if rejected and errors:
+        raise RecipientRejected('; '.join(errors))
+    raise DeliveryFailed('; '.join(errors))
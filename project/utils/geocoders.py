@@ -0,0 +1,305 @@
+"""
+Reverse geocoding backends.
+
+Every backend returns the raw result in the Google Geocoding API format
+(``address_components``, ``geometry`` and ``formatted_address``), which is
+what project.utils.geolocation.apply_geocode() understands, or None when
+there is no address for the given point.
+
+The backends are configured in settings.GEOCODERS, in order of preference,
+and get_geocoder() chains them in a GeocoderChain.
+"""
+import json
+import logging
+import os
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import geopy
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+from project.utils.ratelimit import get_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimited(Exception):
+    pass
+
+
+class BaseGeocoder:
+    def __init__(self, name, timeout=5, **options):
+        self.name = name
+        self.timeout = timeout
+        self.options = options
+
+    def reverse(self, lat, lng, block=True):
+        """
+        Raw result for the point. Waits for the backend's rate limit, or
+        raises RateLimited right away when ``block`` is False.
+        """
+        limiter = get_rate_limiter(self.name, getattr(settings, 'GEOCODING_RATE_LIMITS', {}).get(self.name))
+        if limiter:
+            if block:
+                limiter.acquire()
+            elif not limiter.try_acquire():
+                raise RateLimited(f'{self.name} is rate limited')
+        return self._reverse(lat, lng)
+
+    def _reverse(self, lat, lng):
+        raise NotImplementedError('subclasses of BaseGeocoder must provide a _reverse() method')
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__}: {self.name}>'
+
+
+class GoogleGeocoder(BaseGeocoder):
+    def __init__(self, name, timeout=5, api_key=None, language='pt-br', **options):
+        super().__init__(name, timeout, **options)
+        self.language = language
+        self.geolocator = geopy.GoogleV3(api_key=api_key or settings.GOOGLE_MAPS_API_KEY, timeout=timeout)
+
+    def _reverse(self, lat, lng):
+        response = self.geolocator.reverse(f"{lat},{lng}", language=self.language)
+        if response is None:
+            return None
+        return response.raw
+
+
+class NominatimGeocoder(BaseGeocoder):
+    """
+    Nominatim compatible server (OpenStreetMap), with its result converted to
+    the Google format. ``domain`` must be set explicitly: the public server's
+    usage policy doesn't allow bulk use, so it is never used implicitly.
+    """
+
+    def __init__(self, name, timeout=5, domain=None, scheme='https',
+                 user_agent='django-production-template', language='pt-br', **options):
+        if not domain:
+            raise ImproperlyConfigured(f'The {name} geocoder needs the domain of a Nominatim server')
+        super().__init__(name, timeout, **options)
+        self.language = language
+        self.geolocator = geopy.Nominatim(domain=domain, scheme=scheme, user_agent=user_agent, timeout=timeout)
+
+    def _reverse(self, lat, lng):
+        response = self.geolocator.reverse((lat, lng), language=self.language, addressdetails=True)
+        if response is None:
+            return None
+        return self.to_google(response.raw)
+
+    @staticmethod
+    def to_google(raw):
+        address = raw.get('address', {})
+        components = []
+
+        def add(types, short_name, long_name=None):
+            if short_name:
+                components.append({'types': types, 'short_name': short_name, 'long_name': long_name or short_name})
+
+        state_code = address.get('ISO3166-2-lvl4', '').split('-')[-1] or address.get('state')
+        add(['route'], address.get('road'))
+        add(['street_number'], address.get('house_number'))
+        add(['sublocality', 'sublocality_level_1'], address.get('suburb') or address.get('neighbourhood'))
+        add(['administrative_area_level_2'], address.get('city') or address.get('town') or address.get('municipality'))
+        add(['administrative_area_level_1'], state_code, address.get('state'))
+        add(['country'], address.get('country_code', '').upper(), address.get('country'))
+        add(['postal_code'], address.get('postcode'))
+
+        return {
+            'address_components': components,
+            'geometry': {'location': {'lat': float(raw['lat']), 'lng': float(raw['lon'])}},
+            'formatted_address': raw.get('display_name', ''),
+        }
+
+
+class RecordedGeocoder(BaseGeocoder):
+    """
+    Offline stand-in that answers from responses recorded in a JSON file,
+    keyed by the coordinates rounded to ``precision`` decimal places.
+
+    If ``backend`` names another configured backend, missing responses are
+    fetched from it and recorded, so fixtures can be built from real traffic.
+    """
+
+    def __init__(self, name, timeout=5, path=None, precision=4, backend=None, **options):
+        super().__init__(name, timeout, **options)
+        self.path = path
+        self.precision = precision
+        self.backend = backend
+        self._lock = threading.Lock()
+        self.responses = {}
+        if path and os.path.exists(path):
+            with open(path) as f:
+                self.responses = json.load(f)
+
+    def reverse(self, lat, lng, block=True):
+        # Recorded answers are local, so they are not rate limited
+        return self._reverse(lat, lng)
+
+    def _reverse(self, lat, lng):
+        key = f"{lat:.{self.precision}f},{lng:.{self.precision}f}"
+        if key in self.responses or not self.backend:
+            return self.responses.get(key)
+
+        raw = get_backend(self.backend).reverse(lat, lng)
+        self.record(key, raw)
+        return raw
+
+    def record(self, key, raw):
+        with self._lock:
+            self.responses[key] = raw
+            if self.path:
+                with open(self.path, 'w') as f:
+                    json.dump(self.responses, f, indent=2, ensure_ascii=False)
+
+
+class LatencyStats:
+    """Rolling latency window and health state of a backend"""
+
+    def __init__(self, window=100, failure_threshold=3, cooldown=30):
+        self.latencies = deque(maxlen=window)
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.unhealthy_until = 0
+        self._lock = threading.Lock()
+
+    def record_success(self, latency):
+        with self._lock:
+            self.latencies.append(latency)
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.unhealthy_until = time.monotonic() + self.cooldown
+
+    @property
+    def is_healthy(self):
+        return time.monotonic() >= self.unhealthy_until
+
+    @property
+    def median(self):
+        with self._lock:
+            return statistics.median(self.latencies) if self.latencies else None
+
+    @property
+    def p95(self):
+        with self._lock:
+            if not self.latencies:
+                return None
+            ordered = sorted(self.latencies)
+            return ordered[int(0.95 * (len(ordered) - 1))]
+
+
+class GeocoderChain:
+    """
+    Routes each lookup to the fastest healthy backend (by median latency)
+    and, if it hasn't answered by its p95 latency, hedges the request on
+    the next one. The first answer wins; failing backends are skipped for
+    a cooldown period.
+
+    Only the first backend waits for its rate limit. A hedge whose backend
+    has no token left is skipped, so slow-limited backends don't tie up the
+    shared executor's threads.
+    """
+
+    def __init__(self, backends, hedge_after=1.0, max_workers=16, **stats_options):
+        self.backends = backends
+        self.hedge_after = hedge_after
+        self.stats = {backend.name: LatencyStats(**stats_options) for backend in backends}
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='geocoder')
+
+    def ranked_backends(self):
+        healthy = [backend for backend in self.backends if self.stats[backend.name].is_healthy]
+        if not healthy:
+            # Everything is failing, try them all rather than giving up
+            healthy = list(self.backends)
+
+        def sort_key(item):
+            index, backend = item
+            median = self.stats[backend.name].median
+            return (median is None, median or 0, index)
+
+        return [backend for index, backend in sorted(enumerate(healthy), key=sort_key)]
+
+    def _call(self, backend, lat, lng, block=True):
+        stats = self.stats[backend.name]
+        started = time.monotonic()
+        try:
+            raw = backend.reverse(lat, lng, block=block)
+        except RateLimited:
+            raise
+        except Exception:
+            stats.record_failure()
+            raise
+        stats.record_success(time.monotonic() - started)
+        return raw
+
+    def reverse(self, lat, lng):
+        candidates = self.ranked_backends()
+        pending = set()
+        error = None
+
+        first = True
+        while candidates or pending:
+            if candidates:
+                backend = candidates.pop(0)
+                pending.add(self.executor.submit(self._call, backend, lat, lng, first))
+                first = False
+                deadline = self.stats[backend.name].p95 or self.hedge_after
+            else:
+                deadline = None
+
+            done, pending = wait(pending, timeout=deadline if candidates else None, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    return future.result()
+                except RateLimited as e:
+                    logger.debug('Skipped hedging: %s', e)
+                    error = error or e
+                except Exception as e:
+                    logger.warning('Reverse geocoding failed: %s', e)
+                    error = e
+
+        if error is not None:
+            raise error
+        return None
+
+
+_lock = threading.Lock()
+_backends = {}
+_geocoder = None
+
+
+def get_backend(alias):
+    with _lock:
+        if alias not in _backends:
+            config = settings.GEOCODERS[alias]
+            backend_class = import_string(config['BACKEND'])
+            _backends[alias] = backend_class(alias, timeout=config.get('TIMEOUT', 5), **config.get('OPTIONS', {}))
+        return _backends[alias]
+
+
+def get_geocoder():
+    """The GeocoderChain built from settings.GEOCODERS, shared by the whole process."""
+    global _geocoder
+    if _geocoder is None:
+        backends = [get_backend(alias) for alias in settings.GEOCODERS]
+        with _lock:
+            if _geocoder is None:
+                _geocoder = GeocoderChain(backends, hedge_after=getattr(settings, 'GEOCODING_HEDGE_AFTER', 1.0))
+    return _geocoder
+
+
+def reset_geocoder():
+    global _geocoder
+    with _lock:
+        _backends.clear()
+        _geocoder = None
@@ -0,0 +1,51 @@
+"""
+Geohash encoding (https://en.wikipedia.org/wiki/Geohash).
+
+Nearby points share a common prefix, so a geohash works as a cheap cell id:
+equal geohashes mean the same cell, and shortening it widens the cell.
+Approximate cell sizes: 7 chars ~153 m, 8 chars ~38 m, 9 chars ~5 m.
+"""
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+def encode(lat, lng, precision=9):
+    "Geohash of the given coordinates, with ``precision`` characters"
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True  # Longitude and latitude bits alternate, starting with longitude
+
+    while len(chars) < precision:
+        if even:
+            mid = (lng_range[0] + lng_range[1]) / 2
+            if lng >= mid:
+                bits = bits * 2 + 1
+                lng_range[0] = mid
+            else:
+                bits = bits * 2
+                lng_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if lat >= mid:
+                bits = bits * 2 + 1
+                lat_range[0] = mid
+            else:
+                bits = bits * 2
+                lat_range[1] = mid
+        even = not even
+        bit_count += 1
+
+        if bit_count == 5:
+            chars.append(BASE32[bits])
+            bits = 0
+            bit_count = 0
+
+    return ''.join(chars)
+
+
+def encode_point(point, precision=9):
+    "Geohash of a GEOS Point in WGS84 (x is the longitude, y the latitude)"
+    return encode(point.y, point.x, precision)
@@ -1,90 +1,121 @@
-import geopy
-from django.conf import settings
 from django.contrib.gis.geos import Point
-from project.apps.places.models import Country, State, City
+from project.apps.places.cache import get_cached_geocode, get_city, get_geocode_cell, set_cached_geocode
+from project.apps.places.normalization import clean_address
+from project.utils.geocoders import get_geocoder
+
+# Address fields filled by apply_geocode()
+GEOCODED_FIELDS = ['address', 'complement', 'neighbourhood', 'postal_code', 'city', 'fingerprint']
+
+
+def fetch_reverse_geocode(point):
+    """
+    Remote reverse geocode of the given point through the configured
+    geocoder chain (settings.GEOCODERS), bypassing the cache.
+    Returns the raw result or None.
+    Does not touch the database, so it is safe to call from worker threads.
+    """
+    return get_geocoder().reverse(point.y, point.x)
+
+
+def reverse_geocode(point):
+    """
+    Raw reverse-geocode result (Google format) for the given point, or None.
+    Points falling in the same cache cell share a single remote lookup.
+    """
+    if not point:
+        return None
+
+    cell = get_geocode_cell(point)
+    raw = get_cached_geocode(cell)
+    if raw is None:
+        raw = fetch_reverse_geocode(point)
+        if raw is None:
+            return None
+        set_cached_geocode(cell, raw)
+    return raw
 
 
 def point_to_address(point, instance):
     if point:
-        coords = f"{point.y},{point.x}"
-        geolocator = geopy.GoogleV3(api_key=settings.GOOGLE_MAPS_API_KEY)
-        response = geolocator.reverse(coords, language='pt-br', )
+        response = reverse_geocode(point)
 
         if response is not None:
-            components = response.raw['address_components']
-            address = {}
-            for component in components:
-                for type in component['types']:
-                    address[f"{type}"] = component['short_name']
-                    if 'country' in type:
-                        address[f"{type}"] = component['short_name']
-                        address[f"{type}_long"] = component['long_name']
-                    if 'administrative_area_level_1' in type:
-                        address[f"{type}"] = component['short_name']
-                        address[f"{type}_long"] = component['long_name']
-
-            address_route = ''
-            address_street_number = ''
-            neighbourhood = ''
-            address_premise = ''
-            address_subpremise = ''
-            address_city = ''
-            address_state = ''
-            address_country = ''
-            address_postal_code = ''
-
-            if 'route' in address:
-                address_route = address['route']
-            if 'street_number' in address:
-                address_street_number = address['street_number']
-            if 'sublocality' in address:
-                neighbourhood = address['sublocality_level_1'] or address['sublocality']
-            if 'premise' in address:
-                address_premise = address['premise']
-            if 'subpremise' in address:
-                address_subpremise = address['subpremise']
-            if 'administrative_area_level_2' in address:
-                address_city = address['administrative_area_level_2']
-            if 'administrative_area_level_1' in address:
-                address_state = address['administrative_area_level_1']
-            if 'administrative_area_level_1_long' in address:
-                address_state_long = address['administrative_area_level_1_long']
-            if 'country' in address:
-                address_country = address['country']
-            if 'country_long' in address:
-                address_country_long = address['country_long']
-            if 'postal_code' in address:
-                address_postal_code = address['postal_code']
-
-            address = f"{address_route}, {address_street_number}"
-
-            if address_premise and not address_subpremise:
-                complement = f"{address_premise}"
-            elif address_premise and address_subpremise:
-                complement = f"{address_premise}, {address_subpremise}"
-            elif address_subpremise and not address_premise:
-                complement = f"{address_subpremise}"
-            else:
-                complement = ''
-
-            # lat = response.raw['geometry']['location']['lat']
-            # lng = response.raw['geometry']['location']['lng']
-            # coords = fromstr(f"POINT({lng}, {lat})", srid=4326)
-            # coords = Point(lng, lat, srid=4326)
-
-            instance.address = address
-            instance.complement = complement
-            instance.neighbourhood = neighbourhood
-            instance.postal_code = address_postal_code
-
-            _city = address_city
-            _state = address_state.upper()[0:2]
-            _state_long = address_state_long
-            _country = address_country.upper()[0:2]
-            _country_long = address_country_long
-
-            my_country, country_created = Country.objects.get_or_create(code=_country, name=_country_long)
-            my_state, state_created = State.objects.get_or_create(code=_state, name=_state_long)
-            my_city, city_created = City.objects.get_or_create(state=my_state, country=my_country, name=_city)
-
-            instance.city = my_city
+            apply_geocode(response, instance)
+
+
+def apply_geocode(response, instance):
+    """Fill the address fields of ``instance`` from a raw reverse-geocode result."""
+    components = response['address_components']
+    address = {}
+    for component in components:
+        for type in component['types']:
+            address[f"{type}"] = component['short_name']
+            if 'country' in type:
+                address[f"{type}"] = component['short_name']
+                address[f"{type}_long"] = component['long_name']
+            if 'administrative_area_level_1' in type:
+                address[f"{type}"] = component['short_name']
+                address[f"{type}_long"] = component['long_name']
+
+    address_route = ''
+    address_street_number = ''
+    neighbourhood = ''
+    address_premise = ''
+    address_subpremise = ''
+    address_city = ''
+    address_state = ''
+    address_country = ''
+    address_postal_code = ''
+
+    if 'route' in address:
+        address_route = address['route']
+    if 'street_number' in address:
+        address_street_number = address['street_number']
+    if 'sublocality' in address:
+        neighbourhood = address['sublocality_level_1'] or address['sublocality']
+    if 'premise' in address:
+        address_premise = address['premise']
+    if 'subpremise' in address:
+        address_subpremise = address['subpremise']
+    if 'administrative_area_level_2' in address:
+        address_city = address['administrative_area_level_2']
+    if 'administrative_area_level_1' in address:
+        address_state = address['administrative_area_level_1']
+    if 'administrative_area_level_1_long' in address:
+        address_state_long = address['administrative_area_level_1_long']
+    if 'country' in address:
+        address_country = address['country']
+    if 'country_long' in address:
+        address_country_long = address['country_long']
+    if 'postal_code' in address:
+        address_postal_code = address['postal_code']
+
+    address = f"{address_route}, {address_street_number}"
+
+    if address_premise and not address_subpremise:
+        complement = f"{address_premise}"
+    elif address_premise and address_subpremise:
+        complement = f"{address_premise}, {address_subpremise}"
+    elif address_subpremise and not address_premise:
+        complement = f"{address_subpremise}"
+    else:
+        complement = ''
+
+    # lat = response['geometry']['location']['lat']
+    # lng = response['geometry']['location']['lng']
+    # coords = fromstr(f"POINT({lng}, {lat})", srid=4326)
+    # coords = Point(lng, lat, srid=4326)
+
+    instance.address = address
+    instance.complement = complement
+    instance.neighbourhood = neighbourhood
+    instance.postal_code = address_postal_code
+
+    _city = address_city
+    _state = address_state.upper()[0:2]
+    _state_long = address_state_long
+    _country = address_country.upper()[0:2]
+    _country_long = address_country_long
+
+    instance.city = get_city(_country, _country_long, _state, _state_long, _city)
+    clean_address(instance)
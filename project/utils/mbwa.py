@@ -1,6 +1,6 @@
-import requests
-from project import settings
 import messagebird
+from project import settings
+from project.utils.providers import get_provider
 
 
 def reply(conversation_id):
@@ -31,17 +31,11 @@ def send_message():
     })
 
 
-def get_conversation():
-    url = "https://conversations.messagebird.com/v1/conversations"
-    headers = {
-        'Accept': 'application/json',
-        'Authorization': settings.MESSAGEBIRD_API_TOKEN
-        }
-    response = requests.get(
-        url,
-        headers=headers,
-    )
+def get_conversation(timeout=None):
+    # See settings.MESSAGING_PROVIDERS['messagebird']
+    response = get_provider('messagebird').get('conversations', timeout=timeout)
     print(response.text)
+    return response.json()
 
 # url = "https://conversations.messagebird.com/v1/send"
 #
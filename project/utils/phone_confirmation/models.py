@@ -1,9 +1,9 @@
 from __future__ import unicode_literals
 
+import logging
+
 from django.conf import settings
-from django.contrib.auth import get_user_model
 from django.db import models
-from django.db.models.signals import post_save, post_delete, pre_save
 from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
 from phonenumber_field.modelfields import PhoneNumberField
@@ -20,6 +20,9 @@ from .signals import (
 from project.utils.tokens import phone_activation_token
 
 
+logger = logging.getLogger(__name__)
+
+
 class SimplePhoneConfirmationUserMixin(object):
     """
     Mixin to be used with your django 1.5+ custom User model.
@@ -34,6 +37,10 @@ class SimplePhoneConfirmationUserMixin(object):
 
     primary_phone_field_name = 'phone'
 
+    # Name of a BooleanField on the User caching is_phone_confirmed, so reading
+    # it costs no query. Kept up to date through update_phone_confirmed().
+    phone_confirmed_field_name = None
+
     def get_primary_phone(self):
         return getattr(self, self.primary_phone_field_name)
 
@@ -58,8 +65,21 @@ class SimplePhoneConfirmationUserMixin(object):
     @property
     def is_phone_confirmed(self):
         "Is the User's primary phone number confirmed?"
+        if self.phone_confirmed_field_name:
+            return getattr(self, self.phone_confirmed_field_name)
         return self.get_primary_phone() in self.get_confirmed_phones()
 
+    def update_phone_confirmed(self):
+        "Refresh the stored confirmation flag of the primary phone number"
+        if not self.phone_confirmed_field_name:
+            return
+        phone = self.get_primary_phone()
+        confirmed = bool(phone) and self.phone_number_set.filter(phone=phone, confirmed_at__isnull=False).exists()
+        setattr(self, self.phone_confirmed_field_name, confirmed)
+        if self.pk:
+            # A plain UPDATE, so User.save() and its signals don't run again
+            type(self)._default_manager.filter(pk=self.pk).update(**{self.phone_confirmed_field_name: confirmed})
+
     @property
     def confirmed_at(self):
         "When the User's primary phone number was confirmed, or None"
@@ -92,15 +112,20 @@ class SimplePhoneConfirmationUserMixin(object):
         number = self.phone_number_set.get(phone=phone)
         return number.key
 
+    def _get_phones(self, confirmed):
+        # Use the phone_number_set prefetched by prefetch_related() or UserQuerySet.with_credentials(), if any
+        if 'phone_number_set' in getattr(self, '_prefetched_objects_cache', {}):
+            return [number.phone for number in self.phone_number_set.all() if number.is_phone_confirmed == confirmed]
+        number_qs = self.phone_number_set.filter(confirmed_at__isnull=not confirmed)
+        return [number.phone for number in number_qs]
+
     def get_confirmed_phones(self):
         "List of phones this User has confirmed"
-        number_qs = self.phone_number_set.filter(confirmed_at__isnull=False)
-        return [number.phone for number in number_qs]
+        return self._get_phones(confirmed=True)
 
     def get_unconfirmed_phones(self):
         "List of phones this User has been associated with but not confirmed"
-        number_qs = self.phone_number_set.filter(confirmed_at__isnull=True)
-        return [number.phone for number in number_qs]
+        return self._get_phones(confirmed=False)
 
     def confirm_phone(self, phone_confirmation_key, save=True):
         """
@@ -179,6 +204,7 @@ class PhoneNumberManager(models.Manager):
         number = self.create(
             user=user, phone=phone, key=key, set_at=now, confirmed_at=now,
         )
+        update_user_phone_confirmed(user)
         return number
 
     def create_unconfirmed(self, phone, user=None):
@@ -228,6 +254,15 @@ def get_user_primary_phone(user):
     return user.phone
 
 
+def update_user_phone_confirmed(user, **kwargs):
+    # softly failing as well, for User models without the mixin
+    if hasattr(user, 'update_phone_confirmed'):
+        user.update_phone_confirmed()
+
+
+phone_confirmed.connect(update_user_phone_confirmed, dispatch_uid='update_user_phone_confirmed')
+
+
 class AbstractPhoneNumber(models.Model):
     "A phone number belonging to a User"
 
@@ -305,29 +340,32 @@ class AbstractPhoneNumber(models.Model):
 
         self.confirmed_at = None
         self.save(update_fields=['key', 'set_at', 'confirmed_at'])
+        update_user_phone_confirmed(self.user)
         return self.key
 
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        update_user_phone_confirmed(self.user)
+        return result
+
 
 # class PhoneNumber(AbstractPhoneNumber):
 #     class Meta(AbstractPhoneNumber.Meta):
 #         swappable = 'SIMPLE_PHONE_CONFIRMATION_PHONE_NUMBER_MODEL'
 
 
-# by default, auto-add unconfirmed PhoneNumber objects for new Users
-if getattr(settings, 'SIMPLE_PHONE_CONFIRMATION_AUTO_ADD', True):
-    def auto_add(sender, **kwargs):
-        if sender == get_user_model() and kwargs['created'] and not kwargs['raw']:
-            user = kwargs.get('instance')
-            phone = get_user_primary_phone(user)
-            if phone:
-                if hasattr(user, 'add_unconfirmed_phone'):
-                    print('De primeira, no if mesmo')
-                    user.add_unconfirmed_phone(phone)
-                else:
-                    print('Foi no else')
-                    user.phone_number_set.create_unconfirmed(phone)
-
-    # TODO: try to only connect this to the User model. We can't use
-    #       get_user_model() here - results in import loop.
-
-    post_save.connect(auto_add)
+def auto_add(sender, instance, created=False, raw=False, **kwargs):
+    """
+    post_save receiver adding an unconfirmed PhoneNumber for new Users.
+    Connected to the User model only, by the accounts app (see
+    project.apps.accounts.signals) when SIMPLE_PHONE_CONFIRMATION_AUTO_ADD
+    is True, the default.
+    """
+    if created and not raw:
+        phone = get_user_primary_phone(instance)
+        if phone:
+            logger.debug('Adding unconfirmed phone for user %s', instance.pk)
+            if hasattr(instance, 'add_unconfirmed_phone'):
+                instance.add_unconfirmed_phone(phone)
+            else:
+                instance.phone_number_set.create_unconfirmed(phone)
@@ -0,0 +1,67 @@
+"""
+Phone number normalization.
+
+Parsing with libphonenumber is expensive and the same numbers are parsed
+over and over (forms, managers, messaging, __str__), so results are kept in
+a bounded, process-wide LRU cache.
+"""
+from collections import namedtuple
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.utils.translation import gettext_lazy as _
+from phonenumber_field.phonenumber import PhoneNumber
+from phonenumbers import NumberParseException
+
+NormalizedPhone = namedtuple('NormalizedPhone', ['e164', 'national', 'valid'])
+
+INVALID = NormalizedPhone(None, None, False)
+
+
+@lru_cache(maxsize=getattr(settings, 'PHONE_NORMALIZATION_CACHE_SIZE', 8192))
+def _normalize(value, region):
+    try:
+        number = PhoneNumber.from_string(value, region=region)
+    except NumberParseException:
+        return INVALID
+    if not number.is_valid():
+        return INVALID
+    return NormalizedPhone(number.as_e164, number.as_national, True)
+
+
+def normalize_phone(value, region=None):
+    """
+    NormalizedPhone (e164, national, valid) for a phone given as a string
+    or PhoneNumber. Numbers without a country code are read in ``region``,
+    settings.PHONENUMBER_DEFAULT_REGION by default.
+    """
+    if value is None:
+        return INVALID
+    value = str(value).strip()
+    if not value:
+        return INVALID
+    return _normalize(value, region or getattr(settings, 'PHONENUMBER_DEFAULT_REGION', None))
+
+
+def normalize_phones(values, region=None):
+    """
+    Batch version of normalize_phone(), for imports: {value: NormalizedPhone},
+    parsing each distinct value once.
+    """
+    return {value: normalize_phone(value, region) for value in set(values)}
+
+
+def validate_phone(value, region=None):
+    """
+    Like phonenumber_field's validate_international_phonenumber, but
+    cached, and returning the NormalizedPhone.
+    """
+    phone = normalize_phone(value, region)
+    if not phone.valid:
+        raise ValidationError(_('The phone number entered is not valid.'), code='invalid_phone_number')
+    return phone
+
+
+def clear_phone_cache():
+    _normalize.cache_clear()
@@ -0,0 +1,69 @@
+"""
+HTTP clients of the messaging providers (z-API, Wassenger, D7, MessageBird).
+
+Each provider configured in settings.MESSAGING_PROVIDERS gets one
+requests.Session per process, so connections are kept alive and reused
+instead of paying a TCP+TLS handshake per message, plus a default timeout
+and a limit on the requests in flight at the same time.
+"""
+import threading
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+
+class Provider:
+    def __init__(self, name, base_url='', headers=None, timeout=5, max_concurrency=10, options=None):
+        self.name = name
+        self.base_url = base_url
+        self.timeout = timeout
+        self.options = options or {}
+        self.semaphore = threading.BoundedSemaphore(max_concurrency)
+
+        self.session = requests.Session()
+        self.session.headers.update(headers or {})
+        # One pooled connection per concurrent request
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def request(self, method, path='', timeout=None, **kwargs):
+        with self.semaphore:
+            return self.session.request(method, f'{self.base_url}{path}', timeout=timeout or self.timeout, **kwargs)
+
+    def get(self, path='', **kwargs):
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path='', **kwargs):
+        return self.request('POST', path, **kwargs)
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__}: {self.name}>'
+
+
+_lock = threading.Lock()
+_providers = {}
+
+
+def get_provider(name):
+    """The Provider configured as ``name`` in settings.MESSAGING_PROVIDERS, shared by the whole process."""
+    with _lock:
+        if name not in _providers:
+            config = settings.MESSAGING_PROVIDERS[name]
+            _providers[name] = Provider(
+                name,
+                base_url=config.get('BASE_URL', ''),
+                headers=config.get('HEADERS'),
+                timeout=config.get('TIMEOUT', 5),
+                max_concurrency=config.get('MAX_CONCURRENCY', 10),
+                options=config.get('OPTIONS'),
+            )
+        return _providers[name]
+
+
+def reset_providers():
+    with _lock:
+        for provider in _providers.values():
+            provider.session.close()
+        _providers.clear()
@@ -0,0 +1,57 @@
+import threading
+import time
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: allows ``rate`` acquisitions per second on
+    average, with bursts of up to ``capacity``.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(1, rate))
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def try_acquire(self, tokens=1):
+        with self._lock:
+            self._refill()
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens=1):
+        "Block until ``tokens`` are available"
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def get_rate_limiter(name, rate):
+    """
+    Process-wide token bucket registered under ``name`` (e.g. a provider),
+    or None when ``rate`` is not set, meaning no limit.
+    """
+    if not rate:
+        return None
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+        if limiter is None or limiter.rate != float(rate):
+            limiter = _limiters[name] = TokenBucket(rate)
+        return limiter
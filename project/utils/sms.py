@@ -1,13 +1,24 @@
-import messagebird
-from project import settings
+# MessageBird SMS
 
-client = messagebird.Client(settings.MESSAGEBIRD_API_TOKEN)
+import logging
 
+from project.utils.providers import get_provider
 
-def send_sms(phone, message):
-    try:
-        msg = client.message_create(phone, message)
-        print(msg.__dict__)
-    except messagebird.client.ErrorException as e:
-        for error in e.errors:
-            print(error)
+logger = logging.getLogger(__name__)
+
+# See settings.MESSAGING_PROVIDERS['messagebird_sms']
+PROVIDER = 'messagebird_sms'
+
+
+def send_sms(phone, message, timeout=None):
+    provider = get_provider(PROVIDER)
+    payload = {
+        'originator': provider.options.get('originator'),
+        'recipients': [str(phone).strip('+')],
+        'body': message,
+    }
+    response = provider.post('messages', json=payload, timeout=timeout)
+
+    logger.debug('MessageBird response: %s', response.text)
+
+    return response
@@ -1,8 +1,14 @@
 #D7 Network SMS Settings
 
-import requests
-from project import settings
 import binascii
+import logging
+
+from project.utils.providers import get_provider
+
+logger = logging.getLogger(__name__)
+
+# See settings.MESSAGING_PROVIDERS['d7']
+PROVIDER = 'd7'
 
 
 def str2hex(text):
@@ -12,24 +18,19 @@ def str2hex(text):
     encoded = encoded.strip("'")
     return encoded
 
-def send_message(phone, message, timeout=5):
+def send_message(phone, message, timeout=None):
     # TODO: Unicode SMS not working yet, need to topup account to make more tests (payment failed, waiting a reply)
-    # message = str2hex(message)
-    # payload = f'{{\n\t"from":5543984049009,\n\t"to":{phone}\n,\n\t"coding":"8",\n\t"hex-content":"{str2hex(message)}"}}'
-
-    url = "https://rest-api.d7networks.com/secure/send"
-    payload = f'{{\n\t"from":5543984049009,\n\t"to":{phone}\n,\n\t"content":"{message}"}}'
-    headers = {
-      # 'Content-Type': 'application/x-www-form-urlencoded',
-        'Content-Type': 'application/json',
-        'Accept': 'application/json',
-        'Authorization': settings.SMS_API_TOKEN
+    # payload['coding'] = '8'
+    # payload['hex-content'] = str2hex(message)
+
+    provider = get_provider(PROVIDER)
+    payload = {
+        'from': provider.options.get('sender'),
+        'to': str(phone),
+        'content': message,
     }
-    response = requests.post(
-        url=url,
-        headers=headers,
-        data=payload,
-        timeout=timeout,
-    )
-
-    print(response.text.encode('utf8'))
+    response = provider.post('send', json=payload, timeout=timeout)
+
+    logger.debug('D7 response: %s', response.text)
+
+    return response
@@ -0,0 +1,63 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from project.utils.circuitbreaker import CircuitBreaker, CircuitOpen
+
+
+def fail():
+    raise ConnectionError('timeout')
+
+
+@mock.patch('project.utils.circuitbreaker.time.monotonic', return_value=100.0)
+class CircuitBreakerTests(SimpleTestCase):
+    def trip(self, breaker):
+        for _ in range(breaker.failure_threshold):
+            with self.assertRaises(ConnectionError):
+                breaker.call(fail)
+
+    def test_opens_after_consecutive_failures(self, monotonic):
+        breaker = CircuitBreaker('test', failure_threshold=2, reset_timeout=30)
+        self.trip(breaker)
+
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        func = mock.Mock()
+        with self.assertRaises(CircuitOpen):
+            breaker.call(func)
+        func.assert_not_called()
+
+    def test_success_resets_the_count(self, monotonic):
+        breaker = CircuitBreaker('test', failure_threshold=2)
+        with self.assertRaises(ConnectionError):
+            breaker.call(fail)
+        breaker.call(lambda: None)
+        with self.assertRaises(ConnectionError):
+            breaker.call(fail)
+
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_half_open_lets_a_single_trial_through(self, monotonic):
+        breaker = CircuitBreaker('test', failure_threshold=1, reset_timeout=30)
+        self.trip(breaker)
+        monotonic.return_value = 130.0
+
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_failed_trial_opens_again(self, monotonic):
+        breaker = CircuitBreaker('test', failure_threshold=3, reset_timeout=30)
+        self.trip(breaker)
+        monotonic.return_value = 130.0
+        with self.assertRaises(ConnectionError):
+            breaker.call(fail)
+
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+    def test_errors_that_are_not_failures_dont_trip_it(self, monotonic):
+        breaker = CircuitBreaker('test', failure_threshold=1, is_failure=lambda error: False)
+        self.trip(breaker)
+
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
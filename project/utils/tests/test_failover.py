@@ -0,0 +1,85 @@
+from unittest import mock
+
+import requests
+from django.test import SimpleTestCase, override_settings
+
+from project.utils import failover
+from project.utils.failover import DeliveryFailed, RecipientRejected, check_response, is_provider_failure, send_text
+
+PHONE = '+5543988887777'
+
+
+def response(status_code):
+    response = requests.Response()
+    response.status_code = status_code
+    response.reason = 'reason'
+    response._content = b'{}'
+    return response
+
+
+def http_error(status_code):
+    return requests.HTTPError(response=response(status_code))
+
+
+class ClassificationTests(SimpleTestCase):
+    def test_refusals(self):
+        self.assertFalse(is_provider_failure(RecipientRejected('invalid number')))
+        self.assertFalse(is_provider_failure(http_error(400)))
+        self.assertFalse(is_provider_failure(http_error(404)))
+
+    def test_failures(self):
+        for status_code in (401, 403, 408, 429, 500, 503):
+            self.assertTrue(is_provider_failure(http_error(status_code)), status_code)
+        self.assertTrue(is_provider_failure(requests.Timeout()))
+        self.assertTrue(is_provider_failure(AttributeError('MESSAGEBIRD_API_TOKEN')))
+
+    def test_check_response(self):
+        ok = response(200)
+        self.assertIs(check_response(ok), ok)
+        with self.assertRaises(RecipientRejected):
+            check_response(response(422))
+        for status_code in (401, 503):
+            with self.assertRaises(requests.HTTPError):
+                check_response(response(status_code))
+
+
+@override_settings(
+    MESSAGING_FAILOVER={'whatsapp': ['whatsapp', 'wassenger', 'sms']},
+    CIRCUIT_BREAKER={'FAILURE_THRESHOLD': 1, 'RESET_TIMEOUT': 30},
+)
+class SendTextTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch.dict('project.utils.circuitbreaker._breakers', clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.senders = {name: mock.Mock() for name in ('whatsapp', 'wassenger', 'sms')}
+        patcher = mock.patch.dict(failover.SENDERS, self.senders)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_first_provider(self):
+        self.assertEqual(send_text(PHONE, 'Olá'), 'whatsapp')
+        self.senders['whatsapp'].assert_called_once_with(PHONE, 'Olá')
+        self.senders['wassenger'].assert_not_called()
+
+    def test_falls_back_when_a_provider_fails(self):
+        self.senders['whatsapp'].side_effect = requests.ConnectionError()
+        self.assertEqual(send_text(PHONE, 'Olá'), 'wassenger')
+
+        # The failing provider is skipped while its circuit is open
+        self.assertEqual(send_text(PHONE, 'Olá'), 'wassenger')
+        self.senders['whatsapp'].assert_called_once()
+
+    def test_rejected_when_every_provider_refuses(self):
+        for sender in self.senders.values():
+            sender.side_effect = RecipientRejected('invalid number')
+        with self.assertRaises(RecipientRejected):
+            send_text(PHONE, 'Olá')
+
+    def test_a_failure_among_refusals_is_not_a_rejection(self):
+        self.senders['whatsapp'].side_effect = http_error(400)
+        self.senders['wassenger'].side_effect = RecipientRejected('invalid number')
+        self.senders['sms'].side_effect = http_error(401)
+        with self.assertRaises(DeliveryFailed) as cm:
+            send_text(PHONE, 'Olá')
+        self.assertNotIsInstance(cm.exception, RecipientRejected)
@@ -0,0 +1,92 @@
+import threading
+
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+
+from project.utils.geocoders import BaseGeocoder, GeocoderChain, NominatimGeocoder, RecordedGeocoder
+
+FIXTURE = settings.BASE_DIR / 'fixtures' / 'geocoder_responses.json'
+
+
+class FakeGeocoder(BaseGeocoder):
+    def __init__(self, name, result=None, error=None, wait=None):
+        super().__init__(name)
+        self.result = result
+        self.error = error
+        self.wait = wait
+        self.calls = 0
+
+    def _reverse(self, lat, lng):
+        self.calls += 1
+        if self.wait is not None:
+            self.wait.wait(5)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+@override_settings(GEOCODING_RATE_LIMITS={})
+class GeocoderChainTests(SimpleTestCase):
+    def test_first_backend_answers(self):
+        first, second = FakeGeocoder('first', {'n': 1}), FakeGeocoder('second', {'n': 2})
+        self.assertEqual(GeocoderChain([first, second]).reverse(-23.3, -51.1), {'n': 1})
+        self.assertEqual(second.calls, 0)
+
+    def test_falls_back_and_skips_failing_backends(self):
+        failing = FakeGeocoder('failing', error=ConnectionError('timeout'))
+        working = FakeGeocoder('working', {'n': 2})
+        chain = GeocoderChain([failing, working], failure_threshold=2, cooldown=30)
+
+        for _ in range(3):
+            self.assertEqual(chain.reverse(-23.3, -51.1), {'n': 2})
+        # Unhealthy after two failures, so the third lookup didn't try it
+        self.assertEqual(failing.calls, 2)
+
+    def test_raises_when_every_backend_fails(self):
+        chain = GeocoderChain([FakeGeocoder('failing', error=ConnectionError('timeout'))])
+        with self.assertRaises(ConnectionError):
+            chain.reverse(-23.3, -51.1)
+
+    def test_fastest_backend_goes_first(self):
+        slow, fast = FakeGeocoder('slow', {'n': 1}), FakeGeocoder('fast', {'n': 2})
+        chain = GeocoderChain([slow, fast])
+        chain.stats['slow'].record_success(0.8)
+        chain.stats['fast'].record_success(0.1)
+        self.assertEqual([backend.name for backend in chain.ranked_backends()], ['fast', 'slow'])
+
+    def test_hedges_a_slow_backend(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+        stuck = FakeGeocoder('stuck', {'n': 1}, wait=release)
+        other = FakeGeocoder('other', {'n': 2})
+        chain = GeocoderChain([stuck, other], hedge_after=0.05)
+
+        self.assertEqual(chain.reverse(-23.3, -51.1), {'n': 2})
+        self.assertEqual(stuck.calls, 1)
+
+
+class RecordedGeocoderTests(SimpleTestCase):
+    def test_answers_from_the_recorded_responses(self):
+        geocoder = RecordedGeocoder('recorded', path=FIXTURE)
+        raw = geocoder.reverse(-23.31051, -51.16279)
+        self.assertIn('address_components', raw)
+        self.assertIsNone(geocoder.reverse(0, 0))
+
+
+class NominatimGeocoderTests(SimpleTestCase):
+    def test_converts_to_the_google_format(self):
+        raw = NominatimGeocoder.to_google({
+            'lat': '-23.3105', 'lon': '-51.1628', 'display_name': 'Avenida Higienópolis, 1000, Londrina',
+            'address': {
+                'road': 'Avenida Higienópolis', 'house_number': '1000', 'suburb': 'Centro', 'city': 'Londrina',
+                'state': 'Paraná', 'ISO3166-2-lvl4': 'BR-PR', 'country': 'Brasil', 'country_code': 'br',
+                'postcode': '86020-080',
+            },
+        })
+        components = {component['types'][0]: component for component in raw['address_components']}
+
+        self.assertEqual(components['route']['short_name'], 'Avenida Higienópolis')
+        self.assertEqual(components['administrative_area_level_1']['short_name'], 'PR')
+        self.assertEqual(components['administrative_area_level_1']['long_name'], 'Paraná')
+        self.assertEqual(components['country']['short_name'], 'BR')
+        self.assertEqual(raw['geometry']['location'], {'lat': -23.3105, 'lng': -51.1628})
@@ -0,0 +1,23 @@
+from django.contrib.gis.geos import Point
+from django.test import SimpleTestCase
+
+from project.utils import geohash
+
+
+class GeohashTests(SimpleTestCase):
+    def test_known_values(self):
+        self.assertEqual(geohash.encode(57.64911, 10.40744, 11), 'u4pruydqqvj')
+        self.assertEqual(geohash.encode(-23.3105, -51.1628, 5), '6gge7')
+
+    def test_precision(self):
+        full = geohash.encode(-23.3105, -51.1628, 9)
+        self.assertEqual(len(full), 9)
+        self.assertEqual(geohash.encode(-23.3105, -51.1628, 6), full[:6])
+
+    def test_nearby_points_share_a_prefix(self):
+        a = geohash.encode(-23.31050, -51.16280)
+        b = geohash.encode(-23.31052, -51.16282)  # ~3 m away
+        self.assertEqual(a[:7], b[:7])
+
+    def test_encode_point_reads_x_as_longitude(self):
+        self.assertEqual(geohash.encode_point(Point(10.40744, 57.64911), 11), 'u4pruydqqvj')
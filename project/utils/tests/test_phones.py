@@ -0,0 +1,44 @@
+from django.core.exceptions import ValidationError
+from django.test import SimpleTestCase, override_settings
+from phonenumber_field.phonenumber import PhoneNumber
+
+from project.utils.phones import (
+    INVALID, _normalize, clear_phone_cache, normalize_phone, normalize_phones, validate_phone,
+)
+
+
+@override_settings(PHONENUMBER_DEFAULT_REGION='BR')
+class NormalizePhoneTests(SimpleTestCase):
+    def setUp(self):
+        clear_phone_cache()
+
+    def test_international_and_national_forms(self):
+        phone = normalize_phone('+55 43 98888-7777')
+        self.assertTrue(phone.valid)
+        self.assertEqual(phone.e164, '+5543988887777')
+        self.assertEqual(normalize_phone('(43) 98888-7777'), phone)
+        self.assertEqual(normalize_phone(PhoneNumber.from_string('+5543988887777')), phone)
+
+    def test_region(self):
+        self.assertEqual(normalize_phone('(650) 253-0000', region='US').e164, '+16502530000')
+
+    def test_invalid(self):
+        for value in (None, '', '   ', 'abc', '123'):
+            self.assertEqual(normalize_phone(value), INVALID, value)
+
+    def test_results_are_cached(self):
+        normalize_phone('+5543988887777')
+        normalize_phone(' +5543988887777 ')
+        info = _normalize.cache_info()
+        self.assertEqual((info.hits, info.misses), (1, 1))
+
+    def test_normalize_phones_parses_each_value_once(self):
+        phones = normalize_phones(['+5543988887777', '+5543988887777', 'abc'])
+        self.assertEqual(set(phones), {'+5543988887777', 'abc'})
+        self.assertEqual(_normalize.cache_info().misses, 2)
+
+    def test_validate_phone(self):
+        self.assertEqual(validate_phone('43988887777').e164, '+5543988887777')
+        with self.assertRaises(ValidationError) as cm:
+            validate_phone('123')
+        self.assertEqual(cm.exception.code, 'invalid_phone_number')
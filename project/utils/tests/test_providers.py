@@ -0,0 +1,47 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from project.utils import sms
+from project.utils.providers import get_provider, reset_providers
+
+PROVIDERS = {
+    'messagebird_sms': {
+        'BASE_URL': 'https://rest.messagebird.com/',
+        'HEADERS': {'Authorization': 'AccessKey test'},
+        'TIMEOUT': 3,
+        'MAX_CONCURRENCY': 2,
+        'OPTIONS': {'originator': '5543900000000'},
+    },
+}
+
+
+@override_settings(MESSAGING_PROVIDERS=PROVIDERS)
+class ProviderTests(SimpleTestCase):
+    def setUp(self):
+        reset_providers()
+        self.addCleanup(reset_providers)
+
+    def test_one_session_per_provider(self):
+        provider = get_provider('messagebird_sms')
+        self.assertIs(get_provider('messagebird_sms'), provider)
+        self.assertEqual(provider.session.headers['Authorization'], 'AccessKey test')
+        self.assertEqual(provider.session.get_adapter('https://rest.messagebird.com/')._pool_maxsize, 2)
+
+    def test_requests_use_the_default_timeout(self):
+        provider = get_provider('messagebird_sms')
+        with mock.patch.object(provider.session, 'request') as request:
+            provider.get('balance')
+        request.assert_called_once_with('GET', 'https://rest.messagebird.com/balance', timeout=3)
+
+    def test_send_sms(self):
+        provider = get_provider('messagebird_sms')
+        with mock.patch.object(provider.session, 'request') as request:
+            response = sms.send_sms('+5543988887777', 'Seu pedido saiu para entrega')
+
+        self.assertIs(response, request.return_value)
+        request.assert_called_once_with('POST', 'https://rest.messagebird.com/messages', timeout=3, json={
+            'originator': '5543900000000',
+            'recipients': ['5543988887777'],
+            'body': 'Seu pedido saiu para entrega',
+        })
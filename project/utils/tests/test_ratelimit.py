@@ -0,0 +1,42 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from project.utils.ratelimit import TokenBucket, get_rate_limiter
+
+
+class TokenBucketTests(SimpleTestCase):
+    @mock.patch('project.utils.ratelimit.time.monotonic', return_value=100.0)
+    def test_allows_a_burst_of_capacity_then_refills_at_rate(self, monotonic):
+        bucket = TokenBucket(rate=2, capacity=3)
+        self.assertEqual([bucket.try_acquire() for _ in range(4)], [True, True, True, False])
+
+        monotonic.return_value = 100.5  # one token back at 2 per second
+        self.assertTrue(bucket.try_acquire())
+        self.assertFalse(bucket.try_acquire())
+
+    @mock.patch('project.utils.ratelimit.time.monotonic', return_value=100.0)
+    def test_never_holds_more_than_capacity(self, monotonic):
+        bucket = TokenBucket(rate=10, capacity=2)
+        monotonic.return_value = 1000.0
+        self.assertEqual([bucket.try_acquire() for _ in range(3)], [True, True, False])
+
+    @mock.patch('project.utils.ratelimit.time.sleep')
+    @mock.patch('project.utils.ratelimit.time.monotonic')
+    def test_acquire_waits_for_the_next_token(self, monotonic, sleep):
+        monotonic.side_effect = [0.0, 0.0, 0.0, 0.5]
+        bucket = TokenBucket(rate=2, capacity=1)
+        bucket.acquire()
+        bucket.acquire()
+        sleep.assert_called_once_with(0.5)
+
+
+class GetRateLimiterTests(SimpleTestCase):
+    def test_no_rate_means_no_limit(self):
+        self.assertIsNone(get_rate_limiter('test:none', None))
+        self.assertIsNone(get_rate_limiter('test:none', 0))
+
+    def test_is_shared_by_name_and_rebuilt_when_the_rate_changes(self):
+        limiter = get_rate_limiter('test:shared', 5)
+        self.assertIs(get_rate_limiter('test:shared', 5), limiter)
+        self.assertIsNot(get_rate_limiter('test:shared', 10), limiter)
@@ -1,38 +1,31 @@
-import requests, json
-from project import settings
+import logging
 
+from project.utils.providers import get_provider
 
-def send_message(phone, message, timeout=5):
-    # Send text message to a phone number
+logger = logging.getLogger(__name__)
+
+# See settings.MESSAGING_PROVIDERS['wassenger']
+PROVIDER = 'wassenger'
 
-    url = "https://api.wassenger.com/v1/messages"
-    payload = f'{{\"phone\":\"{phone}\",\"message\":\"{message}\"}}'
-    headers = {
-        'content-type': 'application/json',
-        'token': settings.WASSENGER_API_KEY
-        }
-    response = requests.post(
-        url,
-        data=payload.encode('utf-8'),
-        headers=headers,
-        timeout=timeout,
-    )
 
-    print(response.text)
+def send_message(phone, message, timeout=None):
+    # Send text message to a phone number
+
+    payload = {
+        'phone': str(phone),
+        'message': message,
+    }
+    response = get_provider(PROVIDER).post('messages', json=payload, timeout=timeout)
 
-    return response.ok
+    logger.debug('Wassenger response: %s', response.text)
 
+    return response
 
-# Examples requires to have installed requests Python package.
-# Install it by running: pip install requests
 
-def get_contact(phone, timeout=5):
+def get_contact(phone, timeout=None):
     # Get device contact details
 
     device = '5fa1a16956d6163cd31a523f' # Device ID
-    url = f"https://api.wassenger.com/v1/io/{device}/contacts/{phone}"
-    headers = {'token': settings.WASSENGER_API_KEY}
-    response = requests.get(url, headers=headers)
-    data = json.loads(response.text)
+    response = get_provider(PROVIDER).get(f'io/{device}/contacts/{phone}', timeout=timeout)
 
-    return data
+    return response.json()
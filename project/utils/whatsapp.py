@@ -1,21 +1,19 @@
-import json
-import requests
-from django.conf import settings
+import logging
 from django.core.exceptions import ValidationError
-from django.http import HttpResponse
-from phonenumber_field.phonenumber import PhoneNumber
-from phonenumber_field.validators import validate_international_phonenumber
 
-BASE_URL = f'https://api.z-api.io/instances/{settings.WHATSAPP_API_INSTANCE}/token/{settings.WHATSAPP_API_TOKEN}'
-# BASE_URL = f"https://api.whatsweb.app/send/pqh7hcx/?"
+from project.utils.phones import validate_phone
+from project.utils.providers import get_provider
 
-def format_phone(phone, timeout=5):
+logger = logging.getLogger(__name__)
+
+# z-API, see settings.MESSAGING_PROVIDERS['zapi']
+PROVIDER = 'zapi'
 
-    # Raises a validation error if the number is not valid:
-    validate_international_phonenumber(phone)
+def format_phone(phone, timeout=5):
 
+    # Raises a validation error if the number is not valid.
     # Format the number as the z-API expects, like e164 without the '+' signal
-    phone = PhoneNumber.from_string(str(phone)).as_e164.strip('+') # That way it doesn't matter if given phone is a string or a Phonenumber object
+    phone = validate_phone(phone).e164.strip('+') # That way it doesn't matter if given phone is a string or a Phonenumber object
 
     return phone
 
@@ -33,18 +31,16 @@ def format_phone(phone, timeout=5):
     #     raise ValidationError('Este número de telefone não está no WhatsApp')
 
 
-def check_phone(phone, timeout=5):
+def check_phone(phone, timeout=None):
 
     # Return BOOLEAN if the given phone is on WhatsApp
 
-    validate_international_phonenumber(phone)
-    phone = PhoneNumber.from_string(phone).as_e164.strip('+')
+    phone = validate_phone(phone).e164.strip('+')
 
     # Uses the Z-API to verify if the number exists on WhatsApp
     path = 'phone-exists/'
-    response = requests.get(url = f'{BASE_URL}{path}{phone}',timeout = timeout,)
-    data = json.loads(response.content.decode('utf-8')).get('exists')
-    return data
+    response = get_provider(PROVIDER).get(f'{path}{phone}', timeout=timeout)
+    return response.json().get('exists')
 
 
 # TODO: Deprecated until find a new API
@@ -78,16 +74,12 @@ def check_phone(phone, timeout=5):
 #     return status_ok
 
 
-def send_message(phone, message, type='text', timeout=5):
-    headers = {
-        'content-type': 'application/json'
-    }
+def send_message(phone, message, type='text', timeout=None):
     path = 'send-text'
     payload = {
         'phone': format_phone(phone),
         'message': message,
     }
-    url = f"{BASE_URL}/{path}"
 
     # cmd = 'chat'
     # id = '11OZ6VGPF5'
@@ -95,42 +87,8 @@ def send_message(phone, message, type='text', timeout=5):
     # msg = 'message'
     # url = f"{BASE_URL}cmd={cmd}&id={id}&to={to}@c.us&msg={msg}"
 
-    response = requests.post(
-        url = url,
-        json = payload,
-        headers = headers,
-        timeout = timeout,
-    )
-    print(f'Status: {response.status_code} - {response.text}')
+    response = get_provider(PROVIDER).post(path, json=payload, timeout=timeout)
+    logger.debug('z-API status: %s - %s', response.status_code, response.text)
     response.raise_for_status()
 
     return response
-
-#TODO: postar online só pra testar isso, pq dai não precisa pedir o nome pra pessoa no signup
-#@require_POST
-#@csrf_exempt
-def on_message_received(request):
-    # Get data POSTed
-    json_data = json.load(request.data)  # body.decode("utf-8")
-    phone = json_data['phone']
-    message = json_data['text']['message']
-    contact = json_data['contact']['displayName']
-
-    # TODO: 1) Reconhecer se é um cliente já cadastrado, se é um numero novo,
-    #       Caso seja identificado o cliente, verificar se há pedido em andamento...
-    #       Se sim, puxar os dados do pedido. Se não, perguntar se quer abrir novo pedido.
-
-    # TODO: 2) Tratar o que fazer quando há cada tipo de mídia na mensagem recebida...
-    #       Ex: Imagem, documento, áudio, contato, localização
-    #       Caso real: Clientes mandam prints do menu com suas escolhas...
-
-    # Send e-mail to ADMINs
-    # msg = '%s - Mensagem de whatsapp recebida às %s do dia %s' % (
-    #     message, timezone.now().strftime("%H:%M:%S"), timezone.now().strftime("%d/%m/%y"))
-    # send_mail('Mensagem de WhatsApp recebida', msg,
-    #           settings.SERVER_EMAIL, settings.ADMINS,)
-
-    data = f"{contact} Enviou ums mensagem de WhatsApp {phone}: '{message}'"
-    print(data)
-
-    return HttpResponse(f'Tenho isso pra te retornar: {data}')